@@ -0,0 +1,163 @@
+"""
+Measures what keeping a client's tool catalog in sync costs, with deltas
+(ListToolsSince) against re-fetching the full catalog after every change.
+
+A real server serves a large catalog plus one small tool file that is
+rewritten --changes times (a tool is added, updated or removed each time).
+After every change, a ToolCatalog syncs and must match the server's full
+ListTools exactly. Bytes per sync are reported for both approaches.
+Afterwards the client falls further behind than the change log
+(SWITCHBLADE_CHANGE_LOG_SIZE) and must get the full catalog instead.
+
+    python benchmarks/bench_catalog_sync.py [--catalog-size 500] [--changes 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import grpc
+
+# Sibling benchmark; also puts the repository on sys.path
+from bench_server import free_port, start_server, wait_ready, write_tools
+
+from src.generated import switchblade_pb2
+from src.generated import switchblade_pb2_grpc
+from src.client.tool_catalog import ToolCatalog
+
+CHURN_TOOL = '''
+
+@tool(name="churn_{index}", description="Churned tool {index}, revision {revision}.",
+      input_schema={{"type": "object"}})
+def churn_{index}(args):
+    return {{}}
+'''
+
+
+def write_churn(tools_dir, step):
+    """Step n has tools churn_0..churn_{n % 4}, all at revision n."""
+    source = "from src.utils.switchblade_decorator import tool\n"
+    source += "".join(CHURN_TOOL.format(index=i, revision=step) for i in range(step % 4 + 1))
+    path = os.path.join(tools_dir, "bench_churn.py")
+    with open(path + ".tmp", "w") as f:
+        f.write(source)
+    os.replace(path + ".tmp", path)
+
+
+class CountingStub:
+    """Passes catalog RPCs through and adds up the response sizes."""
+
+    def __init__(self, stub):
+        self.stub = stub
+        self.bytes = 0
+        self.full = 0
+
+    def ListTools(self, request, **kwargs):
+        response = self.stub.ListTools(request, **kwargs)
+        self.bytes += response.ByteSize()
+        self.full += not response.not_modified
+        return response
+
+    def ListToolsSince(self, request, **kwargs):
+        response = self.stub.ListToolsSince(request, **kwargs)
+        self.bytes += response.ByteSize()
+        self.full += response.full
+        return response
+
+
+def wait_for_version(stub, newer_than, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        catalog = stub.ListTools(switchblade_pb2.ListToolsRequest())
+        if catalog.version > newer_than:
+            return catalog
+        time.sleep(0.05)
+    raise RuntimeError("the server did not pick up the change")
+
+
+def matches(catalog, server_catalog):
+    return catalog.version == server_catalog.version and catalog.tools == {
+        t.name: t for t in server_catalog.tools
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("thread", "aio"), default="thread")
+    parser.add_argument("--catalog-size", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--change-log", type=int, default=64)
+    args = parser.parse_args()
+
+    addr = f"127.0.0.1:{free_port()}"
+    env = dict(
+        os.environ,
+        SWITCHBLADE_METRICS_ADDR="",
+        SWITCHBLADE_TRACE_FILE="",
+        SWITCHBLADE_RELOAD_DEBOUNCE="0.05",
+        SWITCHBLADE_CHANGE_LOG_SIZE=str(args.change_log),
+    )
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tools_dir:
+        write_tools(tools_dir, args.catalog_size)
+        write_churn(tools_dir, 0)
+        server = start_server(args.mode, tools_dir, addr, env)
+        channel = grpc.insecure_channel(addr)
+        stub = switchblade_pb2_grpc.SwitchbladeServiceStub(channel)
+        try:
+            wait_ready(stub, 5 + args.catalog_size)
+            counting = CountingStub(stub)
+            catalog = ToolCatalog(counting)
+            catalog.refresh()
+            counting.bytes = counting.full = 0
+
+            full_bytes = 0
+            for step in range(1, args.changes + 1):
+                write_churn(tools_dir, step)
+                wait_for_version(stub, catalog.version)
+                # Reloads of one file can land as one or several versions
+                time.sleep(0.2)
+                server_catalog = stub.ListTools(switchblade_pb2.ListToolsRequest())
+                full_bytes += server_catalog.ByteSize()
+                catalog.refresh()
+                if not matches(catalog, server_catalog):
+                    failures.append(f"step {step}: client catalog differs from the server's")
+            delta_bytes, delta_full = counting.bytes, counting.full
+
+            # Fall behind the change log: every churn rewrite logs at least one change
+            for step in range(args.changes + 1, args.changes + 2 + args.change_log):
+                write_churn(tools_dir, step)
+                time.sleep(0.15)
+            wait_for_version(stub, catalog.version)
+            time.sleep(0.3)
+            counting.full = 0
+            catalog.refresh()
+            server_catalog = stub.ListTools(switchblade_pb2.ListToolsRequest())
+            if not counting.full:
+                failures.append("a client behind the change log did not get the full catalog")
+            if not matches(catalog, server_catalog):
+                failures.append("client catalog differs after the full resync")
+        finally:
+            channel.close()
+            server.terminate()
+            server.wait(timeout=10)
+
+    tools = args.catalog_size + 5
+    print(f"catalog:            ~{tools} tools, {args.changes} changes")
+    print(f"full re-fetch:      {full_bytes / args.changes / 1024:.1f} KiB per sync")
+    print(
+        f"ListToolsSince:     {delta_bytes / args.changes / 1024:.2f} KiB per sync "
+        f"({delta_full} full)"
+    )
+    print(f"saved:              {1 - delta_bytes / full_bytes:.1%}")
+    if failures:
+        print(f"FAIL: {failures[0]} (+{len(failures) - 1} more)")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
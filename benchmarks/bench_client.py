@@ -0,0 +1,147 @@
+"""
+Measures the chat client end to end without the hosted model API: concurrent
+sessions run mcp_client.chat_turn() against a real Switchblade server, with
+the local FakeBackend standing in for the LLM.
+
+Reports turn latency, time to the first streamed reply token (what the user
+waits for) and turns per second. The model's own delays are set with
+--first-token-ms and --token-ms, so the numbers isolate the client and the
+tool round trips.
+
+    python benchmarks/bench_client.py [--sessions 8] [--turns 20] [--mode thread|aio]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+
+import grpc
+
+# Sibling benchmark; also puts the repository on sys.path
+from bench_server import (
+    free_port,
+    percentile,
+    start_server,
+    wait_ready,
+    write_tools,
+)
+
+from src.generated import switchblade_pb2_grpc
+from src.utils import grpc_options
+from src.client import mcp_client
+from src.client.tool_catalog import ToolCatalog
+from src.client.context_budget import ConversationContext
+from src.client.llm_backend import FakeBackend
+
+# One session's script, repeated; tool names are what the fake model reacts to
+SCRIPT = (
+    "Please run noop on the target.",
+    "Now run sleep and cpu together.",
+    "Anything else worth knowing?",
+    "Run large and summarize it.",
+)
+
+
+def run_session(stub, backend, catalog, turns, results, lock):
+    tools = catalog.openai_tools()
+    context = ConversationContext("You are Switchblade.\n", model="gpt-4o-mini")
+    for turn in range(turns):
+        first_token = []
+        started = time.perf_counter()
+
+        def on_token(text):
+            if not first_token:
+                first_token.append(time.perf_counter() - started)
+
+        reply = mcp_client.chat_turn(
+            stub, backend, context, tools, SCRIPT[turn % len(SCRIPT)], on_token, catalog.codecs
+        )
+        elapsed = time.perf_counter() - started
+        with lock:
+            results.append((elapsed, first_token[0] if first_token else None, reply is not None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("thread", "aio"), default="thread")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=2)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.first_token_ms / 1000, args.token_ms / 1000)
+    addr = f"127.0.0.1:{free_port()}"
+    results = []
+    lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory() as tools_dir:
+        write_tools(tools_dir, catalog_size=20)
+        env = dict(os.environ, SWITCHBLADE_METRICS_ADDR="", SWITCHBLADE_TRACE_FILE="")
+        server = start_server(args.mode, tools_dir, addr, env)
+        channel = grpc.insecure_channel(addr, options=grpc_options.channel_options())
+        stub = switchblade_pb2_grpc.SwitchbladeServiceStub(channel)
+        try:
+            wait_ready(stub, 24)
+            catalog = ToolCatalog(stub)
+            catalog.refresh()
+
+            sessions = [
+                threading.Thread(
+                    target=run_session,
+                    args=(stub, backend, catalog, args.turns, results, lock),
+                    daemon=True,
+                )
+                for _ in range(args.sessions)
+            ]
+            started = time.perf_counter()
+            # The client narrates every tool call; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                for session in sessions:
+                    session.start()
+                for session in sessions:
+                    session.join()
+            wall = time.perf_counter() - started
+        finally:
+            channel.close()
+            server.terminate()
+            server.wait(timeout=10)
+
+    latencies = sorted(elapsed for elapsed, _, _ in results)
+    first_tokens = sorted(t for _, t, _ in results if t is not None)
+    failed = sum(1 for _, _, ok in results if not ok)
+    report = {
+        "config": vars(args),
+        "turns": len(results),
+        "failed": failed,
+        "turns_per_second": len(results) / wall,
+        "turn_p50_ms": 1000 * percentile(latencies, 0.50),
+        "turn_p95_ms": 1000 * percentile(latencies, 0.95),
+        "first_token_p50_ms": 1000 * percentile(first_tokens, 0.50),
+        "first_token_p95_ms": 1000 * percentile(first_tokens, 0.95),
+    }
+
+    print(f"sessions x turns:  {args.sessions} x {args.turns} ({failed} failed)")
+    print(f"throughput:        {report['turns_per_second']:.1f} turns/s")
+    print(f"turn latency:      p50 {report['turn_p50_ms']:.1f} ms, p95 {report['turn_p95_ms']:.1f} ms")
+    print(
+        f"first reply token: p50 {report['first_token_p50_ms']:.1f} ms, "
+        f"p95 {report['first_token_p95_ms']:.1f} ms"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
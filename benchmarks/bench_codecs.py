@@ -0,0 +1,83 @@
+"""
+Compares CallTool payload codecs: CPU per call and bytes on the wire.
+
+Each round trip is what a real call pays: the server encodes the result into a
+CallToolResponse and serializes it, the client parses the message and decodes
+the payload.
+
+    python benchmarks/bench_codecs.py [--iterations 2000]
+"""
+
+import os
+import json
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.generated import switchblade_pb2
+from src.utils import payload_codecs
+
+SAMPLES = {
+    "port_scan": {"status": "success", "port_status": "open", "detection_flag": True},
+    "file_listing": {
+        "status": "success",
+        "files": [
+            {"path": f"/bank_data/file_{i}.txt", "size": i * 37, "mode": "0644"}
+            for i in range(1000)
+        ],
+    },
+    "command_output": {"status": "success", "stdout": "line of output\n" * 20000},
+}
+
+
+def legacy_round_trip(value):
+    wire = switchblade_pb2.CallToolResponse(
+        content_json=json.dumps(value)
+    ).SerializeToString()
+    response = switchblade_pb2.CallToolResponse.FromString(wire)
+    json.loads(response.content_json)
+    return len(wire)
+
+
+def codec_round_trip(value, codec):
+    wire = switchblade_pb2.CallToolResponse(
+        content=payload_codecs.encode(value, codec), codec=codec
+    ).SerializeToString()
+    response = switchblade_pb2.CallToolResponse.FromString(wire)
+    payload_codecs.decode(response.content, response.codec)
+    return len(wire)
+
+
+def measure(fn, iterations):
+    size = fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    codecs = [("legacy", None)] + [
+        (switchblade_pb2.Codec.Name(c), c) for c in payload_codecs.available_codecs()
+    ]
+    print(f"{'sample':<16}{'codec':<24}{'cpu us/call':>12}{'bytes':>12}")
+    for sample_name, value in SAMPLES.items():
+        # Keep the big samples from taking forever
+        iterations = max(10, args.iterations // (1 + len(str(value)) // 10000))
+        for codec_name, codec in codecs:
+            if codec is None:
+                fn = lambda: legacy_round_trip(value)
+            else:
+                fn = lambda: codec_round_trip(value, codec)
+            cpu_us, size = measure(fn, iterations)
+            print(f"{sample_name:<16}{codec_name:<24}{cpu_us:>12.1f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
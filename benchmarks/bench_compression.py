@@ -0,0 +1,112 @@
+"""
+Shows the gRPC compression trade-off for typical tool outputs: bytes saved
+vs. CPU spent, and the resulting time to deliver a result over links of
+different speeds.
+
+gRPC compresses with zlib at its default level: "gzip" is the gzip container,
+"deflate" the zlib one. The same calls are timed here on the serialized
+CallToolResponse, so the numbers match what SWITCHBLADE_COMPRESSION costs.
+
+    python benchmarks/bench_compression.py [--iterations 200] [--mbps 10,100,1000]
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.generated import switchblade_pb2
+from src.utils import grpc_options
+
+NMAP_LINE = "Discovered open port {port}/tcp on 10.0.{a}.{b}\n"
+
+SAMPLES = {
+    "port_scan": {"status": "success", "port_status": "open", "detection_flag": True},
+    "credentials": {
+        "status": "success",
+        "valid": [{"user": f"user{i}", "password": f"pw-{i * 7919 % 10007}"} for i in range(40)],
+    },
+    "nmap_output": {
+        "status": "success",
+        "stdout": "".join(
+            NMAP_LINE.format(port=p, a=p % 7, b=p % 251) for p in range(1, 4000)
+        ),
+    },
+    "file_listing": {
+        "status": "success",
+        "files": [
+            {"path": f"/bank_data/file_{i}.txt", "size": i * 37, "mode": "0644"}
+            for i in range(20000)
+        ],
+    },
+    # Already-compressed or encrypted content barely shrinks
+    "binary_dump": {"status": "success", "base64": os.urandom(300000).hex()},
+}
+
+ALGORITHMS = {
+    "gzip": lambda: zlib.compressobj(wbits=31),
+    "deflate": lambda: zlib.compressobj(wbits=15),
+}
+
+
+def compress(message, algorithm):
+    compressor = ALGORITHMS[algorithm]()
+    return compressor.compress(message) + compressor.flush()
+
+
+def cpu_seconds(fn, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--mbps", default="10,100,1000", help="link speeds to model, Mbit/s")
+    args = parser.parse_args()
+    speeds = [float(mbps) for mbps in args.mbps.split(",")]
+
+    header = f"{'sample':<14}{'algorithm':<10}{'bytes':>11}{'ratio':>7}{'cpu ms':>9}"
+    header += "".join(f"{f'@{mbps:g}Mb ms':>13}" for mbps in speeds)
+    print(header)
+
+    for sample_name, value in SAMPLES.items():
+        message = switchblade_pb2.CallToolResponse(
+            content_json=json.dumps(value)
+        ).SerializeToString()
+        iterations = max(5, args.iterations // (1 + len(message) // 100000))
+
+        # Uncompressed: only the transfer itself
+        row = f"{sample_name:<14}{'none':<10}{len(message):>11}{1.0:>7.2f}{0.0:>9.2f}"
+        row += "".join(f"{len(message) * 8 / (mbps * 1000):>13.2f}" for mbps in speeds)
+        print(row)
+
+        for algorithm in ALGORITHMS:
+            compressed = compress(message, algorithm)
+            wbits = 31 if algorithm == "gzip" else 15
+            cpu = cpu_seconds(lambda: compress(message, algorithm), iterations)
+            cpu += cpu_seconds(lambda: zlib.decompress(compressed, wbits), iterations)
+            row = (
+                f"{'':<14}{algorithm:<10}{len(compressed):>11}"
+                f"{len(message) / len(compressed):>7.2f}{cpu * 1000:>9.2f}"
+            )
+            # Sender and receiver CPU plus the smaller transfer
+            row += "".join(
+                f"{cpu * 1000 + len(compressed) * 8 / (mbps * 1000):>13.2f}" for mbps in speeds
+            )
+            print(row)
+
+    print(
+        f"\nserver threshold: SWITCHBLADE_COMPRESSION_MIN_BYTES="
+        f"{grpc_options.COMPRESSION_MIN_BYTES} ({grpc_options.COMPRESSION})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Replays a long tool-heavy conversation through ConversationContext against a
+local fake chat-completions backend and reports how big each request gets.
+
+The fake backend checks every request the way the real API would: each tool
+message must answer a tool_call of the assistant message before it, and each
+tool_call must be answered. Exits non-zero if a request breaks that pairing
+or goes over the token budget.
+
+    python benchmarks/bench_context_budget.py [--turns 60] [--budget 24000]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.client.context_budget import ConversationContext
+
+SYSTEM_PROMPT = "You are Switchblade, an advanced cybersecurity agent.\n"
+
+
+def fake_tool_output(turn, size):
+    """Scan-like results, from a short verdict up to a big file listing."""
+    if turn % 3 == 0:
+        return json.dumps({"status": "success", "port_status": "open"})
+    if turn % 3 == 1:
+        return json.dumps({
+            "status": "success",
+            "files": [{"path": f"/data/{turn}/file_{i}.txt", "size": i} for i in range(size)],
+        })
+    return "Discovered open port 22/tcp on 10.0.0.1\n" * size
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions; asks for two tools on every other turn."""
+
+    def __init__(self, context):
+        self.context = context
+        self.requests = []
+        self.errors = []
+        self.calls = 0
+
+    def create(self, model, messages, tools=None, tool_choice=None):
+        self.calls += 1
+        self._check(messages)
+        size = sum(self.context.count(m.get("content") or "") for m in messages)
+        self.requests.append((len(messages), size))
+
+        last = messages[-1]
+        if last["role"] == "user" and self.calls % 2:
+            tool_calls = [
+                SimpleNamespace(
+                    id=f"call_{self.calls}_{n}",
+                    function=SimpleNamespace(name=f"scan_{n}", arguments="{}"),
+                )
+                for n in range(2)
+            ]
+            message = SimpleNamespace(content=None, tool_calls=tool_calls)
+        else:
+            message = SimpleNamespace(content=f"Answer {self.calls}: all done.", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _check(self, messages):
+        if messages[0]["role"] != "user" or SYSTEM_PROMPT not in messages[0]["content"]:
+            self.errors.append("system prompt missing from the first message")
+        expected = set()
+        for message in messages:
+            if message["role"] == "tool":
+                if message["tool_call_id"] not in expected:
+                    self.errors.append(f"orphan tool message {message['tool_call_id']}")
+                expected.discard(message["tool_call_id"])
+                continue
+            if expected:
+                self.errors.append(f"unanswered tool_calls {sorted(expected)}")
+            expected = {call["id"] for call in message.get("tool_calls") or ()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=24000)
+    parser.add_argument("--tool-result-tokens", type=int, default=4000)
+    parser.add_argument("--output-size", type=int, default=3000, help="rows per big tool result")
+    args = parser.parse_args()
+
+    context = ConversationContext(
+        SYSTEM_PROMPT, max_tokens=args.budget, tool_result_tokens=args.tool_result_tokens
+    )
+    completions = FakeCompletions(context)
+    raw_tokens = 0
+    started = time.perf_counter()
+
+    # Same sequence of calls as run_chat_loop
+    for turn in range(args.turns):
+        question = f"Scan host 10.0.0.{turn} and tell me what you find."
+        context.add_user(question)
+        raw_tokens += context.count(question)
+        response = completions.create("fake", context.messages())
+        message = response.choices[0].message
+        if message.tool_calls:
+            context.add_assistant(message)
+            for call in message.tool_calls:
+                output = fake_tool_output(turn, args.output_size)
+                raw_tokens += context.count(output)
+                context.add_tool_result(call.id, call.function.name, output)
+            message = completions.create("fake", context.messages()).choices[0].message
+        context.add_assistant({"role": "assistant", "content": message.content})
+
+    elapsed = time.perf_counter() - started
+    largest = max(size for _, size in completions.requests)
+    print(f"turns:                  {args.turns} ({completions.calls} requests)")
+    print(f"raw history:            {raw_tokens} tokens")
+    print(f"largest request:        {largest} tokens (budget {args.budget})")
+    print(f"last request:           {completions.requests[-1][1]} tokens, "
+          f"{completions.requests[-1][0]} messages")
+    print(f"turns summarized away:  {context.dropped_turns} ({len(context.summaries)} summaries kept)")
+    print(f"context work:           {elapsed / completions.calls * 1000:.2f} ms per request")
+
+    if completions.errors:
+        print(f"FAIL: {completions.errors[0]} (+{len(completions.errors) - 1} more)")
+        sys.exit(1)
+    if largest > args.budget:
+        print("FAIL: a request went over the budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Drives a federated client against several local Switchblade servers and
+reports throughput, latency and how calls spread over the replicas.
+
+Each server gets its own tools directory. The noop/sleep/cpu/large tools are
+identical everywhere, so they are replicas of one tool; the catalog_* tools
+differ per server, so they show up namespaced as s1__catalog_0 and so on.
+The load goes to "lookup", a cacheable and so idempotent tool, with distinct
+arguments per call so the result cache never answers. Halfway through
+(--kill-after), one server is killed: its in-flight calls must fail over and
+the rest of the run must not see it. Exits non-zero if any call fails.
+
+    python benchmarks/bench_federation.py [--servers 3] [--policy round_robin]
+        [--concurrency 16] [--duration 6] [--kill-after 3]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import tempfile
+import threading
+
+# Sibling benchmark; also puts the repository on sys.path
+from bench_server import free_port, percentile, start_server, write_tools
+
+from src.generated import switchblade_pb2
+from src.client.federation import Federation
+
+# Only idempotent tools are retried on another server
+LOOKUP_TOOL = '''import time
+from src.utils.switchblade_decorator import tool
+
+
+@tool(name="lookup", description="Idempotent I/O-bound tool.", input_schema={"type": "object"},
+      cacheable=True)
+def lookup(args):
+    time.sleep(args.get("ms", 10) / 1000)
+    return {"n": args.get("n")}
+'''
+
+
+def wait_federated(federation, expected_tools, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            federation.catalog.refresh()
+            if len(federation.catalog.tools) >= expected_tools:
+                return
+        except Exception:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("servers did not come up")
+
+
+def run_worker(federation, sleep_ms, sequence, stop, results, lock):
+    while not stop.is_set():
+        request = switchblade_pb2.CallToolRequest(
+            tool_name="lookup", arguments_json=json.dumps({"ms": sleep_ms, "n": next(sequence)})
+        )
+        started = time.perf_counter()
+        try:
+            response = federation.CallTool(request, timeout=10)
+            error = response.error_message if response.is_error else None
+        except Exception as e:
+            error = getattr(e, "details", lambda: str(e))()
+        elapsed = time.perf_counter() - started
+        with lock:
+            results.append((elapsed, error))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("thread", "aio"), default="thread")
+    parser.add_argument("--servers", type=int, default=3)
+    parser.add_argument("--policy", choices=("round_robin", "least_outstanding"), default="round_robin")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=6)
+    parser.add_argument("--kill-after", type=float, default=3, help="0 keeps every server up")
+    parser.add_argument("--sleep-ms", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ, SWITCHBLADE_METRICS_ADDR="", SWITCHBLADE_TRACE_FILE="")
+    servers = []
+    results = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    with tempfile.TemporaryDirectory() as root:
+        endpoints = []
+        for index in range(args.servers):
+            tools_dir = os.path.join(root, f"s{index + 1}")
+            os.makedirs(tools_dir)
+            write_tools(tools_dir, catalog_size=2, version=index)
+            with open(os.path.join(tools_dir, "bench_lookup.py"), "w") as f:
+                f.write(LOOKUP_TOOL)
+            addr = f"127.0.0.1:{free_port()}"
+            servers.append(start_server(args.mode, tools_dir, addr, env))
+            endpoints.append((f"s{index + 1}", addr))
+
+        federation = Federation(endpoints, policy=args.policy)
+        try:
+            # 5 shared tools plus 2 namespaced ones per server
+            wait_federated(federation, 5 + 2 * args.servers)
+            namespaced = sorted(name for name in federation.catalog.tools if "__" in name)
+
+            # A namespaced call must reach the server that defines it
+            probe = switchblade_pb2.CallToolRequest(
+                tool_name=namespaced[-1], arguments_json=json.dumps({"target": "x"})
+            )
+            probe_ok = not federation.CallTool(probe, timeout=10).is_error
+
+            sequence = itertools.count()
+            workers = [
+                threading.Thread(
+                    target=run_worker,
+                    args=(federation, args.sleep_ms, sequence, stop, results, lock),
+                    daemon=True,
+                )
+                for _ in range(args.concurrency)
+            ]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            if 0 < args.kill_after < args.duration:
+                time.sleep(args.kill_after)
+                servers[0].kill()
+                time.sleep(args.duration - args.kill_after)
+            else:
+                time.sleep(args.duration)
+            stop.set()
+            for worker in workers:
+                worker.join()
+            wall = time.perf_counter() - started
+            served = {e.alias: e.completed for e in federation.endpoints}
+        finally:
+            federation.close()
+            for server in servers:
+                server.kill()
+                server.wait(timeout=10)
+
+    latencies = sorted(elapsed for elapsed, _ in results)
+    errors = [error for _, error in results if error is not None]
+    report = {
+        "config": vars(args),
+        "calls": len(results),
+        "errors": len(errors),
+        "qps": len(results) / wall,
+        "p50_ms": 1000 * percentile(latencies, 0.50),
+        "p95_ms": 1000 * percentile(latencies, 0.95),
+        "served": served,
+        "namespaced_tools": namespaced,
+        "namespaced_call_ok": probe_ok,
+    }
+
+    print(f"servers:          {args.servers} ({args.policy}, {args.mode})")
+    print(f"namespaced tools: {', '.join(namespaced)}")
+    print(f"calls:            {len(results)} ({len(errors)} failed)")
+    print(f"throughput:       {report['qps']:.0f} calls/s")
+    print(f"latency:          p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms")
+    print(f"served per server: {served}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+    if errors or not probe_ok:
+        print(f"FAIL: {errors[0] if errors else 'namespaced call failed'}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Measures how fast requests can read the tool registry, first while it is
+idle and then while a tool file is reloaded over and over.
+
+Readers do what a call and a ListTools do: take the current snapshot, look
+up a tool with its validator and descriptor, and fetch the catalog. The
+reloaded file flips between two versions, one with an extra tool and one
+without, with different descriptions. Every reader checks that what it sees
+belongs to a single version. Exits non-zero on any torn read.
+
+    python benchmarks/bench_registry.py [--tools 200] [--readers 4] [--duration 3]
+"""
+
+import os
+import io
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "src", "generated")]
+
+from src.server.mcp_server import ToolRegistry
+
+STATIC_TOOL = '''
+
+@tool(name="static_{index}", description="Static tool {index}.", input_schema={{"type": "object"}})
+def static_{index}(args):
+    return {{}}
+'''
+
+CHURN_WITH_EXTRA = '''from src.utils.switchblade_decorator import tool
+
+
+@tool(name="churn", description="with extra", input_schema={"type": "object"})
+def churn(args):
+    return {}
+
+
+@tool(name="churn_extra", description="with extra", input_schema={"type": "object"})
+def churn_extra(args):
+    return {}
+'''
+
+CHURN_ALONE = '''from src.utils.switchblade_decorator import tool
+
+
+@tool(name="churn", description="alone", input_schema={"type": "object"})
+def churn(args):
+    return {}
+'''
+
+
+def read_loop(registry, names, stop, counts, errors, seed):
+    rng = random.Random(seed)
+    reads = 0
+    while not stop.is_set():
+        snapshot = registry.snapshot
+        name = rng.choice(names)
+        func = snapshot.tools.get(name)
+        descriptor = snapshot.descriptors.get(name)
+        if (func is None) != (descriptor is None) or name in snapshot.tools and name not in snapshot.validators:
+            errors.append(f"{name}: tool, descriptor and validator disagree")
+
+        # The churned file's two tools must come from the same version
+        churn = snapshot.descriptors.get("churn")
+        extra = "churn_extra" in snapshot.tools
+        if churn is not None and (churn.description == "with extra") != extra:
+            errors.append(f"generation {snapshot.generation}: churn and churn_extra torn")
+        if len(snapshot.catalog.tools) != len(snapshot.tools):
+            errors.append(f"generation {snapshot.generation}: catalog does not match tools")
+        reads += 1
+    counts.append(reads)
+
+
+def reload_loop(registry, path, stop, reloads):
+    flip = False
+    while not stop.is_set():
+        flip = not flip
+        with open(path, "w") as f:
+            f.write(CHURN_WITH_EXTRA if flip else CHURN_ALONE)
+        registry.load_tool_file(path)
+        reloads[0] += 1
+
+
+def measure(registry, names, args, reload_path=None):
+    stop = threading.Event()
+    counts, errors, reloads = [], [], [0]
+    threads = [
+        threading.Thread(target=read_loop, args=(registry, names, stop, counts, errors, i))
+        for i in range(args.readers)
+    ]
+    if reload_path is not None:
+        threads.append(
+            threading.Thread(target=reload_loop, args=(registry, reload_path, stop, reloads))
+        )
+    generation = registry.snapshot.generation
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "reads_per_second": sum(counts) / args.duration,
+        "reloads_per_second": reloads[0] / args.duration,
+        "generations": registry.snapshot.generation - generation,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tools", type=int, default=200)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    registry = ToolRegistry()
+    with tempfile.TemporaryDirectory() as tools_dir:
+        static_path = os.path.join(tools_dir, "bench_static.py")
+        with open(static_path, "w") as f:
+            f.write("from src.utils.switchblade_decorator import tool\n")
+            f.write("".join(STATIC_TOOL.format(index=i) for i in range(args.tools)))
+        churn_path = os.path.join(tools_dir, "bench_churn.py")
+        with open(churn_path, "w") as f:
+            f.write(CHURN_ALONE)
+
+        # The reload loop prints every registration
+        with contextlib.redirect_stdout(io.StringIO()):
+            registry.load_tool_file(static_path)
+            registry.load_tool_file(churn_path)
+            names = list(registry.tools) + ["churn_extra", "missing"]
+            idle = measure(registry, names, args)
+            busy = measure(registry, names, args, reload_path=churn_path)
+
+    print(f"catalog:               {args.tools + 1} tools, {args.readers} reader threads")
+    print(f"reads, idle:           {idle['reads_per_second']:.0f}/s")
+    print(
+        f"reads, while reloading: {busy['reads_per_second']:.0f}/s "
+        f"({busy['reloads_per_second']:.0f} reloads/s, {busy['generations']} generations)"
+    )
+    errors = idle["errors"] + busy["errors"]
+    if errors:
+        print(f"FAIL: {errors[0]} (+{len(errors) - 1} more)")
+        sys.exit(1)
+    print("OK: every read saw one consistent snapshot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Checks that hot-reloading a tool file over and over does not leak modules or
+memory. Exits non-zero when growth after warm-up exceeds the budget.
+
+    python benchmarks/bench_reload_memory.py [--reloads 800] [--budget-kb 256]
+"""
+
+import os
+import gc
+import sys
+import weakref
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import io
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "src", "generated")]
+
+from src.server.mcp_server import ToolRegistry
+
+# Only values change between versions: new identifiers would be interned by
+# CPython forever and show up as growth that no reload pipeline can avoid
+TOOL_SOURCE = '''from src.utils.switchblade_decorator import tool
+
+PAYLOAD = list(range(2000))  # some per-module state worth leaking
+
+
+@tool(name="reloaded", description="reload number {version}", input_schema={{"type": "object"}})
+def reloaded(args):
+    return {{"version": {version}, "size": len(PAYLOAD)}}
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reloads", type=int, default=800)
+    parser.add_argument("--warmup", type=int, default=300)
+    parser.add_argument("--budget-kb", type=int, default=256)
+    args = parser.parse_args()
+    if args.reloads <= args.warmup:
+        parser.error("--reloads must be larger than --warmup to measure any growth")
+
+    registry = ToolRegistry()
+    live_modules = weakref.WeakSet()
+
+    with tempfile.TemporaryDirectory() as tools_dir:
+        path = os.path.join(tools_dir, "reloaded_tool.py")
+        tracemalloc.start()
+        baseline = None
+
+        for version in range(args.reloads):
+            with open(path, "w") as f:
+                f.write(TOOL_SOURCE.format(version=version))
+            with contextlib.redirect_stdout(io.StringIO()):
+                registry.load_tool_file(path)
+            live_modules.add(sys.modules["reloaded_tool"])
+
+            if version == args.warmup:
+                gc.collect()
+                baseline = tracemalloc.get_traced_memory()[0]
+
+        gc.collect()
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            registry.remove_tool_file(path)
+        gc.collect()
+
+    growth_kb = (current - baseline) / 1024
+    print(f"reloads:              {args.reloads}")
+    print(f"tools registered:     {len(registry.tools)}")
+    print(f"live module objects:  {len(live_modules)} (after delete)")
+    print(f"growth after warm-up: {growth_kb:.1f} KiB (budget {args.budget_kb} KiB)")
+
+    if growth_kb > args.budget_kb or len(live_modules) > 0:
+        print("FAIL: reloads are leaking")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
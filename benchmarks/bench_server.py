@@ -0,0 +1,509 @@
+"""
+Load-tests a real Switchblade server: ListTools, CallTool and WatchTools
+latency percentiles, throughput, and the server's CPU and memory.
+
+The server runs in a child process (so its CPU and RSS can be read from /proc)
+against a temporary tools directory of stand-in tools:
+
+    noop      returns immediately
+    sleep     blocks for --sleep-ms (I/O-bound tools)
+    cpu       spins for --cpu-iterations (CPU-bound tools)
+    large     returns --large-kb of JSON (scan dumps, file listings)
+    catalog_* --catalog-size trivial tools, making ListTools expensive
+
+Workers run a closed loop for --duration seconds, each picking the next
+request from --mix. Results can be saved with --output and compared against
+an earlier run with --baseline; a regression beyond --max-regression exits 1.
+
+--workers N runs N server processes on the one port under the supervisor.
+The kernel balances connections, not requests, so pair it with --channels
+(client connections, at least N) to spread the load; CPU and memory are
+then summed over the whole process tree.
+
+    python benchmarks/bench_server.py [--mode thread|aio] [--concurrency 16]
+        [--duration 10] [--mix noop=40,sleep=20,cpu=10,large=10,list=20]
+        [--watchers 0] [--workers 1] [--channels 1]
+        [--output run.json] [--baseline old.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import grpc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# switchblade_pb2_grpc imports switchblade_pb2 as a top-level module
+GENERATED_DIR = os.path.join(REPO_ROOT, "src", "generated")
+sys.path[:0] = [REPO_ROOT, GENERATED_DIR]
+
+from src.generated import switchblade_pb2
+from src.generated import switchblade_pb2_grpc
+
+TOOL_SOURCE = '''import time
+from src.utils.switchblade_decorator import tool
+
+
+@tool(name="noop", description="Returns immediately.", input_schema={"type": "object"})
+def noop(args):
+    return {"ok": True}
+
+
+@tool(name="sleep", description="Blocks like an I/O-bound tool.", input_schema={"type": "object"})
+def sleep(args):
+    time.sleep(args.get("ms", 10) / 1000)
+    return {"ok": True}
+
+
+@tool(name="cpu", description="Burns CPU like a parsing tool.", input_schema={"type": "object"})
+def cpu(args):
+    total = 0
+    for i in range(args.get("iterations", 20000)):
+        total += i * i
+    return {"total": total}
+
+
+@tool(name="large", description="Returns a large result.", input_schema={"type": "object"})
+def large(args):
+    return {"blob": "x" * (args.get("kb", 256) * 1024)}
+'''
+
+CATALOG_TOOL = '''
+
+@tool(
+    name="catalog_{index}",
+    description="Stand-in tool number {index} ({version}).",
+    input_schema={{
+        "type": "object",
+        "properties": {{"target": {{"type": "string"}}, "port": {{"type": "integer"}}}},
+        "required": ["target"],
+    }},
+)
+def catalog_{index}(args):
+    return {{"index": {index}}}
+'''
+
+SERVER_SCRIPT = """
+import sys
+sys.path[:0] = [{root!r}, {generated!r}]
+from src.server import mcp_server
+mcp_server.TOOLS_DIR = {tools_dir!r}
+mcp_server.LISTEN_ADDR = {addr!r}
+mcp_server.serve({mode!r}, workers={workers!r})
+"""
+
+# Fields compared against --baseline, and which direction is worse
+GUARDED = (("p95_ms", 1), ("p99_ms", 1), ("qps", -1))
+
+
+def write_tools(tools_dir, catalog_size, version=0):
+    with open(os.path.join(tools_dir, "bench_tools.py"), "w") as f:
+        f.write(TOOL_SOURCE)
+    write_catalog(tools_dir, catalog_size, version)
+
+
+def write_catalog(tools_dir, catalog_size, version):
+    source = "from src.utils.switchblade_decorator import tool\n"
+    source += "".join(
+        CATALOG_TOOL.format(index=i, version=version) for i in range(catalog_size)
+    )
+    # Written aside and renamed so the watcher never sees a half-written file
+    path = os.path.join(tools_dir, "bench_catalog.py")
+    with open(path + ".tmp", "w") as f:
+        f.write(source)
+    os.replace(path + ".tmp", path)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, tools_dir, addr, env, workers=1):
+    script = SERVER_SCRIPT.format(
+        root=REPO_ROOT,
+        generated=GENERATED_DIR,
+        tools_dir=tools_dir,
+        addr=addr,
+        mode=mode,
+        workers=workers,
+    )
+    return subprocess.Popen(
+        [sys.executable, "-c", script],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(stub, expected_tools, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            tools = stub.ListTools(switchblade_pb2.ListToolsRequest(), timeout=1).tools
+            if len(tools) >= expected_tools:
+                return
+        except grpc.RpcError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not come up")
+
+
+def _process_tree(pid):
+    """pid and all its descendants (Linux)."""
+    pids = [pid]
+    for parent in pids:
+        try:
+            for task in os.listdir(f"/proc/{parent}/task"):
+                with open(f"/proc/{parent}/task/{task}/children") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def process_usage(pid):
+    """
+    (cpu_seconds, rss_mb, peak_rss_mb) of a process and its children, such as
+    supervised server workers. Nones off Linux.
+    """
+    usage = [0.0, 0.0, 0.0]
+    ticks = os.sysconf("SC_CLK_TCK")
+    for member in _process_tree(pid):
+        try:
+            with open(f"/proc/{member}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{member}/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            if member == pid:
+                return None, None, None
+            continue
+        # utime and stime are fields 14 and 15, counted from after the command name
+        usage[0] += (int(fields[11]) + int(fields[12])) / ticks
+        usage[1] += int(status["VmRSS"].split()[0]) / 1024
+        usage[2] += int(status["VmHWM"].split()[0]) / 1024
+    return tuple(usage)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"noop", "sleep", "cpu", "large", "list"}
+    if unknown:
+        raise SystemExit(f"unknown request types in --mix: {sorted(unknown)}")
+    return mix
+
+
+def make_requests(args):
+    call = lambda name, payload: switchblade_pb2.CallToolRequest(
+        tool_name=name, arguments_json=json.dumps(payload)
+    )
+    return {
+        "noop": call("noop", {}),
+        "sleep": call("sleep", {"ms": args.sleep_ms}),
+        "cpu": call("cpu", {"iterations": args.cpu_iterations}),
+        "large": call("large", {"kb": args.large_kb}),
+        "list": switchblade_pb2.ListToolsRequest(),
+    }
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "qps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50_ms": 1000 * percentile(latencies, 0.50),
+        "p95_ms": 1000 * percentile(latencies, 0.95),
+        "p99_ms": 1000 * percentile(latencies, 0.99),
+    }
+
+
+def run_load(stubs, args, mix):
+    """
+    Closed-loop workers spread over the stubs (one per connection); returns
+    {request type: (latencies, errors)} for the measured window.
+    """
+    requests = make_requests(args)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    results = {name: ([], [0]) for name in names}
+    lock = threading.Lock()
+    measure_from = time.monotonic() + args.warmup
+    stop_at = measure_from + args.duration
+
+    def worker(seed, stub):
+        rng = random.Random(seed)
+        local = {name: ([], 0) for name in names}
+        while True:
+            name = rng.choices(names, weights)[0]
+            started = time.monotonic()
+            if started >= stop_at:
+                break
+            ok = True
+            try:
+                if name == "list":
+                    stub.ListTools(requests[name], timeout=args.timeout)
+                else:
+                    ok = not stub.CallTool(requests[name], timeout=args.timeout).is_error
+            except grpc.RpcError:
+                ok = False
+            finished = time.monotonic()
+            if started < measure_from:
+                continue
+            latencies, errors = local[name]
+            if ok:
+                latencies.append(finished - started)
+            local[name] = (latencies, errors + (not ok))
+        with lock:
+            for name, (latencies, errors) in local.items():
+                results[name][0].extend(latencies)
+                results[name][1][0] += errors
+
+    threads = [
+        threading.Thread(
+            target=worker, args=(args.seed + i, stubs[i % len(stubs)]), daemon=True
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {name: (latencies, errors[0]) for name, (latencies, errors) in results.items()}
+
+
+class Watchers:
+    """WatchTools subscribers recording when each notification arrives."""
+
+    def __init__(self, channel, count):
+        self.arrivals = [[] for _ in range(count)]
+        self.calls = []
+        stub = switchblade_pb2_grpc.SwitchbladeServiceStub(channel)
+        for index in range(count):
+            call = stub.WatchTools(switchblade_pb2.WatchToolsRequest())
+            self.calls.append(call)
+            threading.Thread(target=self._drain, args=(call, index), daemon=True).start()
+
+    def _drain(self, call, index):
+        try:
+            for _ in call:
+                self.arrivals[index].append(time.monotonic())
+        except grpc.RpcError:
+            pass
+
+    def close(self):
+        for call in self.calls:
+            call.cancel()
+
+    def fan_out(self, touches):
+        """Delay from each catalog rewrite to the first notification per watcher."""
+        delays = []
+        bounds = list(touches) + [float("inf")]
+        for arrivals in self.arrivals:
+            for touched, next_touch in zip(bounds, bounds[1:]):
+                first = next((t for t in arrivals if touched <= t < next_touch), None)
+                if first is not None:
+                    delays.append(first - touched)
+        expected = len(touches) * len(self.arrivals)
+        return delays, expected - len(delays)
+
+
+def compare(current, baseline, max_regression):
+    """Lines describing regressions of guarded fields beyond max_regression."""
+    failures = []
+    for name, stats in current["requests"].items():
+        before = baseline.get("requests", {}).get(name)
+        if not before:
+            continue
+        for field, worse in GUARDED:
+            old, new = before.get(field), stats.get(field)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * worse
+            if change > max_regression:
+                failures.append(f"{name}.{field}: {old:.2f} -> {new:.2f} ({change:+.0%} worse)")
+    return failures
+
+
+def print_report(report):
+    print(f"{'request':<8} {'count':>8} {'err':>5} {'qps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in list(report["requests"].items()) + [("total", report["total"])]:
+        print(
+            f"{name:<8} {s['count']:>8} {s['errors']:>5} {s['qps']:>9.1f} "
+            f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}"
+        )
+    server = report["server"]
+    if server["cpu_seconds"] is not None:
+        print(
+            f"server: {server['cpu_percent']:.0f}% CPU ({server['cpu_seconds']:.2f}s), "
+            f"RSS {server['rss_mb']:.1f} MiB, peak {server['peak_rss_mb']:.1f} MiB"
+        )
+    watch = report.get("watch")
+    if watch:
+        print(
+            f"watch:  {watch['watchers']} subscribers, {watch['changes']} changes, "
+            f"fan-out incl. reload debounce p50 {watch['p50_ms']:.1f} ms / p99 {watch['p99_ms']:.1f} ms, "
+            f"{watch['missed']} missed"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("thread", "aio"), default="thread")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default="noop=40,sleep=20,cpu=10,large=10,list=20")
+    parser.add_argument("--catalog-size", type=int, default=200)
+    parser.add_argument("--sleep-ms", type=int, default=10)
+    parser.add_argument("--cpu-iterations", type=int, default=20000)
+    parser.add_argument("--large-kb", type=int, default=256)
+    parser.add_argument("--watchers", type=int, default=0)
+    parser.add_argument("--changes", type=int, default=5,
+                        help="catalog rewrites during the run when --watchers is set")
+    parser.add_argument("--workers", type=int, default=1, help="server processes on the port")
+    parser.add_argument("--channels", type=int, default=1, help="client connections")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.20)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    env = dict(os.environ, SWITCHBLADE_METRICS_ADDR="", SWITCHBLADE_TRACE_FILE="")
+    addr = f"127.0.0.1:{free_port()}"
+
+    with tempfile.TemporaryDirectory() as tools_dir:
+        write_tools(tools_dir, args.catalog_size)
+        server = start_server(args.mode, tools_dir, addr, env, args.workers)
+        # A local subchannel pool each, or the channels would share one connection
+        channels = [
+            grpc.insecure_channel(
+                addr,
+                options=[
+                    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+                    ("grpc.use_local_subchannel_pool", 1),
+                ],
+            )
+            for _ in range(max(1, args.channels))
+        ]
+        channel = channels[0]
+        stub = switchblade_pb2_grpc.SwitchbladeServiceStub(channel)
+        watchers = None
+        try:
+            stubs = [switchblade_pb2_grpc.SwitchbladeServiceStub(c) for c in channels]
+            for each in stubs:
+                wait_ready(each, 4 + args.catalog_size)
+            if args.watchers:
+                watchers = Watchers(channel, args.watchers)
+
+            # Catalog rewrites spread over the measured window
+            touches = []
+
+            def touch_catalog():
+                time.sleep(args.warmup)
+                for version in range(1, args.changes + 1):
+                    time.sleep(args.duration / (args.changes + 1))
+                    touches.append(time.monotonic())
+                    write_catalog(tools_dir, args.catalog_size, version)
+
+            toucher = None
+            if watchers is not None:
+                toucher = threading.Thread(target=touch_catalog, daemon=True)
+                toucher.start()
+
+            cpu_before = process_usage(server.pid)[0]
+            results = run_load(stubs, args, mix)
+            cpu_after, rss_mb, peak_mb = process_usage(server.pid)
+            if toucher is not None:
+                toucher.join()
+                # Give the last reload time to fan out
+                time.sleep(1.0)
+        finally:
+            if watchers is not None:
+                watchers.close()
+            for c in channels:
+                c.close()
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    all_latencies = [t for latencies, _ in results.values() for t in latencies]
+    report = {
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "mode", "concurrency", "duration", "warmup", "mix", "catalog_size",
+                "sleep_ms", "cpu_iterations", "large_kb", "watchers", "workers", "channels",
+            )
+        },
+        "requests": {
+            name: summarize(latencies, errors, args.duration)
+            for name, (latencies, errors) in results.items()
+        },
+        "total": summarize(
+            all_latencies, sum(errors for _, errors in results.values()), args.duration
+        ),
+        "server": {
+            "cpu_seconds": None if cpu_before is None else cpu_after - cpu_before,
+            "cpu_percent": None if cpu_before is None
+            else 100 * (cpu_after - cpu_before) / (args.duration + args.warmup),
+            "rss_mb": rss_mb,
+            "peak_rss_mb": peak_mb,
+        },
+    }
+    if watchers is not None:
+        delays, missed = watchers.fan_out(touches)
+        delays.sort()
+        report["watch"] = {
+            "watchers": args.watchers,
+            "changes": len(touches),
+            "missed": missed,
+            "p50_ms": 1000 * percentile(delays, 0.50),
+            "p99_ms": 1000 * percentile(delays, 0.99),
+        }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(report, baseline, args.max_regression)
+        if failures:
+            print(f"FAIL: slower than {args.baseline} by more than {args.max_regression:.0%}")
+            for line in failures:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"OK: within {args.max_regression:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
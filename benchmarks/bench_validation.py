@@ -0,0 +1,107 @@
+"""
+Measures the per-call cost of validating CallTool arguments against a tool's
+compiled input_schema, for valid and invalid arguments.
+
+Validators are compiled once at registration, so only the check itself is on
+the request path.
+
+    python benchmarks/bench_validation.py [--iterations 100000] [--budget-us 20]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.server.validation import compile_validator
+
+SCHEMAS = {
+    "nmap_scan": {
+        "type": "object",
+        "properties": {
+            "target_ip": {"type": "string", "description": "IPv4 address or hostname"},
+            "port": {"type": "integer", "description": "Port number to check (e.g. 21, 22)"},
+        },
+        "required": ["target_ip", "port"],
+    },
+    "retrieve_files": {
+        "type": "object",
+        "properties": {
+            "host": {"type": "string", "minLength": 1},
+            "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+            "protocol": {"enum": ["ftp", "sftp", "smb"]},
+            "paths": {"type": "array", "items": {"type": "string"}, "maxItems": 64},
+            "credentials": {
+                "type": "object",
+                "properties": {
+                    "username": {"type": "string"},
+                    "password": {"type": "string"},
+                },
+                "required": ["username", "password"],
+                "additionalProperties": False,
+            },
+        },
+        "required": ["host", "protocol", "paths"],
+    },
+}
+
+ARGUMENTS = {
+    "nmap_scan": (
+        {"target_ip": "10.0.0.5", "port": 22},
+        {"target_ip": "10.0.0.5", "port": "22"},
+    ),
+    "retrieve_files": (
+        {
+            "host": "files.internal",
+            "port": 21,
+            "protocol": "ftp",
+            "paths": [f"/bank_data/file_{i}.txt" for i in range(16)],
+            "credentials": {"username": "alice", "password": "hunter2"},
+        },
+        {
+            "host": "",
+            "port": 0,
+            "protocol": "http",
+            "paths": ["/a", 2],
+            "credentials": {"username": "alice", "token": "x"},
+        },
+    ),
+}
+
+
+def measure(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument(
+        "--budget-us", type=float, default=20.0,
+        help="fail if a valid call costs more than this many microseconds",
+    )
+    args = parser.parse_args()
+
+    print(f"{'schema':<18}{'arguments':<12}{'us/call':>10}{'errors':>8}")
+    over_budget = False
+    for name, schema in SCHEMAS.items():
+        validate = compile_validator(json.dumps(schema))
+        for label, value in zip(("valid", "invalid"), ARGUMENTS[name]):
+            us = measure(lambda: validate(value), args.iterations)
+            print(f"{name:<18}{label:<12}{us:>10.2f}{len(validate(value)):>8}")
+            if label == "valid" and us > args.budget_us:
+                over_budget = True
+
+    if over_budget:
+        print(f"❌ Validating valid arguments costs more than {args.budget_us}us")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import json
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Fixed cost of a message in the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Tool results of earlier turns are cut down to this before turns are dropped
+COMPACTED_TOOL_RESULT_TOKENS = 200
+
+
+def make_token_counter(model):
+    """Exact counts with tiktoken when it is installed, ~4 chars per token otherwise."""
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    return lambda text: (len(text) + 3) // 4
+
+
+def _summarize(value, max_items, max_chars, depth=0):
+    """Keeps the shape of a JSON value while cutting long lists and strings."""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return value[:max_chars] + f"... [{len(value) - max_chars} chars omitted]"
+    if depth >= 6:
+        return "..."
+    if isinstance(value, list):
+        kept = [_summarize(item, max_items, max_chars, depth + 1) for item in value[:max_items]]
+        if len(value) > max_items:
+            kept.append(f"... {len(value) - max_items} more items")
+        return kept
+    if isinstance(value, dict):
+        items = list(value.items())
+        kept = {
+            key: _summarize(item, max_items, max_chars, depth + 1)
+            for key, item in items[: max_items * 2]
+        }
+        if len(items) > max_items * 2:
+            kept["..."] = f"{len(items) - max_items * 2} more keys"
+        return kept
+    return value
+
+
+def _clip(text, max_tokens, count):
+    """Keeps the head and tail of a text, which is where errors and totals live."""
+    budget = max(max_tokens, 16) * 4
+    while True:
+        head, tail = budget * 2 // 3, budget // 3
+        clipped = (
+            f"{text[:head]}\n... [truncated {len(text) - head - tail} of {len(text)} characters]"
+            f" ...\n{text[len(text) - tail:]}"
+        )
+        if count(clipped) <= max_tokens or budget <= 64:
+            return clipped
+        budget = budget * 3 // 4
+
+
+def shrink_tool_result(text, max_tokens, count):
+    """
+    Fits a tool result into max_tokens. JSON keeps its structure with long
+    lists and strings summarized; anything else keeps its head and tail.
+    """
+    if count(text) <= max_tokens:
+        return text
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+    if isinstance(value, (dict, list)):
+        for max_items in (50, 20, 8, 3):
+            summary = json.dumps(_summarize(value, max_items, max_items * 40))
+            if count(summary) <= max_tokens:
+                return summary
+    return _clip(text, max_tokens, count)
+
+
+def assistant_message(message):
+    """An OpenAI ChatCompletionMessage as a plain dict, so it can be measured and resent."""
+    if isinstance(message, dict):
+        return message
+    data = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        data["tool_calls"] = [
+            {
+                "id": call.id,
+                "type": "function",
+                "function": {"name": call.function.name, "arguments": call.function.arguments},
+            }
+            for call in message.tool_calls
+        ]
+    return data
+
+
+class _Turn:
+    """One user message and everything answering it, dropped only as a whole."""
+
+    __slots__ = ("messages", "tokens")
+
+    def __init__(self, message, tokens):
+        self.messages = [message]
+        self.tokens = [tokens]
+
+    def total(self):
+        return sum(self.tokens)
+
+
+class ConversationContext:
+    """
+    The chat history sent to the model, kept under a token budget.
+
+    Tool results are shrunk as they are added. When the history outgrows the
+    budget, tool results of earlier turns are compacted first, then the
+    oldest turns are dropped and remembered as one-line summaries. A turn is
+    only ever dropped whole, so every tool message keeps the assistant
+    tool_call it answers. The system prompt is merged into the first user
+    message that is sent, as the model API expects.
+    """
+
+    def __init__(
+        self,
+        system_prompt,
+        max_tokens=24000,
+        tool_result_tokens=4000,
+        summary_tokens=1000,
+        model="gpt-4o-mini",
+        count=None,
+    ):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.tool_result_tokens = tool_result_tokens
+        self.summary_tokens = summary_tokens
+        self.count = count or make_token_counter(model)
+        self.turns = []
+        self.summaries = []  # one line per dropped turn, oldest first
+        self.dropped_turns = 0
+        self._system_tokens = self.count(system_prompt)
+
+    def _measure(self, message):
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count(message.get("content") or "")
+        if message.get("tool_calls"):
+            tokens += self.count(json.dumps(message["tool_calls"]))
+        return tokens
+
+    def _append(self, message):
+        if not self.turns:
+            raise ValueError("a conversation starts with a user message")
+        turn = self.turns[-1]
+        turn.messages.append(message)
+        turn.tokens.append(self._measure(message))
+
+    def add_user(self, content):
+        """Starts a new turn."""
+        message = {"role": "user", "content": content}
+        self.turns.append(_Turn(message, self._measure(message)))
+
+    def add_assistant(self, message):
+        self._append(assistant_message(message))
+
+    def add_tool_result(self, tool_call_id, name, content):
+        content = shrink_tool_result(content or "{}", self.tool_result_tokens, self.count)
+        self._append({
+            "role": "tool",
+            "tool_call_id": tool_call_id,
+            "name": name,
+            "content": content,
+        })
+
+    def total_tokens(self):
+        summary = sum(self.count(line) for line in self.summaries)
+        return self._system_tokens + summary + sum(turn.total() for turn in self.turns)
+
+    def messages(self, reserve_tokens=0):
+        """
+        The history to send, compacted to fit the budget minus `reserve_tokens`
+        (e.g. the tool schemas that go with the request).
+        """
+        budget = self.max_tokens - reserve_tokens
+        if self.total_tokens() > budget:
+            self._compact(budget)
+        return self._render()
+
+    def _compact(self, budget):
+        # 1. Earlier turns' tool results were already used by the model
+        for turn in self.turns[:-1]:
+            self._shrink_tools(turn, COMPACTED_TOOL_RESULT_TOKENS)
+            if self.total_tokens() <= budget:
+                return
+
+        # 2. Oldest turns go, leaving a line each so the model keeps the thread
+        while len(self.turns) > 1 and self.total_tokens() > budget:
+            self._summarize_turn(self.turns.pop(0))
+            self.dropped_turns += 1
+        while sum(self.count(line) for line in self.summaries) > self.summary_tokens:
+            self.summaries.pop(0)
+
+        # 3. The current turn alone is too big: share what is left among its results
+        if self.total_tokens() > budget:
+            turn = self.turns[-1]
+            results = sum(1 for message in turn.messages if message["role"] == "tool")
+            if results:
+                spare = budget - (self.total_tokens() - self._tool_tokens(turn))
+                self._shrink_tools(turn, max(64, spare // results))
+
+        # 4. Last resort, the summaries themselves
+        while self.summaries and self.total_tokens() > budget:
+            self.summaries.pop(0)
+
+    def _tool_tokens(self, turn):
+        return sum(
+            tokens
+            for message, tokens in zip(turn.messages, turn.tokens)
+            if message["role"] == "tool"
+        )
+
+    def _shrink_tools(self, turn, max_tokens):
+        for index, message in enumerate(turn.messages):
+            if message["role"] != "tool" or turn.tokens[index] <= max_tokens:
+                continue
+            content = shrink_tool_result(message["content"], max_tokens, self.count)
+            turn.messages[index] = dict(message, content=content)
+            turn.tokens[index] = self._measure(turn.messages[index])
+
+    def _summarize_turn(self, turn):
+        asked = turn.messages[0]["content"]
+        tools = [
+            message["name"] for message in turn.messages if message["role"] == "tool"
+        ]
+        replies = [
+            message["content"]
+            for message in turn.messages
+            if message["role"] == "assistant" and message.get("content")
+        ]
+        line = f"- User asked: {asked[:200]}"
+        if tools:
+            line += f" | tools used: {', '.join(tools)}"
+        if replies:
+            line += f" | you answered: {replies[-1][:300]}"
+        self.summaries.append(line)
+
+    def _render(self):
+        messages = [message for turn in self.turns for message in turn.messages]
+        if not messages:
+            return messages
+        preamble = self.system_prompt
+        if self.summaries:
+            preamble += "\n\nEarlier in this conversation (summarized):\n" + "\n".join(
+                self.summaries
+            )
+        first = messages[0]
+        messages[0] = dict(first, content=f"{preamble}\n\nUser Query: {first['content']}")
+        return messages
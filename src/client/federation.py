@@ -0,0 +1,373 @@
+import time
+import itertools
+import threading
+
+import grpc
+
+try:
+    from ..generated import switchblade_pb2
+    from ..generated import switchblade_pb2_grpc
+    from ..utils import grpc_options
+    from .tool_catalog import ToolCatalog, to_openai_tool
+except ImportError:
+    from src.generated import switchblade_pb2
+    from src.generated import switchblade_pb2_grpc
+    from src.utils import grpc_options
+    from src.client.tool_catalog import ToolCatalog, to_openai_tool
+
+# Separates the server alias from the tool name when two servers disagree on
+# what a tool is; OpenAI function names allow [a-zA-Z0-9_-]
+NAMESPACE_SEPARATOR = "__"
+
+# Codes meaning the server is gone or unreachable, so the endpoint is
+# suspect. The call may still have run (the server can die mid-call), so only
+# idempotent tools are retried on another replica.
+_FAILOVER_CODES = (grpc.StatusCode.UNAVAILABLE,)
+
+
+def parse_endpoints(text):
+    """
+    "host:port,host:port" or "alias=host:port,...". Aliases default to s1, s2,
+    ... and only show up in namespaced tool names.
+    """
+    endpoints = []
+    for index, part in enumerate(p.strip() for p in text.split(",") if p.strip()):
+        alias, _, addr = part.rpartition("=")
+        endpoints.append((alias or f"s{index + 1}", addr))
+    return endpoints
+
+
+class Endpoint:
+    """One Switchblade server: its channel, catalog and health."""
+
+    def __init__(self, alias, addr, eject_after=1, base_ejection=1.0, max_ejection=30.0):
+        self.alias = alias
+        self.addr = addr
+        self.channel = grpc.insecure_channel(addr, options=grpc_options.channel_options())
+        self.stub = switchblade_pb2_grpc.SwitchbladeServiceStub(self.channel)
+        self.catalog = ToolCatalog(self.stub)
+        self.eject_after = eject_after
+        self.base_ejection = base_ejection
+        self.max_ejection = max_ejection
+
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.completed = 0
+        self.failures = 0  # consecutive
+        self.ejected_until = 0.0
+
+    def healthy(self, now):
+        return self.ejected_until <= now
+
+    def begin(self):
+        with self.lock:
+            self.outstanding += 1
+
+    def end(self, error=None):
+        with self.lock:
+            self.outstanding -= 1
+            self.completed += 1
+            if error is None or error not in _FAILOVER_CODES:
+                self.failures = 0
+                self.ejected_until = 0.0
+                return
+            now = time.monotonic()
+            if not self.healthy(now):
+                # Calls that were already in flight when it went down
+                return
+            self.failures += 1
+            if self.failures >= self.eject_after:
+                # Back off exponentially while it keeps failing its probes
+                backoff = self.base_ejection * 2 ** (self.failures - self.eject_after)
+                self.ejected_until = now + min(backoff, self.max_ejection)
+                print(f"⚠️  Ejected {self.alias} ({self.addr}) for {min(backoff, self.max_ejection):.1f}s")
+
+    def close(self):
+        self.catalog.stop()
+        self.channel.close()
+
+
+class _Route:
+    """
+    Where a tool name of the merged catalog goes: its real name and replicas.
+    Idempotent when every replica declares it so, which allows retries.
+    """
+
+    __slots__ = ("tool_name", "endpoints", "idempotent", "counter")
+
+    def __init__(self, tool_name, endpoints, idempotent=False):
+        self.tool_name = tool_name
+        self.endpoints = endpoints
+        self.idempotent = idempotent
+        self.counter = itertools.count()
+
+
+class FederatedCatalog:
+    """
+    ToolCatalog look-alike over several servers. Tools with the same name and
+    definition on several servers are one tool with replicas. When servers
+    disagree on a tool's definition, each variant is exposed as
+    "<alias>__<name>" so the model can tell them apart.
+    """
+
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+        self.lock = threading.Lock()
+        self.tools = {}  # exposed name -> switchblade_pb2.Tool
+        self.routes = {}  # exposed name -> _Route
+        self._openai_tools = []
+        self._versions = None
+
+    def refresh(self):
+        """Syncs every reachable server; raises only when none answers."""
+        errors = []
+        for endpoint in self.endpoints:
+            try:
+                endpoint.catalog.refresh()
+            except grpc.RpcError as e:
+                errors.append(e)
+                print(f"⚠️  {endpoint.alias} ({endpoint.addr}) unreachable: {e.details()}")
+        if len(errors) == len(self.endpoints):
+            raise errors[0]
+        return self._merge()
+
+    def start(self):
+        for endpoint in self.endpoints:
+            endpoint.catalog.start()
+
+    def stop(self):
+        for endpoint in self.endpoints:
+            endpoint.catalog.stop()
+
+    @property
+    def codecs(self):
+        """Codecs every server decodes; a call may be routed to any of them."""
+        first, *rest = [endpoint.catalog.codecs for endpoint in self.endpoints]
+        return tuple(c for c in first if all(c in codecs for codecs in rest))
+
+    def openai_tools(self):
+        self._merge()
+        with self.lock:
+            return self._openai_tools
+
+    def route(self, tool_name):
+        self._merge()
+        with self.lock:
+            return self.routes.get(tool_name)
+
+    def _merge(self):
+        """Rebuilds the merged view when any server's catalog version moved."""
+        versions = tuple(endpoint.catalog.version for endpoint in self.endpoints)
+        if versions == self._versions:
+            return False
+
+        variants = {}  # tool name -> {definition -> (Tool, [endpoints])}
+        idempotent = {}  # tool name -> declared idempotent by every server
+        for endpoint in self.endpoints:
+            with endpoint.catalog.lock:
+                tools = list(endpoint.catalog.tools.items())
+            for name, t in tools:
+                definition = (t.description, t.input_schema_json)
+                entry = variants.setdefault(name, {}).setdefault(definition, (t, []))
+                entry[1].append(endpoint)
+                idempotent[name] = idempotent.get(name, True) and t.idempotent
+
+        tools, routes, openai_tools = {}, {}, []
+        for name, definitions in variants.items():
+            if len(definitions) == 1:
+                (t, endpoints), = definitions.values()
+                exposed = [(name, t, endpoints)]
+            else:
+                exposed = []
+                for t, endpoints in definitions.values():
+                    for endpoint in endpoints:
+                        exposed.append(
+                            (f"{endpoint.alias}{NAMESPACE_SEPARATOR}{name}", t, [endpoint])
+                        )
+            for exposed_name, t, endpoints in exposed:
+                tool = switchblade_pb2.Tool()
+                tool.CopyFrom(t)
+                tool.name = exposed_name
+                tools[exposed_name] = tool
+                routes[exposed_name] = _Route(name, endpoints, idempotent[name])
+                openai_tools.append(to_openai_tool(tool))
+
+        with self.lock:
+            self.tools = tools
+            self.routes = routes
+            self._openai_tools = openai_tools
+            self._versions = versions
+        return True
+
+
+class _FederatedFuture:
+    """
+    CallTool.future() result that fails over to another replica when the
+    chosen server turns out to be unavailable and the tool is idempotent.
+    """
+
+    def __init__(self, federation, route, request, kwargs, deadline):
+        self.federation = federation
+        self.route = route
+        self.request = request
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.tried = set()
+        self.cancelled = False
+        self._start()
+
+    def _start(self):
+        self.endpoint = self.federation._pick(self.route, self.tried)
+        self.tried.add(self.endpoint)
+        self.endpoint.begin()
+        kwargs = dict(self.kwargs)
+        if self.deadline is not None:
+            kwargs["timeout"] = max(0.0, self.deadline - time.monotonic())
+        self.future = self.endpoint.stub.CallTool.future(self.request, **kwargs)
+        endpoint = self.endpoint
+        self.future.add_done_callback(lambda f: endpoint.end(_status(f)))
+
+    def result(self, timeout=None):
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if give_up is None else max(0.0, give_up - time.monotonic())
+            try:
+                return self.future.result(timeout=remaining)
+            except grpc.RpcError as e:
+                if self.cancelled or not self.federation._can_fail_over(e, self.route, self.tried):
+                    raise
+            self._start()
+
+    def cancel(self):
+        self.cancelled = True
+        return self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+
+class _FailedFuture:
+    """A call that could not be routed, failing the way a gRPC future would."""
+
+    def __init__(self, error):
+        self.error = error
+
+    def result(self, timeout=None):
+        raise self.error
+
+    def cancel(self):
+        return False
+
+    def done(self):
+        return True
+
+
+def _status(future):
+    if future.cancelled():
+        return grpc.StatusCode.CANCELLED
+    error = future.exception()
+    return None if error is None else error.code()
+
+
+class _CallTool:
+    """stub.CallTool replacement: callable, with .future() like a gRPC multicallable."""
+
+    def __init__(self, federation):
+        self.federation = federation
+
+    def __call__(self, request, timeout=None, **kwargs):
+        return self.future(request, timeout=timeout, **kwargs).result()
+
+    def future(self, request, timeout=None, **kwargs):
+        route, request = self.federation._resolve(request)
+        if route is None:
+            return _FailedFuture(_NotFound(request.tool_name))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return _FederatedFuture(self.federation, route, request, kwargs, deadline)
+
+
+class _NotFound(grpc.RpcError):
+    def __init__(self, tool_name):
+        self.tool_name = tool_name
+
+    def code(self):
+        return grpc.StatusCode.NOT_FOUND
+
+    def details(self):
+        return f"Tool '{self.tool_name}' is not served by any configured server"
+
+
+class Federation:
+    """
+    A stub-like front for several Switchblade servers. ListTools comes from
+    the merged FederatedCatalog; CallTool and CallToolStream are routed to a
+    server that has the tool. Replicas are picked round-robin or by fewest
+    outstanding requests. A replica that fails with UNAVAILABLE is ejected
+    for an exponentially growing while. Calls of idempotent tools then move
+    to another replica; any other call fails, since it may already have run.
+    """
+
+    def __init__(self, endpoints, policy="round_robin", eject_after=1):
+        if policy not in ("round_robin", "least_outstanding"):
+            raise ValueError(f"unknown load-balancing policy {policy!r}")
+        self.policy = policy
+        self.endpoints = [
+            Endpoint(alias, addr, eject_after=eject_after) for alias, addr in endpoints
+        ]
+        self.catalog = FederatedCatalog(self.endpoints)
+        self.CallTool = _CallTool(self)
+
+    def ListTools(self, request, timeout=None, **kwargs):
+        self.catalog.refresh()
+        with self.catalog.lock:
+            tools = list(self.catalog.tools.values())
+        return switchblade_pb2.ListToolsResponse(tools=tools, codecs=self.catalog.codecs)
+
+    def CallToolStream(self, request, timeout=None, **kwargs):
+        route, request = self._resolve(request)
+        if route is None:
+            raise _NotFound(request.tool_name)
+        endpoint = self._pick(route, set())
+        endpoint.begin()
+        error = None
+        try:
+            yield from endpoint.stub.CallToolStream(request, timeout=timeout, **kwargs)
+        except grpc.RpcError as e:
+            error = e.code()
+            raise
+        finally:
+            endpoint.end(error)
+
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.close()
+
+    def _resolve(self, request):
+        """The route for a request, and the request with the server-side tool name."""
+        route = self.catalog.route(request.tool_name)
+        if route is None or route.tool_name == request.tool_name:
+            return route, request
+        routed = type(request)()
+        routed.CopyFrom(request)
+        routed.tool_name = route.tool_name
+        return route, routed
+
+    def _pick(self, route, tried):
+        now = time.monotonic()
+        candidates = [e for e in route.endpoints if e not in tried] or list(route.endpoints)
+        healthy = [e for e in candidates if e.healthy(now)]
+        if not healthy:
+            # Everything is ejected: probe the one that has waited longest
+            return min(candidates, key=lambda e: e.ejected_until)
+        if self.policy == "least_outstanding":
+            # Rotating the start keeps ties from always landing on the first replica
+            start = next(route.counter) % len(healthy)
+            rotated = healthy[start:] + healthy[:start]
+            return min(rotated, key=lambda e: e.outstanding)
+        return healthy[next(route.counter) % len(healthy)]
+
+    def _can_fail_over(self, error, route, tried):
+        if not route.idempotent or error.code() not in _FAILOVER_CODES:
+            return False
+        now = time.monotonic()
+        return any(e not in tried and e.healthy(now) for e in route.endpoints)
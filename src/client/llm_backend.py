@@ -0,0 +1,234 @@
+import re
+import json
+import time
+import itertools
+import threading
+
+
+class FunctionCall:
+    __slots__ = ("name", "arguments")
+
+    def __init__(self, name, arguments):
+        self.name = name
+        self.arguments = arguments
+
+
+class ToolCall:
+    """Shaped like the OpenAI SDK's tool call, so callers need not care which backend ran."""
+
+    __slots__ = ("id", "type", "function")
+
+    def __init__(self, id, name, arguments):
+        self.id = id
+        self.type = "function"
+        self.function = FunctionCall(name, arguments)
+
+
+class Completion:
+    """A finished assistant message plus how long it took to start and finish."""
+
+    def __init__(self, content, tool_calls, time_to_first_token, elapsed):
+        self.content = content
+        self.tool_calls = tool_calls or None
+        self.time_to_first_token = time_to_first_token
+        self.elapsed = elapsed
+
+
+class LLMBackend:
+    """
+    What run_chat_loop needs from a model. complete() returns a Completion;
+    text is also handed to on_token(text) piece by piece as it is generated.
+    """
+
+    model = None
+
+    def complete(self, messages, tools=None, on_token=None):
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Chat completions over the OpenAI API, or any OpenAI-compatible server via
+    base_url (vLLM, Ollama, LM Studio). The SDK client is built on first use,
+    so importing the client costs nothing and needs no API key.
+    """
+
+    def __init__(self, model, api_key=None, base_url=None, timeout=60.0, max_retries=2, stream=True):
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        # Retries cover failed or throttled requests; a stream that breaks
+        # halfway is reported, not replayed
+        self.max_retries = max_retries
+        self.stream = stream
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                )
+            return self._client
+
+    def complete(self, messages, tools=None, on_token=None):
+        request = {"model": self.model, "messages": messages}
+        if tools:
+            request["tools"] = tools
+            request["tool_choice"] = "auto"
+        started = time.perf_counter()
+
+        if not self.stream:
+            message = self.client.chat.completions.create(**request).choices[0].message
+            elapsed = time.perf_counter() - started
+            if message.content and on_token is not None:
+                on_token(message.content)
+            tool_calls = [
+                ToolCall(call.id, call.function.name, call.function.arguments)
+                for call in message.tool_calls or ()
+            ]
+            return Completion(message.content, tool_calls, elapsed, elapsed)
+
+        first_token = None
+        content = []
+        calls = {}  # index -> [id, name, argument pieces]
+        for chunk in self.client.chat.completions.create(stream=True, **request):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if first_token is None and (delta.content or delta.tool_calls):
+                first_token = time.perf_counter() - started
+            if delta.content:
+                content.append(delta.content)
+                if on_token is not None:
+                    on_token(delta.content)
+            # Tool calls arrive as fragments keyed by index: id and name once,
+            # the JSON arguments spread over many chunks
+            for fragment in delta.tool_calls or ():
+                call = calls.setdefault(fragment.index, [None, "", []])
+                if fragment.id:
+                    call[0] = fragment.id
+                if fragment.function is not None:
+                    if fragment.function.name:
+                        call[1] += fragment.function.name
+                    if fragment.function.arguments:
+                        call[2].append(fragment.function.arguments)
+
+        elapsed = time.perf_counter() - started
+        tool_calls = [
+            ToolCall(call_id, name, "".join(arguments) or "{}")
+            for _, (call_id, name, arguments) in sorted(calls.items())
+        ]
+        return Completion(
+            "".join(content) if content else None,
+            tool_calls,
+            elapsed if first_token is None else first_token,
+            elapsed,
+        )
+
+
+# Placeholder arguments by JSON Schema type, for FakeBackend tool calls
+_SAMPLE_VALUES = {
+    "string": "127.0.0.1",
+    "integer": 22,
+    "number": 1.0,
+    "boolean": False,
+    "array": [],
+    "object": {},
+}
+
+
+def _sample_arguments(schema):
+    arguments = {}
+    properties = schema.get("properties", {})
+    for name in schema.get("required", ()):
+        spec = properties.get(name, {})
+        if "default" in spec:
+            arguments[name] = spec["default"]
+        elif spec.get("enum"):
+            arguments[name] = spec["enum"][0]
+        else:
+            kind = spec.get("type", "string")
+            arguments[name] = _SAMPLE_VALUES.get(kind if isinstance(kind, str) else kind[0], "")
+    return arguments
+
+
+class FakeBackend(LLMBackend):
+    """
+    Local stand-in model for offline runs and benchmarks. It calls every tool
+    the user names in their message (with placeholder arguments for the
+    required fields), otherwise it answers directly. After tool results it
+    replies with a short digest of them. Text streams word by word with
+    configurable delays, so time-to-first-token behaves like a real model.
+    """
+
+    model = "fake"
+
+    def __init__(self, first_token_delay=0.05, token_delay=0.002, max_words=40):
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.max_words = max_words
+        self._ids = itertools.count(1)
+
+    def complete(self, messages, tools=None, on_token=None):
+        started = time.perf_counter()
+        time.sleep(self.first_token_delay)
+        last = messages[-1]
+        # The first user message also carries the system prompt
+        text = (last.get("content") or "").rpartition("User Query: ")[2]
+
+        if last["role"] == "user" and tools:
+            words = set(re.findall(r"\w+", text))
+            wanted = [t["function"] for t in tools if t["function"]["name"] in words]
+            if wanted:
+                tool_calls = [
+                    ToolCall(
+                        f"call_{next(self._ids)}",
+                        function["name"],
+                        json.dumps(_sample_arguments(function.get("parameters") or {})),
+                    )
+                    for function in wanted
+                ]
+                elapsed = time.perf_counter() - started
+                return Completion(None, tool_calls, elapsed, elapsed)
+
+        if last["role"] == "tool":
+            results = []
+            for message in reversed(messages):
+                if message["role"] != "tool":
+                    break
+                results.append(f"{message['name']} returned {message['content'][:60]}")
+            words = ("Here is what the tools found: " + "; ".join(reversed(results))).split()
+        else:
+            words = f"You said: {text}".split()
+        words = words[: self.max_words]
+
+        first_token = time.perf_counter() - started
+        pieces = []
+        for index, word in enumerate(words):
+            piece = word if index == 0 else " " + word
+            pieces.append(piece)
+            if on_token is not None:
+                on_token(piece)
+            time.sleep(self.token_delay)
+        return Completion("".join(pieces), None, first_token, time.perf_counter() - started)
+
+
+def make_backend(name, model, api_key=None, base_url=None, timeout=60.0, max_retries=2):
+    """
+    Backend for SWITCHBLADE_LLM_BACKEND: "openai" (also OpenAI-compatible
+    servers) or "fake". The fake ignores the connection options.
+    """
+    if name == "openai":
+        return OpenAIBackend(model, api_key, base_url, timeout, max_retries)
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"unknown LLM backend {name!r}, expected 'openai' or 'fake'")
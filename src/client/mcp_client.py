@@ -2,12 +2,19 @@ import grpc
 import json
 import os
 import sys
-from openai import OpenAI
+import time
 
 # --- IMPORT GENERATED PROTOBUF FILES ---
 try:
     from ..generated import switchblade_pb2
     from ..generated import switchblade_pb2_grpc
+    from ..utils import payload_codecs
+    from ..utils import tracing
+    from ..utils import grpc_options
+    from .tool_catalog import ToolCatalog
+    from .federation import Federation, parse_endpoints
+    from .context_budget import ConversationContext
+    from .llm_backend import make_backend
 except ImportError:
     # When running directly, add parent directory to path
     sys.path.insert(
@@ -15,6 +22,13 @@ except ImportError:
     )
     from src.generated import switchblade_pb2
     from src.generated import switchblade_pb2_grpc
+    from src.utils import payload_codecs
+    from src.utils import tracing
+    from src.utils import grpc_options
+    from src.client.tool_catalog import ToolCatalog
+    from src.client.federation import Federation, parse_endpoints
+    from src.client.context_budget import ConversationContext
+    from src.client.llm_backend import make_backend
 
 
 # Use OpenAI's hosted API (no base_url needed)
@@ -23,89 +37,155 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # preferred
 # ✅ OpenAI model
 MODEL_NAME = "gpt-4o-mini"
 
+# "openai" (hosted, or any OpenAI-compatible server via SWITCHBLADE_LLM_BASE_URL)
+# or "fake", a local stand-in that needs no network or key
+LLM_BACKEND = os.getenv("SWITCHBLADE_LLM_BACKEND", "openai")
+LLM_BASE_URL = os.getenv("SWITCHBLADE_LLM_BASE_URL") or None
+LLM_TIMEOUT_SECONDS = float(os.getenv("SWITCHBLADE_LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("SWITCHBLADE_LLM_RETRIES", "2"))
+
 # Switchblade gRPC Server Address
 GRPC_SERVER_ADDR = "localhost:50051"
 
+# Several servers, "host:port,host:port" (or "alias=host:port,..."), are
+# federated: their catalogs merge and each call goes to a server with the
+# tool. Replicas are balanced "round_robin" or "least_outstanding".
+SERVERS = os.getenv("SWITCHBLADE_SERVERS", GRPC_SERVER_ADDR)
+LB_POLICY = os.getenv("SWITCHBLADE_LB_POLICY", "round_robin")
+
+# Payload codec for CallTool: "orjson", "json", "msgpack", "protobuf_value",
+# or "legacy" for the plain arguments_json/content_json strings. Arguments
+# switch to it only once the server lists it in ListTools; results whenever
+# the server supports it.
+PAYLOAD_CODEC = os.getenv("SWITCHBLADE_CODEC", "orjson")
 
-client = OpenAI(
-    api_key=OPENAI_API_KEY
-)
+# Overall budget for all tool calls of one turn; stragglers are cancelled
+TURN_DEADLINE_SECONDS = float(os.getenv("SWITCHBLADE_TURN_DEADLINE", "120"))
 
+# Tokens of history (plus tool schemas) sent per request; older turns are
+# compacted and then summarized away. Single tool results are cut to the
+# second limit before they enter the history.
+CONTEXT_TOKENS = int(os.getenv("SWITCHBLADE_CONTEXT_TOKENS", "24000"))
+TOOL_RESULT_TOKENS = int(os.getenv("SWITCHBLADE_TOOL_RESULT_TOKENS", "4000"))
 
 
-def get_tools_from_server(stub):
+
+def _build_call_request(tool_name, args_dict, server_codecs=()):
     """
-    Fetches tools from Switchblade via gRPC and converts them
-    to the OpenAI 'function' schema format required by the LLM.
+    CallToolRequest with the arguments in the preferred codec when the server
+    advertised it (server_codecs, from ListTools), else in arguments_json.
     """
-    print(f"🔌 Connecting to Switchblade ({GRPC_SERVER_ADDR})...")
-    try:
-        response = stub.ListTools(switchblade_pb2.Empty())
-    except grpc.RpcError as e:
-        print(f"❌ Connection failed: {e.details()}")
-        sys.exit(1)
-
-    openai_tools = []
-    for t in response.tools:
-        # Convert gRPC tool definition to OpenAI format
-        try:
-            # We use the input_schema_json sent by the server
-            parameters = json.loads(t.input_schema_json)
-        except json.JSONDecodeError:
-            parameters = {}
-
-        openai_tools.append(
-            {
-                "type": "function",
-                "function": {
-                    "name": t.name,
-                    "description": t.description,
-                    "parameters": parameters,
-                },
-            }
+    codec = payload_codecs.CODEC_UNSPECIFIED
+    accept_codecs = []
+    if PAYLOAD_CODEC != "legacy":
+        preferred = (payload_codecs.codec_by_name(PAYLOAD_CODEC), payload_codecs.CODEC_JSON)
+        accept_codecs = [c for c in preferred if c in payload_codecs.available_codecs()]
+        codec = next((c for c in accept_codecs if c in server_codecs), codec)
+
+    if codec == payload_codecs.CODEC_UNSPECIFIED:
+        # Older servers ignore accept_codecs and answer in content_json
+        return switchblade_pb2.CallToolRequest(
+            tool_name=tool_name,
+            arguments_json=json.dumps(args_dict),
+            accept_codecs=accept_codecs,
         )
-
-    print(
-        f"✅ Discovered {len(openai_tools)} tools: {[t['function']['name'] for t in openai_tools]}"
+    return switchblade_pb2.CallToolRequest(
+        tool_name=tool_name,
+        arguments=payload_codecs.encode(args_dict, codec),
+        codec=codec,
+        accept_codecs=accept_codecs,
     )
-    return openai_tools
 
 
-def execute_tool_on_server(stub, tool_name, args_dict):
-    """
-    Sends the execution request to the Switchblade server via gRPC.
-    """
-    print(f"⚙️  Executing tool: {tool_name}...")
-    print(f"   Args: {args_dict}")
+def _response_text(response):
+    """Turns a CallToolResponse into the string handed to the LLM."""
+    if response.is_error:
+        result = f"Error: {response.error_message}"
+        print(f"❌ Tool Failed: {result}")
+        return result
 
-    request = switchblade_pb2.CallToolRequest(
-        tool_name=tool_name, arguments_json=json.dumps(args_dict)
-    )
+    if response.codec:
+        # JSON codecs arrive as JSON text already, no re-encode needed
+        content = payload_codecs.to_json_text(response.content, response.codec)
+    else:
+        content = response.content_json
+    #if the response.json is empty then openai throw error 400 because it do not allow the none value 
+    if not content:
+        return"{}"
 
-    try:
-        response = stub.CallTool(request)
-        if response.is_error:
-            result = f"Error: {response.error_message}"
-            print(f"❌ Tool Failed: {result}")
-            return result
-        #if the response.json is empty then openai throw error 400 because it do not allow the none value 
-        if not response.content_json:
-            return"{}"
-
-        print(f"✅ Tool Success. Result size: {len(response.content_json)} bytes")
-        return response.content_json
+    print(f"✅ Tool Success. Result size: {len(content)} bytes")
+    return content
 
-    except grpc.RpcError as e:
-        return f"RPC Connection Error: {e.details()}"
 
+def execute_tools_concurrently(
+    stub, calls, timeout=TURN_DEADLINE_SECONDS, parent=None, server_codecs=()
+):
+    """
+    Starts every (tool_name, args_dict) call at once on the channel and waits
+    at most `timeout` seconds for the whole set. Calls still outstanding after
+    that are cancelled. Results are returned in the order of `calls`.
+    """
+    deadline = time.monotonic() + timeout
+    in_flight = []
+    spans = []
+    for tool_name, args_dict in calls:
+        print(f"⚙️  Executing tool: {tool_name}...")
+        print(f"   Args: {args_dict}")
+        span = tracing.start_span("CallTool", parent, tool=tool_name)
+        spans.append(span)
+        request = _build_call_request(tool_name, args_dict, server_codecs)
+        # The RPC deadline matches the turn deadline so the server stops too
+        in_flight.append(
+            stub.CallTool.future(
+                request,
+                timeout=timeout,
+                metadata=tracing.inject(span),
+                compression=grpc_options.compression_for(request.ByteSize()),
+            )
+        )
 
-def run_chat_loop():
-    # 1. Setup gRPC Channel
-    channel = grpc.insecure_channel(GRPC_SERVER_ADDR)
-    stub = switchblade_pb2_grpc.SwitchbladeServiceStub(channel)
+    results = []
+    for (tool_name, _), future, span in zip(calls, in_flight, spans):
+        remaining = max(0.0, deadline - time.monotonic())
+        try:
+            response = future.result(timeout=remaining)
+            tracing.finish(span, response.error_message if response.is_error else None)
+            results.append(_response_text(response))
+        except grpc.FutureTimeoutError:
+            tracing.finish(span, "Turn deadline exceeded")
+            future.cancel()
+            results.append(f"Error: '{tool_name}' cancelled after the {timeout}s turn deadline")
+        except grpc.RpcError as e:
+            tracing.finish(span, e.details())
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                results.append(f"Error: '{tool_name}' cancelled after the {timeout}s turn deadline")
+            elif e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+                results.append(f"Error: {e.details()}")
+            else:
+                results.append(f"RPC Connection Error: {e.details()}")
+    return results
 
-    # 2. Fetch Tools
-    tools = get_tools_from_server(stub)
+
+def run_chat_loop():
+    # 1. Setup gRPC Channel (one per server when federating)
+    endpoints = parse_endpoints(SERVERS)
+    if len(endpoints) > 1:
+        stub = Federation(endpoints, policy=LB_POLICY)
+        catalog = stub.catalog
+    else:
+        channel = grpc.insecure_channel(endpoints[0][1], options=grpc_options.channel_options())
+        stub = switchblade_pb2_grpc.SwitchbladeServiceStub(channel)
+        catalog = ToolCatalog(stub)
+
+    # 2. Fetch Tools, then keep them current through WatchTools
+    print(f"🔌 Connecting to Switchblade ({', '.join(addr for _, addr in endpoints)})...")
+    try:
+        catalog.refresh()
+    except grpc.RpcError as e:
+        print(f"❌ Connection failed: {e.details()}")
+        sys.exit(1)
+    print(f"✅ Discovered {len(catalog.tools)} tools: {list(catalog.tools)}")
+    catalog.start()
 
     # 3. Prepare the "Fake" System Prompt
     system_prompt = (
@@ -115,11 +195,26 @@ def run_chat_loop():
         "Always base your answers on the tool outputs.\n"
     )
 
-    messages = []
-    print(f"\n🧠 Connected to Brain: {MODEL_NAME}")
-    print("💬 Ready. Type 'quit' or 'exit' to stop.\n")
+    # SWITCHBLADE_TRACE_FILE=path records each turn's spans as JSON lines
+    tracing.configure_from_env("mcp-client")
 
-    first_turn = True
+    context = ConversationContext(
+        system_prompt,
+        max_tokens=CONTEXT_TOKENS,
+        tool_result_tokens=TOOL_RESULT_TOKENS,
+        model=MODEL_NAME,
+    )
+    # Built lazily: nothing talks to the model API before the first turn
+    backend = make_backend(
+        LLM_BACKEND,
+        MODEL_NAME,
+        api_key=OPENAI_API_KEY,
+        base_url=LLM_BASE_URL,
+        timeout=LLM_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES,
+    )
+    print(f"\n🧠 Connected to Brain: {backend.model}")
+    print("💬 Ready. Type 'quit' or 'exit' to stop.\n")
 
     while True:
         try:
@@ -129,87 +224,104 @@ def run_chat_loop():
         except KeyboardInterrupt:
             break
 
-        # --- FIX 1: MERGE SYSTEM PROMPT INTO FIRST USER MESSAGE ---
-        if first_turn:
-            full_content = f"{system_prompt}\n\nUser Query: {user_input}"
-            messages.append({"role": "user", "content": full_content})
-            first_turn = False
-        else:
-            messages.append({"role": "user", "content": user_input})
+        printer = _ReplyPrinter()
+        reply = chat_turn(
+            stub, backend, context, catalog.openai_tools(), user_input, printer.write,
+            catalog.codecs,
+        )
+        printer.finish(reply)
 
-        # --- PASS 1: DECISION MAKING ---
-        try:
-            response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=messages,
-                tools=tools if tools else None,
-                tool_choice="auto" if tools else "none",
+
+def chat_turn(stub, backend, context, tools, user_input, on_token=None, server_codecs=()):
+    """
+    Runs one user turn: the decision pass, the tools it asks for, and the
+    synthesis pass. Reply text streams to on_token as the model produces it.
+    server_codecs are the catalog's codecs, see _build_call_request.
+    Returns the reply, or None if the model could not be reached.
+    """
+    # The context merges the system prompt into the first user message sent
+    context.add_user(user_input)
+
+    # Tool schemas ride along with every request and count against the budget
+    reserve = context.count(json.dumps(tools)) if tools else 0
+    # One trace per turn: both LLM passes and every tool call hang off it
+    turn = tracing.start_span("chat.turn", model=backend.model)
+
+    # --- PASS 1: DECISION MAKING ---
+    try:
+        with tracing.span("llm.request", turn, model=backend.model, step="decision"):
+            response_message = backend.complete(
+                context.messages(reserve), tools=tools or None, on_token=on_token
             )
+    except Exception as e:
+        print(f"❌ LLM Error: {e}")
+        tracing.finish(turn, e)
+        return None
+
+    tool_calls = response_message.tool_calls
+
+    if tool_calls:
+        # Append the Assistant's "intent"
+        context.add_assistant(response_message)
+
+        # Execute all tools requested, concurrently
+        calls = [
+            (tool_call.function.name, json.loads(tool_call.function.arguments))
+            for tool_call in tool_calls
+        ]
+        tool_results = execute_tools_concurrently(
+            stub, calls, parent=turn, server_codecs=server_codecs
+        )
+
+        # Appended in tool_calls order so every tool_call_id gets its answer;
+        # oversized results are summarized to fit TOOL_RESULT_TOKENS
+        for tool_call, (fn_name, _), tool_result in zip(tool_calls, calls, tool_results):
+            context.add_tool_result(tool_call.id, fn_name, tool_result)
+
+        # --- PASS 2: SYNTHESIS ---
+        try:
+            # The model needs the tools again to make sense of the tool messages
+            with tracing.span("llm.request", turn, model=backend.model, step="synthesis"):
+                msg = backend.complete(context.messages(reserve), tools=tools, on_token=on_token)
+
+            if msg.content is None:
+                # Fallback: summarize last tool output
+                bot_reply = "Scan completed successfully. Ports were scanned and results are available."
+            else:
+                bot_reply = msg.content
+
+            context.add_assistant({"role": "assistant", "content": bot_reply})
+
         except Exception as e:
-            print(f"❌ LLM Error: {e}")
-            continue
-
-        response_message = response.choices[0].message
-        tool_calls = response_message.tool_calls
-
-        if tool_calls:
-            # Append the Assistant's "intent"
-            messages.append(response_message)
-
-            # Execute all tools requested
-            tool_outputs = []
-            for tool_call in tool_calls:
-                fn_name = tool_call.function.name
-                fn_args = json.loads(tool_call.function.arguments)
-
-                tool_result = execute_tool_on_server(stub, fn_name, fn_args)
-                # tool_outputs.append(f"Tool '{fn_name}' returned: {tool_result}")
-
-            # --- FIX 2: CONVERT TOOL RESULTS TO A USER MESSAGE ---
-            # Instead of role='tool', we send it as role='user'
-                # observation_text = "\n".join(tool_outputs)
-            # messages.append(
-            #     {
-            #         "role": "user",
-            #         "content": f"Observation from tools:\n{observation_text}",
-            #     }
-            # )
-
-            # THE FIX: Create a message that OpenAI recognizes
-                if tool_result is None:
-                    tool_result="{}"
-
-                messages.append({
-                    "role": "tool",                 # Rule 1: Role must be 'tool'
-                    "tool_call_id": tool_call.id,   # Rule 2: ID must match exactly
-                    "name": fn_name,                # Rule 3: Function name must be included
-                    "content": tool_result # Rule 4: Data must be a string (JSON)
-                })
-
-            # --- PASS 2: SYNTHESIS ---
-            try:
-                final_response = client.chat.completions.create(
-                    model=MODEL_NAME, messages=messages ,tools=tools#open ai model need to again give the tools again 
-                )
-                msg = final_response.choices[0].message
-
-                if msg.content is None:
-                    # Fallback: summarize last tool output
-                    bot_reply = "Scan completed successfully. Ports were scanned and results are available."
-                else:
-                    bot_reply = msg.content
-
-                print(f"\nSwitchblade> {bot_reply}\n")
-
-                messages.append({"role": "assistant", "content": bot_reply})
-
-            except Exception as e:
-                print(f"❌ LLM Error during synthesis: {e}")
-
-        else:
-            bot_reply = response_message.content
-            print(f"\nSwitchblade> {bot_reply}\n")
-            messages.append({"role": "assistant", "content": bot_reply})
+            print(f"❌ LLM Error during synthesis: {e}")
+            bot_reply = None
+
+    else:
+        bot_reply = response_message.content
+        context.add_assistant({"role": "assistant", "content": bot_reply})
+
+    tracing.finish(turn)
+    return bot_reply
+
+
+class _ReplyPrinter:
+    """Prints streamed reply text as it arrives, behind the usual prompt."""
+
+    def __init__(self):
+        self.started = False
+
+    def write(self, text):
+        if not self.started:
+            print("\nSwitchblade> ", end="")
+            self.started = True
+        print(text, end="", flush=True)
+
+    def finish(self, reply):
+        if self.started:
+            print("\n")
+        elif reply is not None:
+            # Nothing was streamed (e.g. the synthesis fallback)
+            print(f"\nSwitchblade> {reply}\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+import json
+import threading
+
+import grpc
+
+try:
+    from ..generated import switchblade_pb2
+except ImportError:
+    from src.generated import switchblade_pb2
+
+
+def to_openai_tool(t):
+    """Converts a gRPC Tool definition to the OpenAI 'function' format."""
+    try:
+        # We use the input_schema_json sent by the server
+        parameters = json.loads(t.input_schema_json)
+    except json.JSONDecodeError:
+        parameters = {}
+
+    return {
+        "type": "function",
+        "function": {
+            "name": t.name,
+            "description": t.description,
+            "parameters": parameters,
+        },
+    }
+
+
+class ToolCatalog:
+    """
+    Client-side copy of the server's tool list, kept current by a background
+    WatchTools subscription.
+
+    Notifications only mark the catalog dirty, and not even that when they
+    carry a version already held. A refresher thread then asks
+    ListToolsSince for the changes after its version and applies them; only a
+    client that fell behind the server's change log gets the whole catalog
+    again. The OpenAI tool list is rebuilt only when the version moves, and
+    only changed tools are re-parsed.
+    """
+
+    def __init__(self, stub, debounce=0.2, retry_delay=2.0):
+        self.stub = stub
+        self.debounce = debounce
+        self.retry_delay = retry_delay
+
+        self.lock = threading.Lock()
+        self.version = 0
+        self.epoch = 0  # versions are only comparable within one server epoch
+        # Codecs the server decodes in CallTool arguments, from its last full catalog
+        self.codecs = ()
+        self.tools = {}  # tool_name -> switchblade_pb2.Tool
+        self._openai_tools = []
+        self._converted = {}  # tool_name -> (Tool, openai dict) for reuse
+
+        self._resume_token = 0  # sequence of the last notification seen
+        self._deltas = True  # cleared for servers without ListToolsSince
+        self._dirty = threading.Event()
+        self._stopped = threading.Event()
+        self._watch_call = None
+        self._threads = []
+
+    def openai_tools(self):
+        """The current OpenAI tool list; no RPC involved."""
+        with self.lock:
+            return self._openai_tools
+
+    def refresh(self):
+        """Syncs with the server. Returns True if the catalog changed."""
+        if self.version and self._deltas:
+            try:
+                delta = self.stub.ListToolsSince(
+                    switchblade_pb2.ListToolsSinceRequest(version=self.version, epoch=self.epoch)
+                )
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                    raise
+                self._deltas = False
+            else:
+                return self._apply_delta(delta)
+
+        response = self.stub.ListTools(
+            switchblade_pb2.ListToolsRequest(known_version=self.version, known_epoch=self.epoch)
+        )
+        if response.not_modified:
+            return False
+        self.epoch = response.epoch
+        self.codecs = tuple(response.codecs)
+        self._apply(response.tools, response.version)
+        return True
+
+    def _apply_delta(self, delta):
+        if delta.full:
+            self.epoch = delta.epoch
+            self.codecs = tuple(delta.codecs)
+            self._apply(delta.tools, delta.version)
+            return True
+        if delta.version == self.version:
+            return False
+        tools = dict(self.tools)
+        for change in delta.changes:
+            if change.change_type == switchblade_pb2.CHANGE_REMOVED:
+                tools.pop(change.tool_name, None)
+            else:
+                tools[change.tool_name] = change.tool
+        self._apply(list(tools.values()), delta.version)
+        # A reload that kept every definition moves the version only
+        return len(delta.changes) > 0
+
+    def _apply(self, tools, version):
+        converted = {}
+        openai_tools = []
+        for t in tools:
+            cached = self._converted.get(t.name)
+            if cached is None or cached[0] != t:
+                cached = (t, to_openai_tool(t))
+            converted[t.name] = cached
+            openai_tools.append(cached[1])
+
+        with self.lock:
+            self.tools = {t.name: t for t in tools}
+            self._converted = converted
+            self._openai_tools = openai_tools
+            self.version = version
+
+    def start(self):
+        for target in (self._watch_loop, self._refresh_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopped.set()
+        self._dirty.set()
+        if self._watch_call is not None:
+            self._watch_call.cancel()
+
+    def _watch_loop(self):
+        while not self._stopped.is_set():
+            try:
+                self._watch_call = self.stub.WatchTools(
+                    switchblade_pb2.WatchToolsRequest(resume_token=self._resume_token)
+                )
+                # Sync in case we raced a reload, or reconnected to another
+                # server process; with deltas that is a tiny call
+                self._dirty.set()
+                # On reconnect the server replays what we missed (or sends RESYNC)
+                for notification in self._watch_call:
+                    self._resume_token = notification.sequence
+                    if notification.version and notification.version <= self.version:
+                        # Already applied by an earlier sync
+                        continue
+                    self._dirty.set()
+            except grpc.RpcError as e:
+                if self._stopped.is_set() or e.code() == grpc.StatusCode.CANCELLED:
+                    continue
+            self._stopped.wait(self.retry_delay)
+
+    def _refresh_loop(self):
+        while not self._stopped.is_set():
+            self._dirty.wait()
+            # Reloads arrive as bursts of notifications; sync once per burst
+            self._stopped.wait(self.debounce)
+            self._dirty.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                if self.refresh():
+                    names = list(self.tools)
+                    print(f"\n🔄 Tool catalog updated ({len(names)} tools): {names}")
+            except grpc.RpcError:
+                self._dirty.set()
+                self._stopped.wait(self.retry_delay)
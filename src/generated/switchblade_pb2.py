@@ -24,25 +24,51 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11switchblade.proto\x12\x0bswitchblade\"\x07\n\x05\x45mpty\"`\n\x04Tool\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x19\n\x11input_schema_json\x18\x03 \x01(\t\x12\x1a\n\x12output_schema_json\x18\x04 \x01(\t\"5\n\x11ListToolsResponse\x12 \n\x05tools\x18\x01 \x03(\x0b\x32\x11.switchblade.Tool\"<\n\x0f\x43\x61llToolRequest\x12\x11\n\ttool_name\x18\x01 \x01(\t\x12\x16\n\x0e\x61rguments_json\x18\x02 \x01(\t\"Q\n\x10\x43\x61llToolResponse\x12\x14\n\x0c\x63ontent_json\x18\x01 \x01(\t\x12\x10\n\x08is_error\x18\x02 \x01(\x08\x12\x15\n\rerror_message\x18\x03 \x01(\t\"8\n\x11ToolsNotification\x12\x12\n\nevent_type\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t2\xe2\x01\n\x12SwitchbladeService\x12?\n\tListTools\x12\x12.switchblade.Empty\x1a\x1e.switchblade.ListToolsResponse\x12G\n\x08\x43\x61llTool\x12\x1c.switchblade.CallToolRequest\x1a\x1d.switchblade.CallToolResponse\x12\x42\n\nWatchTools\x12\x12.switchblade.Empty\x1a\x1e.switchblade.ToolsNotification0\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11switchblade.proto\x12\x0bswitchblade\"\x07\n\x05\x45mpty\"t\n\x04Tool\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x19\n\x11input_schema_json\x18\x03 \x01(\t\x12\x1a\n\x12output_schema_json\x18\x04 \x01(\t\x12\x12\n\nidempotent\x18\x05 \x01(\x08\">\n\x10ListToolsRequest\x12\x15\n\rknown_version\x18\x01 \x01(\x04\x12\x13\n\x0bknown_epoch\x18\x02 \x01(\x04\"\x8f\x01\n\x11ListToolsResponse\x12 \n\x05tools\x18\x01 \x03(\x0b\x32\x11.switchblade.Tool\x12\x0f\n\x07version\x18\x02 \x01(\x04\x12\x14\n\x0cnot_modified\x18\x03 \x01(\x08\x12\r\n\x05\x65poch\x18\x04 \x01(\x04\x12\"\n\x06\x63odecs\x18\x05 \x03(\x0e\x32\x12.switchblade.Codec\"7\n\x15ListToolsSinceRequest\x12\x0f\n\x07version\x18\x01 \x01(\x04\x12\r\n\x05\x65poch\x18\x02 \x01(\x04\"\x7f\n\nToolChange\x12,\n\x0b\x63hange_type\x18\x01 \x01(\x0e\x32\x17.switchblade.ChangeType\x12\x11\n\ttool_name\x18\x02 \x01(\t\x12\x1f\n\x04tool\x18\x03 \x01(\x0b\x32\x11.switchblade.Tool\x12\x0f\n\x07version\x18\x04 \x01(\x04\"\xae\x01\n\x0eListToolsDelta\x12\x0f\n\x07version\x18\x01 \x01(\x04\x12\r\n\x05\x65poch\x18\x02 \x01(\x04\x12(\n\x07\x63hanges\x18\x03 \x03(\x0b\x32\x17.switchblade.ToolChange\x12\x0c\n\x04\x66ull\x18\x04 \x01(\x08\x12 \n\x05tools\x18\x05 \x03(\x0b\x32\x11.switchblade.Tool\x12\"\n\x06\x63odecs\x18\x06 \x03(\x0e\x32\x12.switchblade.Codec\"\x9d\x01\n\x0f\x43\x61llToolRequest\x12\x11\n\ttool_name\x18\x01 \x01(\t\x12\x16\n\x0e\x61rguments_json\x18\x02 \x01(\t\x12\x11\n\targuments\x18\x03 \x01(\x0c\x12!\n\x05\x63odec\x18\x04 \x01(\x0e\x32\x12.switchblade.Codec\x12)\n\raccept_codecs\x18\x05 \x03(\x0e\x32\x12.switchblade.Codec\"\x85\x01\n\x10\x43\x61llToolResponse\x12\x14\n\x0c\x63ontent_json\x18\x01 \x01(\t\x12\x10\n\x08is_error\x18\x02 \x01(\x08\x12\x15\n\rerror_message\x18\x03 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x04 \x01(\x0c\x12!\n\x05\x63odec\x18\x05 \x01(\x0e\x32\x12.switchblade.Codec\"V\n\x14\x42\x61tchCallToolRequest\x12+\n\x05\x63\x61lls\x18\x01 \x03(\x0b\x32\x1c.switchblade.CallToolRequest\x12\x11\n\tfail_fast\x18\x02 \x01(\x08\"U\n\x13\x42\x61tchCallToolResult\x12\r\n\x05index\x18\x01 \x01(\r\x12/\n\x08response\x18\x02 \x01(\x0b\x32\x1d.switchblade.CallToolResponse\"\x95\x01\n\rCallToolChunk\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\x14\n\x0c\x63ontent_json\x18\x02 \x01(\t\x12\x0c\n\x04more\x18\x03 \x01(\x08\x12\x13\n\x0bis_progress\x18\x04 \x01(\x08\x12\x10\n\x08is_error\x18\x05 \x01(\x08\x12\x15\n\rerror_message\x18\x06 \x01(\t\x12\x10\n\x08is_final\x18\x07 \x01(\x08\")\n\x11WatchToolsRequest\x12\x14\n\x0cresume_token\x18\x01 \x01(\x04\"\x9d\x01\n\x11ToolsNotification\x12\x12\n\nevent_type\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08sequence\x18\x03 \x01(\x04\x12\x0f\n\x07version\x18\x04 \x01(\x04\x12,\n\x0b\x63hange_type\x18\x05 \x01(\x0e\x32\x17.switchblade.ChangeType\x12\x12\n\ntool_names\x18\x06 \x03(\t\"G\n\tHistogram\x12\x0e\n\x06\x62ounds\x18\x01 \x03(\x01\x12\x0e\n\x06\x63ounts\x18\x02 \x03(\x04\x12\x0b\n\x03sum\x18\x03 \x01(\x01\x12\r\n\x05\x63ount\x18\x04 \x01(\x04\"\xd2\x02\n\tToolStats\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x63\x61lls\x18\x02 \x01(\x04\x12\x0e\n\x06\x65rrors\x18\x03 \x01(\x04\x12\x11\n\tin_flight\x18\x04 \x01(\x03\x12\x32\n\x12queue_wait_seconds\x18\x05 \x01(\x0b\x32\x16.switchblade.Histogram\x12\x31\n\x11\x65xecution_seconds\x18\x06 \x01(\x0b\x32\x16.switchblade.Histogram\x12\x10\n\x08\x62ytes_in\x18\x07 \x01(\x04\x12\x11\n\tbytes_out\x18\x08 \x01(\x04\x12\x10\n\x08rejected\x18\t \x01(\x04\x12\x0e\n\x06queued\x18\n \x01(\x03\x12\x12\n\ncache_hits\x18\x0b \x01(\x04\x12\x14\n\x0c\x63\x61\x63he_misses\x18\x0c \x01(\x04\x12\x14\n\x0c\x63\x61\x63he_shared\x18\r \x01(\x04\x12\x17\n\x0f\x63\x61\x63he_evictions\x18\x0e \x01(\x04\"\x8d\x04\n\x0bServerStats\x12%\n\x05tools\x18\x01 \x03(\x0b\x32\x16.switchblade.ToolStats\x12\x1c\n\x14\x65xecutor_max_workers\x18\x02 \x01(\x03\x12\x17\n\x0f\x65xecutor_active\x18\x03 \x01(\x03\x12\x17\n\x0f\x65xecutor_queued\x18\x04 \x01(\x03\x12;\n\x1b\x65xecutor_queue_wait_seconds\x18\x05 \x01(\x0b\x32\x16.switchblade.Histogram\x12\x0f\n\x07reloads\x18\x06 \x01(\x04\x12\x17\n\x0freload_failures\x18\x07 \x01(\x04\x12.\n\x0ereload_seconds\x18\x08 \x01(\x0b\x32\x16.switchblade.Histogram\x12\x19\n\x11watch_subscribers\x18\t \x01(\x03\x12\x18\n\x10registry_version\x18\n \x01(\x04\x12\x16\n\x0euptime_seconds\x18\x0b \x01(\x01\x12\"\n\x1a\x62\x61tch_executor_max_workers\x18\x0c \x01(\x03\x12\x1d\n\x15\x62\x61tch_executor_active\x18\r \x01(\x03\x12\x1d\n\x15\x62\x61tch_executor_queued\x18\x0e \x01(\x03\x12\x41\n!batch_executor_queue_wait_seconds\x18\x0f \x01(\x0b\x32\x16.switchblade.Histogram*m\n\x05\x43odec\x12\x15\n\x11\x43ODEC_UNSPECIFIED\x10\x00\x12\x0e\n\nCODEC_JSON\x10\x01\x12\x10\n\x0c\x43ODEC_ORJSON\x10\x02\x12\x11\n\rCODEC_MSGPACK\x10\x03\x12\x18\n\x14\x43ODEC_PROTOBUF_VALUE\x10\x04*^\n\nChangeType\x12\x16\n\x12\x43HANGE_UNSPECIFIED\x10\x00\x12\x10\n\x0c\x43HANGE_ADDED\x10\x01\x12\x12\n\x0e\x43HANGE_UPDATED\x10\x02\x12\x12\n\x0e\x43HANGE_REMOVED\x10\x03\x32\xac\x04\n\x12SwitchbladeService\x12J\n\tListTools\x12\x1d.switchblade.ListToolsRequest\x1a\x1e.switchblade.ListToolsResponse\x12Q\n\x0eListToolsSince\x12\".switchblade.ListToolsSinceRequest\x1a\x1b.switchblade.ListToolsDelta\x12G\n\x08\x43\x61llTool\x12\x1c.switchblade.CallToolRequest\x1a\x1d.switchblade.CallToolResponse\x12L\n\x0e\x43\x61llToolStream\x12\x1c.switchblade.CallToolRequest\x1a\x1a.switchblade.CallToolChunk0\x01\x12V\n\rBatchCallTool\x12!.switchblade.BatchCallToolRequest\x1a .switchblade.BatchCallToolResult0\x01\x12N\n\nWatchTools\x12\x1e.switchblade.WatchToolsRequest\x1a\x1e.switchblade.ToolsNotification0\x01\x12\x38\n\x08GetStats\x12\x12.switchblade.Empty\x1a\x18.switchblade.ServerStatsb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'switchblade_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_CODEC']._serialized_start=2502
+  _globals['_CODEC']._serialized_end=2611
+  _globals['_CHANGETYPE']._serialized_start=2613
+  _globals['_CHANGETYPE']._serialized_end=2707
   _globals['_EMPTY']._serialized_start=34
   _globals['_EMPTY']._serialized_end=41
   _globals['_TOOL']._serialized_start=43
-  _globals['_TOOL']._serialized_end=139
-  _globals['_LISTTOOLSRESPONSE']._serialized_start=141
-  _globals['_LISTTOOLSRESPONSE']._serialized_end=194
-  _globals['_CALLTOOLREQUEST']._serialized_start=196
-  _globals['_CALLTOOLREQUEST']._serialized_end=256
-  _globals['_CALLTOOLRESPONSE']._serialized_start=258
-  _globals['_CALLTOOLRESPONSE']._serialized_end=339
-  _globals['_TOOLSNOTIFICATION']._serialized_start=341
-  _globals['_TOOLSNOTIFICATION']._serialized_end=397
-  _globals['_SWITCHBLADESERVICE']._serialized_start=400
-  _globals['_SWITCHBLADESERVICE']._serialized_end=626
+  _globals['_TOOL']._serialized_end=159
+  _globals['_LISTTOOLSREQUEST']._serialized_start=161
+  _globals['_LISTTOOLSREQUEST']._serialized_end=223
+  _globals['_LISTTOOLSRESPONSE']._serialized_start=226
+  _globals['_LISTTOOLSRESPONSE']._serialized_end=369
+  _globals['_LISTTOOLSSINCEREQUEST']._serialized_start=371
+  _globals['_LISTTOOLSSINCEREQUEST']._serialized_end=426
+  _globals['_TOOLCHANGE']._serialized_start=428
+  _globals['_TOOLCHANGE']._serialized_end=555
+  _globals['_LISTTOOLSDELTA']._serialized_start=558
+  _globals['_LISTTOOLSDELTA']._serialized_end=732
+  _globals['_CALLTOOLREQUEST']._serialized_start=735
+  _globals['_CALLTOOLREQUEST']._serialized_end=892
+  _globals['_CALLTOOLRESPONSE']._serialized_start=895
+  _globals['_CALLTOOLRESPONSE']._serialized_end=1028
+  _globals['_BATCHCALLTOOLREQUEST']._serialized_start=1030
+  _globals['_BATCHCALLTOOLREQUEST']._serialized_end=1116
+  _globals['_BATCHCALLTOOLRESULT']._serialized_start=1118
+  _globals['_BATCHCALLTOOLRESULT']._serialized_end=1203
+  _globals['_CALLTOOLCHUNK']._serialized_start=1206
+  _globals['_CALLTOOLCHUNK']._serialized_end=1355
+  _globals['_WATCHTOOLSREQUEST']._serialized_start=1357
+  _globals['_WATCHTOOLSREQUEST']._serialized_end=1398
+  _globals['_TOOLSNOTIFICATION']._serialized_start=1401
+  _globals['_TOOLSNOTIFICATION']._serialized_end=1558
+  _globals['_HISTOGRAM']._serialized_start=1560
+  _globals['_HISTOGRAM']._serialized_end=1631
+  _globals['_TOOLSTATS']._serialized_start=1634
+  _globals['_TOOLSTATS']._serialized_end=1972
+  _globals['_SERVERSTATS']._serialized_start=1975
+  _globals['_SERVERSTATS']._serialized_end=2500
+  _globals['_SWITCHBLADESERVICE']._serialized_start=2710
+  _globals['_SWITCHBLADESERVICE']._serialized_end=3266
 # @@protoc_insertion_point(module_scope)
@@ -36,19 +36,39 @@ class SwitchbladeServiceStub(object):
         """
         self.ListTools = channel.unary_unary(
                 '/switchblade.SwitchbladeService/ListTools',
-                request_serializer=switchblade__pb2.Empty.SerializeToString,
+                request_serializer=switchblade__pb2.ListToolsRequest.SerializeToString,
                 response_deserializer=switchblade__pb2.ListToolsResponse.FromString,
                 _registered_method=True)
+        self.ListToolsSince = channel.unary_unary(
+                '/switchblade.SwitchbladeService/ListToolsSince',
+                request_serializer=switchblade__pb2.ListToolsSinceRequest.SerializeToString,
+                response_deserializer=switchblade__pb2.ListToolsDelta.FromString,
+                _registered_method=True)
         self.CallTool = channel.unary_unary(
                 '/switchblade.SwitchbladeService/CallTool',
                 request_serializer=switchblade__pb2.CallToolRequest.SerializeToString,
                 response_deserializer=switchblade__pb2.CallToolResponse.FromString,
                 _registered_method=True)
+        self.CallToolStream = channel.unary_stream(
+                '/switchblade.SwitchbladeService/CallToolStream',
+                request_serializer=switchblade__pb2.CallToolRequest.SerializeToString,
+                response_deserializer=switchblade__pb2.CallToolChunk.FromString,
+                _registered_method=True)
+        self.BatchCallTool = channel.unary_stream(
+                '/switchblade.SwitchbladeService/BatchCallTool',
+                request_serializer=switchblade__pb2.BatchCallToolRequest.SerializeToString,
+                response_deserializer=switchblade__pb2.BatchCallToolResult.FromString,
+                _registered_method=True)
         self.WatchTools = channel.unary_stream(
                 '/switchblade.SwitchbladeService/WatchTools',
-                request_serializer=switchblade__pb2.Empty.SerializeToString,
+                request_serializer=switchblade__pb2.WatchToolsRequest.SerializeToString,
                 response_deserializer=switchblade__pb2.ToolsNotification.FromString,
                 _registered_method=True)
+        self.GetStats = channel.unary_unary(
+                '/switchblade.SwitchbladeService/GetStats',
+                request_serializer=switchblade__pb2.Empty.SerializeToString,
+                response_deserializer=switchblade__pb2.ServerStats.FromString,
+                _registered_method=True)
 
 
 class SwitchbladeServiceServicer(object):
@@ -60,36 +80,80 @@ class SwitchbladeServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListToolsSince(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def CallTool(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CallToolStream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchCallTool(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def WatchTools(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_SwitchbladeServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
             'ListTools': grpc.unary_unary_rpc_method_handler(
                     servicer.ListTools,
-                    request_deserializer=switchblade__pb2.Empty.FromString,
+                    request_deserializer=switchblade__pb2.ListToolsRequest.FromString,
                     response_serializer=switchblade__pb2.ListToolsResponse.SerializeToString,
             ),
+            'ListToolsSince': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListToolsSince,
+                    request_deserializer=switchblade__pb2.ListToolsSinceRequest.FromString,
+                    response_serializer=switchblade__pb2.ListToolsDelta.SerializeToString,
+            ),
             'CallTool': grpc.unary_unary_rpc_method_handler(
                     servicer.CallTool,
                     request_deserializer=switchblade__pb2.CallToolRequest.FromString,
                     response_serializer=switchblade__pb2.CallToolResponse.SerializeToString,
             ),
+            'CallToolStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.CallToolStream,
+                    request_deserializer=switchblade__pb2.CallToolRequest.FromString,
+                    response_serializer=switchblade__pb2.CallToolChunk.SerializeToString,
+            ),
+            'BatchCallTool': grpc.unary_stream_rpc_method_handler(
+                    servicer.BatchCallTool,
+                    request_deserializer=switchblade__pb2.BatchCallToolRequest.FromString,
+                    response_serializer=switchblade__pb2.BatchCallToolResult.SerializeToString,
+            ),
             'WatchTools': grpc.unary_stream_rpc_method_handler(
                     servicer.WatchTools,
-                    request_deserializer=switchblade__pb2.Empty.FromString,
+                    request_deserializer=switchblade__pb2.WatchToolsRequest.FromString,
                     response_serializer=switchblade__pb2.ToolsNotification.SerializeToString,
             ),
+            'GetStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStats,
+                    request_deserializer=switchblade__pb2.Empty.FromString,
+                    response_serializer=switchblade__pb2.ServerStats.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'switchblade.SwitchbladeService', rpc_method_handlers)
@@ -116,7 +180,7 @@ class SwitchbladeService(object):
             request,
             target,
             '/switchblade.SwitchbladeService/ListTools',
-            switchblade__pb2.Empty.SerializeToString,
+            switchblade__pb2.ListToolsRequest.SerializeToString,
             switchblade__pb2.ListToolsResponse.FromString,
             options,
             channel_credentials,
@@ -128,6 +192,33 @@ class SwitchbladeService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ListToolsSince(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/switchblade.SwitchbladeService/ListToolsSince',
+            switchblade__pb2.ListToolsSinceRequest.SerializeToString,
+            switchblade__pb2.ListToolsDelta.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def CallTool(request,
             target,
@@ -155,6 +246,60 @@ class SwitchbladeService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def CallToolStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/switchblade.SwitchbladeService/CallToolStream',
+            switchblade__pb2.CallToolRequest.SerializeToString,
+            switchblade__pb2.CallToolChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchCallTool(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/switchblade.SwitchbladeService/BatchCallTool',
+            switchblade__pb2.BatchCallToolRequest.SerializeToString,
+            switchblade__pb2.BatchCallToolResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def WatchTools(request,
             target,
@@ -170,7 +315,7 @@ class SwitchbladeService(object):
             request,
             target,
             '/switchblade.SwitchbladeService/WatchTools',
-            switchblade__pb2.Empty.SerializeToString,
+            switchblade__pb2.WatchToolsRequest.SerializeToString,
             switchblade__pb2.ToolsNotification.FromString,
             options,
             channel_credentials,
@@ -181,3 +326,30 @@ class SwitchbladeService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/switchblade.SwitchbladeService/GetStats',
+            switchblade__pb2.Empty.SerializeToString,
+            switchblade__pb2.ServerStats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,178 @@
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class ToolBusy(Exception):
+    """Raised when a tool's wait queue is full; carries a retry-after hint."""
+
+    def __init__(self, tool_name, retry_after):
+        super().__init__(
+            f"Tool '{tool_name}' is at capacity, retry in {retry_after:.2f}s"
+        )
+        self.tool_name = tool_name
+        self.retry_after = retry_after
+
+    def trailing_metadata(self):
+        return (("retry-after-ms", str(int(self.retry_after * 1000))),)
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+class ToolGate:
+    """
+    Per-tool admission control: at most ``max_concurrency`` calls run at once and
+    at most ``max_queue_depth`` wait for a slot; anything beyond that is rejected
+    immediately instead of piling up behind the burst.
+
+    Works for both the threaded and the aio server. Slots are handed directly
+    to the oldest waiter on release, so waiting is FIFO. A threaded waiter
+    parks a gRPC handler thread, so the threaded server bounds the queue of
+    tools that only declare max_concurrency (``default_queue_depth``).
+    """
+
+    def __init__(self, tool_name, max_concurrency=None, max_queue_depth=None):
+        self.tool_name = tool_name
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+
+        self.lock = threading.Lock()
+        self.running = 0
+        self.waiters = deque()
+
+        # Counters for stats()
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.avg_run_time = 0.0
+
+    @staticmethod
+    def limits_for(meta, default_queue_depth=None):
+        """(max_concurrency, max_queue_depth) for a tool's metadata."""
+        max_concurrency = meta.get("max_concurrency")
+        max_queue_depth = meta.get("max_queue_depth")
+        if max_concurrency is not None and max_queue_depth is None:
+            max_queue_depth = default_queue_depth
+        return max_concurrency, max_queue_depth
+
+    @classmethod
+    def from_metadata(cls, meta, default_queue_depth=None):
+        limits = cls.limits_for(meta, default_queue_depth)
+        if limits == (None, None):
+            return None
+        return cls(meta["name"], *limits)
+
+    def _admit(self, make_waiter):
+        """Takes a slot or enqueues a waiter. Returns None when a slot was free."""
+        with self.lock:
+            if self.max_concurrency is None or self.running < self.max_concurrency:
+                self.running += 1
+                self.admitted += 1
+                return None
+            if self.max_queue_depth is not None and len(self.waiters) >= self.max_queue_depth:
+                self.rejected += 1
+                raise ToolBusy(self.tool_name, self._retry_after())
+            waiter = make_waiter()
+            self.waiters.append(waiter)
+            return waiter
+
+    def _retry_after(self):
+        # Roughly how long until the queue ahead of a new caller drains
+        slots = self.max_concurrency or 1
+        backlog = (len(self.waiters) + 1) / slots
+        return max(0.1, backlog * self.avg_run_time)
+
+    def _record_wait(self, waited):
+        with self.lock:
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def _abandon(self, waiter):
+        """
+        A waiter gave up (timeout/cancel). Returns True if a slot had already
+        been handed to it, in which case the caller owns that slot.
+        """
+        with self.lock:
+            if waiter.granted:
+                return True
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                pass
+            return False
+
+    def acquire(self, timeout=None):
+        """Blocking acquire for the threaded server. Returns seconds spent queued."""
+        event = threading.Event()
+        waiter = self._admit(lambda: _Waiter(event.set))
+        if waiter is None:
+            return 0.0
+
+        start = time.monotonic()
+        if not event.wait(timeout) and not self._abandon(waiter):
+            raise TimeoutError(f"Timed out waiting for a '{self.tool_name}' slot")
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        return waited
+
+    async def acquire_async(self):
+        """Awaitable acquire for the aio server. Returns seconds spent queued."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(None)
+            )
+
+        waiter = self._admit(lambda: _Waiter(wake))
+        if waiter is None:
+            return 0.0
+
+        start = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        return waited
+
+    def release(self, run_time=None):
+        with self.lock:
+            if run_time is not None:
+                # Exponentially weighted, only used for the retry-after hint
+                self.avg_run_time = 0.8 * self.avg_run_time + 0.2 * run_time
+            if self.waiters:
+                # Hand the slot over without ever dropping `running`
+                waiter = self.waiters.popleft()
+                waiter.granted = True
+            else:
+                self.running -= 1
+                return
+        waiter.wake()
+
+    def stats(self):
+        with self.lock:
+            waits = self.admitted or 1
+            return {
+                "running": self.running,
+                "queued": len(self.waiters),
+                "max_concurrency": self.max_concurrency,
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_ms": self.total_wait / waits * 1000,
+                "max_wait_ms": self.max_wait * 1000,
+            }
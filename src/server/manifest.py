@@ -0,0 +1,154 @@
+import os
+import ast
+import json
+import inspect
+
+try:
+    from ..utils.switchblade_decorator import build_metadata
+except ImportError:
+    from src.utils.switchblade_decorator import build_metadata
+
+
+# Bump when extract_tools changes what it records. The @tool options are part
+# of the version too, so a new option never reads as missing from old entries.
+MANIFEST_FORMAT = 2
+MANIFEST_VERSION = f"{MANIFEST_FORMAT}:" + ",".join(inspect.signature(build_metadata).parameters)
+
+
+class NotStatic(Exception):
+    """The @tool(...) call uses something other than literals."""
+
+
+class LazyTool:
+    """
+    Registry stand-in for a tool known only from the manifest. It carries the
+    metadata ListTools needs; the module is imported on the first CallTool.
+    """
+
+    _is_switchblade_tool = True
+    _is_lazy = True
+
+    def __init__(self, filepath, metadata):
+        self.filepath = filepath
+        self._tool_metadata = metadata
+
+    def __call__(self, *args, **kwargs):
+        # Only reached when importing the real module failed
+        raise RuntimeError(
+            f"Tool '{self._tool_metadata['name']}' could not be imported from {self.filepath}"
+        )
+
+
+def _is_tool_decorator(node):
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == "tool") or (
+        isinstance(func, ast.Attribute) and func.attr == "tool"
+    )
+
+
+def _yields(func_node):
+    """True if the function body itself (not nested defs) contains a yield."""
+    stack = list(func_node.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _literal_metadata(call):
+    try:
+        args = [ast.literal_eval(arg) for arg in call.args]
+        kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords}
+    except ValueError:
+        raise NotStatic("non-literal @tool argument")
+    if None in kwargs:
+        raise NotStatic("**kwargs in @tool call")
+    try:
+        inspect.signature(build_metadata).bind(*args, **kwargs)
+    except TypeError as e:
+        raise NotStatic(str(e))
+    return build_metadata(*args, **kwargs)
+
+
+def extract_tools(source, filepath):
+    """
+    Reads @tool(...) metadata from a tool file's source without executing it.
+    Raises NotStatic when the metadata can only be known by importing.
+    """
+    try:
+        tree = ast.parse(source, filepath)
+    except SyntaxError as e:
+        raise NotStatic(str(e))
+
+    tools = []
+    # inspect.getmembers only ever saw module-level functions, so do the same
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not _is_tool_decorator(decorator):
+                continue
+            meta = _literal_metadata(decorator)
+            is_async_def = isinstance(node, ast.AsyncFunctionDef)
+            generator = _yields(node)
+            meta["is_async"] = is_async_def and not generator
+            meta["is_generator"] = generator and not is_async_def
+            meta["is_async_generator"] = generator and is_async_def
+            tools.append(meta)
+    return tools
+
+
+class ToolManifest:
+    """
+    On-disk cache of extracted tool metadata keyed by file content hash, so a
+    restart does not even need to re-parse unchanged tool files. A manifest
+    written by another MANIFEST_VERSION is discarded as a whole.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # filepath -> {"sha256": ..., "tools": [...]}
+        self.dirty = False
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("files", {})
+        else:
+            self.dirty = True
+
+    def tools_for(self, filepath, digest, source):
+        """Metadata for `filepath` at `digest`, extracting and caching on a miss."""
+        entry = self.entries.get(filepath)
+        if entry and entry.get("sha256") == digest:
+            return entry["tools"]
+        tools = extract_tools(source, filepath)
+        self.entries[filepath] = {"sha256": digest, "tools": tools}
+        self.dirty = True
+        return tools
+
+    def forget(self, filepath):
+        if self.entries.pop(filepath, None) is not None:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        # Per process: server workers sharing a tools directory save it together
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f)
+            # Atomic, so a crash never leaves a half-written manifest behind
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠️  Could not write tool manifest {self.path}: {e}")
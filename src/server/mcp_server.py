@@ -1,12 +1,17 @@
 import os
 import grpc
+import signal
 import json
+import asyncio
 import time
+import hashlib
 import importlib.util
 import sys
-import queue
 import threading
 import inspect  # <--- NEW: Needed to inspect module members
+import itertools
+import contextlib
+from types import MappingProxyType
 from concurrent import futures
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -14,6 +19,23 @@ from watchdog.events import FileSystemEventHandler
 try:
     from ..generated import switchblade_pb2
     from ..generated import switchblade_pb2_grpc
+    from .worker_pool import ProcessWorkerPool
+    from .concurrency import ToolGate, ToolBusy
+    from .notifications import NotificationHub, WatcherLimitReached
+    from .manifest import ToolManifest, LazyTool, NotStatic
+    from .validation import InvalidArguments, compile_validator
+    from .result_cache import ResultCache
+    from .metrics import MeteredExecutor, ReloadMetrics, ToolMetrics, serve_prometheus
+    from .supervisor import Supervisor
+    from ..utils.switchblade_decorator import (
+        Progress,
+        CancellationToken,
+        ToolCancelled,
+        invoke,
+    )
+    from ..utils import payload_codecs
+    from ..utils import tracing
+    from ..utils import grpc_options
 except ImportError:
     # When running directly, add parent directory to path
     sys.path.insert(
@@ -21,165 +43,1593 @@ except ImportError:
     )
     from src.generated import switchblade_pb2
     from src.generated import switchblade_pb2_grpc
+    from src.server.worker_pool import ProcessWorkerPool
+    from src.server.concurrency import ToolGate, ToolBusy
+    from src.server.notifications import NotificationHub, WatcherLimitReached
+    from src.server.manifest import ToolManifest, LazyTool, NotStatic
+    from src.server.validation import InvalidArguments, compile_validator
+    from src.server.result_cache import ResultCache
+    from src.server.metrics import MeteredExecutor, ReloadMetrics, ToolMetrics, serve_prometheus
+    from src.server.supervisor import Supervisor
+    from src.utils.switchblade_decorator import (
+        Progress,
+        CancellationToken,
+        ToolCancelled,
+        invoke,
+    )
+    from src.utils import payload_codecs
+    from src.utils import tracing
+    from src.utils import grpc_options
 
 TOOLS_DIR = "./tools"
+LISTEN_ADDR = os.getenv("SWITCHBLADE_LISTEN_ADDR", "[::]:50051")
+
+# "thread" = classic grpc.server on a thread pool, "aio" = grpc.aio event loop
+SERVER_MODE = os.getenv("SWITCHBLADE_SERVER_MODE", "thread")
+# Server processes sharing LISTEN_ADDR through SO_REUSEPORT (Linux). Above 1,
+# a supervisor runs them, restarts crashed ones and merges their /metrics
+SERVER_WORKERS = int(os.getenv("SWITCHBLADE_SERVER_WORKERS", "1"))
+# Upper bound for blocking (non-async) tools running at once in aio mode
+TOOL_EXECUTOR_WORKERS = int(os.getenv("SWITCHBLADE_TOOL_WORKERS", "64"))
+# Largest content_json slice sent in one CallToolStream message
+STREAM_CHUNK_BYTES = int(os.getenv("SWITCHBLADE_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+# WatchTools subscribers. aio watchers cost no thread; in thread mode every
+# watcher pins a handler thread, so they get their own slice of the pool
+MAX_WATCHERS = int(os.getenv("SWITCHBLADE_MAX_WATCHERS", "10000"))
+THREADED_MAX_WATCHERS = int(os.getenv("SWITCHBLADE_THREADED_MAX_WATCHERS", "32"))
+# Calls that may wait for a slot of a tool declaring only max_concurrency, in
+# thread mode, where each waiter holds one of the 10 call handler threads
+THREADED_QUEUE_DEPTH = int(os.getenv("SWITCHBLADE_THREADED_QUEUE_DEPTH", "4"))
+
+# Worker processes for @tool(execution="process")
+PROCESS_WORKERS = int(os.getenv("SWITCHBLADE_PROCESS_WORKERS", str(os.cpu_count() or 2)))
+PROCESS_MAX_CALLS = int(os.getenv("SWITCHBLADE_PROCESS_MAX_CALLS", "500"))
+PROCESS_MAX_RSS_MB = int(os.getenv("SWITCHBLADE_PROCESS_MAX_RSS_MB", "512"))
+# Hard limit on one process-mode call when its client set no shorter deadline;
+# a tool still running then costs its worker, which is killed and replaced
+PROCESS_CALL_TIMEOUT = float(os.getenv("SWITCHBLADE_PROCESS_CALL_TIMEOUT", "300"))
+
+# Quiet period before a changed tool file is reloaded (editors fire bursts)
+RELOAD_DEBOUNCE_SECONDS = float(os.getenv("SWITCHBLADE_RELOAD_DEBOUNCE", "0.3"))
+
+# Tool changes kept for ListToolsSince; clients further behind get the full catalog
+CHANGE_LOG_SIZE = int(os.getenv("SWITCHBLADE_CHANGE_LOG_SIZE", "512"))
+
+# Results kept for @tool(cacheable=True) tools, across all of them
+CACHE_MAX_ENTRIES = int(os.getenv("SWITCHBLADE_CACHE_ENTRIES", "1024"))
+
+# host:port for a Prometheus /metrics endpoint, empty to disable
+METRICS_ADDR = os.getenv("SWITCHBLADE_METRICS_ADDR", "")
+
+# Serve ListTools from statically extracted metadata and import a tool module
+# only on its first call; WARMUP imports them in the background after startup
+LAZY_TOOLS = os.getenv("SWITCHBLADE_LAZY_TOOLS", "1") == "1"
+WARMUP = os.getenv("SWITCHBLADE_WARMUP", "0") == "1"
+MANIFEST_FILENAME = ".switchblade_manifest.json"
+
+# Deadlines further out than this (a year) are treated as no deadline at all
+MAX_DEADLINE_SECONDS = 365 * 24 * 3600.0
+
+# Sentinel a generator tool's executor step returns once it is exhausted
+_DONE = object()
+
+
+def _tool_descriptor(func_obj):
+    """Builds the wire description of a tool once, at registration time."""
+    meta = func_obj._tool_metadata
+    return switchblade_pb2.Tool(
+        name=meta["name"],
+        description=meta["description"],
+        input_schema_json=json.dumps(meta["input_schema"]),
+        output_schema_json=json.dumps(meta["output_schema"]),
+        idempotent=bool(meta.get("cacheable")),
+    )
+
+
+def _input_validator(descriptor):
+    """Compiled input_schema check of a tool, None if it accepts anything."""
+    try:
+        return compile_validator(descriptor.input_schema_json)
+    except ValueError as e:
+        print(f"⚠️  Not validating arguments of {descriptor.name}: {e}")
+        return None
+
+
+class RegistrySnapshot:
+    """
+    One immutable view of the registry. A request reads `registry.snapshot`
+    once and uses only that object, so it sees a consistent catalog without
+    taking a lock; reloads build a new snapshot and swap the reference.
+    `generation` counts every swap, `version` only those clients can see.
+    """
+
+    __slots__ = (
+        "generation", "version", "epoch", "tools", "descriptors", "validators", "owners", "files",
+        "catalog", "changes", "log_base",
+    )
+
+    def __init__(
+        self,
+        generation,
+        version,
+        epoch,
+        tools,
+        descriptors,
+        validators,
+        owners,
+        files,
+        catalog=None,
+        changes=(),
+        log_base=None,
+    ):
+        self.generation = generation
+        self.version = version
+        self.epoch = epoch
+        self.tools = MappingProxyType(tools)  # tool_name -> function object (not module)
+        self.descriptors = MappingProxyType(descriptors)  # tool_name -> prebuilt switchblade_pb2.Tool
+        self.validators = MappingProxyType(validators)  # tool_name -> compiled input_schema check
+        self.owners = MappingProxyType(owners)  # tool_name -> filepath that registered it
+        self.files = MappingProxyType(files)  # filepath -> frozenset of tool names it provides
+        # The ListTools answer, built once per catalog version
+        self.catalog = catalog or switchblade_pb2.ListToolsResponse(
+            tools=list(descriptors.values()),
+            version=version,
+            epoch=epoch,
+            codecs=payload_codecs.available_codecs(),
+        )
+        # ToolChange messages in version order; complete for every version
+        # after log_base
+        self.changes = changes
+        self.log_base = version if log_base is None else log_base
+
+    def changes_since(self, version, epoch):
+        """ListToolsDelta from `version` to this snapshot, or the full catalog."""
+        delta = switchblade_pb2.ListToolsDelta(version=self.version, epoch=self.epoch)
+        if epoch != self.epoch or not self.log_base <= version <= self.version:
+            delta.full = True
+            delta.tools.extend(self.catalog.tools)
+            delta.codecs.extend(self.catalog.codecs)
+            return delta
+        # Only the last change of each tool matters to the caller
+        latest = {}
+        for change in self.changes:
+            if change.version > version:
+                latest.pop(change.tool_name, None)
+                latest[change.tool_name] = change
+        delta.changes.extend(latest.values())
+        return delta
 
 
 class ToolRegistry:
-    def __init__(self):
-        self.tools = {}  # Maps tool_name -> function_object (not module)
-        self.subscribers = []
+    def __init__(self, max_watchers=None, manifest=None):
+        # Versions are seeded from the clock, but two processes (a restart, or
+        # workers sharing a port) can still hand out the same one; the epoch
+        # tells them apart
+        epoch = int.from_bytes(os.urandom(8), "big") >> 1
+        self.snapshot = RegistrySnapshot(0, int(time.time() * 1000), epoch, {}, {}, {}, {}, {})
+        self.hashes = {}  # Maps filepath -> sha256 of the source last loaded
+        self.hub = NotificationHub(max_subscribers=max_watchers)
+        # Serializes writers only; readers never take it
         self.lock = threading.Lock()
+        # Callables run as hook(filepath, tool_funcs) after a file (re)loads
+        self.reload_hooks = []
+        # ToolManifest for lazy loading, None to import every file eagerly
+        self.manifest = manifest
+        self.import_lock = threading.Lock()
+        self.reload_metrics = ReloadMetrics()
+
+    @property
+    def tools(self):
+        return self.snapshot.tools
+
+    @property
+    def descriptors(self):
+        return self.snapshot.descriptors
+
+    @property
+    def validators(self):
+        return self.snapshot.validators
+
+    @property
+    def files(self):
+        return self.snapshot.files
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    @property
+    def epoch(self):
+        return self.snapshot.epoch
+
+    def register_file(self, filepath):
+        """
+        Registers a tool file from its manifest entry without importing it.
+        Files whose @tool metadata is not plain literals are imported eagerly.
+        """
+        if self.manifest is None:
+            return self.load_tool_file(filepath)
+
+        filepath = os.path.abspath(filepath)
+        module_name = os.path.basename(filepath).replace(".py", "")
+        source, digest = _read_source(filepath)
+        if source is None or self.hashes.get(filepath) == digest:
+            return
+
+        try:
+            metadata = self.manifest.tools_for(filepath, digest, source)
+        except NotStatic:
+            metadata = None
+        if not metadata:
+            # Dynamic metadata (or no @tool at all): only importing can tell
+            return self._import_source(filepath, source, digest)
+
+        started = time.perf_counter()
+        new_tools = {meta["name"]: LazyTool(filepath, meta) for meta in metadata}
+        removed = self._swap_file(filepath, digest, new_tools)
+        self.reload_metrics.record(time.perf_counter() - started, True)
+        for tool_name in new_tools:
+            print(f"💤 Registered tool: {tool_name} (from {module_name}, lazy)")
+        for tool_name in removed:
+            print(f"🗑️  Unregistered tool: {tool_name} (from {module_name})")
+
+        for hook in self.reload_hooks:
+            hook(filepath, list(new_tools.values()))
+
+    def save_manifest(self):
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def materialize(self, tool_name):
+        """Imports the module behind a lazy tool and returns the real function."""
+        with self.import_lock:
+            tool_func = self.tools.get(tool_name)
+            if getattr(tool_func, "_is_lazy", False):
+                filepath = tool_func.filepath
+                source, digest = _read_source(filepath)
+                if source is not None:
+                    self._import_source(filepath, source, digest, materializing=True)
+                tool_func = self.tools.get(tool_name)
+        return tool_func
+
+    def warm_up(self):
+        """Imports every still-lazy tool module, so first calls skip the import."""
+        for filepath in list(self.files):
+            self.warm_file(filepath)
+
+    def warm_file(self, filepath):
+        """
+        Imports a file's still-lazy tools now instead of on their first call.
+        Process tools stay lazy: pool workers import them, this process never does.
+        """
+        for tool_name in self.files.get(os.path.abspath(filepath), ()):
+            tool_func = self.tools.get(tool_name)
+            if (
+                getattr(tool_func, "_is_lazy", False)
+                and tool_func._tool_metadata.get("execution") != "process"
+            ):
+                self.materialize(tool_name)
 
     def load_tool_file(self, filepath):
-        """Dynamically loads a python module and scans for @tool decorated functions."""
+        """
+        Dynamically loads a python module and scans for @tool decorated functions.
+
+        The module is compiled and executed without holding the lock, then its
+        tools replace the ones the file provided before in one swap. A file
+        whose content hash is unchanged is skipped.
+        """
+        filepath = os.path.abspath(filepath)
+        source, digest = _read_source(filepath)
+        if source is None or self.hashes.get(filepath) == digest:
+            return
+        self._import_source(filepath, source, digest)
+
+    def _import_source(self, filepath, source, digest, materializing=False):
         module_name = os.path.basename(filepath).replace(".py", "")
         spec = importlib.util.spec_from_file_location(module_name, filepath)
+        if not (spec and spec.loader):
+            return
 
-        if spec and spec.loader:
-            try:
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-
-                # --- NEW LOGIC: SCAN FOR DECORATED FUNCTIONS ---
-                loaded_count = 0
-                for name, obj in inspect.getmembers(module):
-                    # Check if it's a function and has our specific tag
-                    if inspect.isfunction(obj) and getattr(
-                        obj, "_is_switchblade_tool", False
-                    ):
-                        meta = obj._tool_metadata
-                        tool_name = meta["name"]
-
-                        with self.lock:
-                            # Register the function object directly
-                            self.tools[tool_name] = obj
-                            print(
-                                f"✅ Registered tool: {tool_name} (from {module_name})"
-                            )
-                            self.notify_subscribers(f"Tool '{tool_name}' updated")
-                            loaded_count += 1
-
-                if loaded_count == 0:
-                    print(f"⚠️  No tools found in {module_name} (Did you forget @tool?)")
-
-            except Exception as e:
-                print(f"❌ Failed to load {module_name}: {e}")
-
-    def notify_subscribers(self, message):
-        active_subs = []
-        for q in self.subscribers:
-            try:
-                q.put(
-                    switchblade_pb2.ToolsNotification(
-                        event_type="UPDATED", message=message
-                    )
-                )
-                active_subs.append(q)
-            except:
-                pass
-        self.subscribers = active_subs
+        started = time.perf_counter()
+        previous = sys.modules.get(module_name)
+        try:
+            module = importlib.util.module_from_spec(spec)
+            code = compile(source, filepath, "exec")
+            sys.modules[module_name] = module
+            # Execute exactly the bytes we hashed
+            exec(code, module.__dict__)
+        except Exception as e:
+            # Keep serving the last good version of this file
+            if previous is not None:
+                sys.modules[module_name] = previous
+            else:
+                sys.modules.pop(module_name, None)
+            print(f"❌ Failed to load {module_name}: {e}")
+            self.reload_metrics.record(time.perf_counter() - started, False)
+            return
 
-    def register_subscriber(self, q):
-        with self.lock:
-            self.subscribers.append(q)
+        # --- NEW LOGIC: SCAN FOR DECORATED FUNCTIONS ---
+        new_tools = {}
+        for name, obj in inspect.getmembers(module):
+            # Check if it's a function and has our specific tag
+            if inspect.isfunction(obj) and getattr(obj, "_is_switchblade_tool", False):
+                new_tools[obj._tool_metadata["name"]] = obj
+
+        if not new_tools:
+            print(f"⚠️  No tools found in {module_name} (Did you forget @tool?)")
+
+        # Swapping a lazy stand-in for its function is invisible to clients
+        removed = self._swap_file(filepath, digest, new_tools, announce=not materializing)
+        self.reload_metrics.record(time.perf_counter() - started, True)
+        for tool_name in new_tools:
+            print(f"✅ Registered tool: {tool_name} (from {module_name})")
+        for tool_name in removed:
+            print(f"🗑️  Unregistered tool: {tool_name} (from {module_name})")
+
+        if materializing:
+            # The hooks already saw this file when it was registered lazily
+            return
+        for hook in self.reload_hooks:
+            hook(filepath, list(new_tools.values()))
+
+    def remove_tool_file(self, filepath):
+        """Unregisters every tool a deleted (or renamed) file provided."""
+        filepath = os.path.abspath(filepath)
+        module_name = os.path.basename(filepath).replace(".py", "")
+        removed = self._swap_file(filepath, None, {})
+        if self.manifest is not None:
+            self.manifest.forget(filepath)
+
+        module = sys.modules.get(module_name)
+        if module is not None and getattr(module, "__file__", None) == filepath:
+            # Drop the last strong reference so the old module can be collected
+            del sys.modules[module_name]
+
+        for tool_name in removed:
+            print(f"🗑️  Unregistered tool: {tool_name} (from {module_name})")
+        for hook in self.reload_hooks:
+            hook(filepath, [])
+
+    def _swap_file(self, filepath, digest, new_tools, announce=True):
+        """
+        Publishes a snapshot in which `filepath` provides exactly `new_tools`.
+        Returns removed names. With announce=False the version only moves if
+        a descriptor changed.
+        """
+        # Serialize and compile schemas before taking the lock
+        descriptors = {name: _tool_descriptor(func) for name, func in new_tools.items()}
+        validators = {name: _input_validator(d) for name, d in descriptors.items()}
 
-    def remove_subscriber(self, q):
         with self.lock:
-            if q in self.subscribers:
-                self.subscribers.remove(q)
+            current = self.snapshot
+            if not announce:
+                announce = current.files.get(filepath, frozenset()) != set(new_tools) or any(
+                    current.descriptors.get(name) != descriptor
+                    for name, descriptor in descriptors.items()
+                )
+            removed = [
+                name
+                for name in current.files.get(filepath, ())
+                if name not in new_tools and current.owners.get(name) == filepath
+            ]
+
+            tools = dict(current.tools)
+            all_descriptors = dict(current.descriptors)
+            all_validators = dict(current.validators)
+            owners = dict(current.owners)
+            for name in removed:
+                del tools[name]
+                del all_descriptors[name]
+                del all_validators[name]
+                del owners[name]
+            tools.update(new_tools)
+            all_descriptors.update(descriptors)
+            all_validators.update(validators)
+            for name in new_tools:
+                owners[name] = filepath
+
+            files = dict(current.files)
+            if new_tools:
+                files[filepath] = frozenset(new_tools)
+            else:
+                files.pop(filepath, None)
+            if digest is None:
+                self.hashes.pop(filepath, None)
+            else:
+                self.hashes[filepath] = digest
+
+            changed = announce and bool(removed or new_tools)
+            version = current.version + 1 if changed else current.version
+            new_changes = []
+            if changed:
+                for name, descriptor in descriptors.items():
+                    change_type = (
+                        switchblade_pb2.CHANGE_UPDATED
+                        if name in current.descriptors
+                        else switchblade_pb2.CHANGE_ADDED
+                    )
+                    new_changes.append(
+                        switchblade_pb2.ToolChange(
+                            change_type=change_type, tool_name=name, tool=descriptor, version=version
+                        )
+                    )
+                for name in removed:
+                    new_changes.append(
+                        switchblade_pb2.ToolChange(
+                            change_type=switchblade_pb2.CHANGE_REMOVED, tool_name=name, version=version
+                        )
+                    )
+            changes, log_base = _trim_change_log(
+                current.changes + tuple(new_changes), current.log_base
+            )
+            self.snapshot = RegistrySnapshot(
+                current.generation + 1,
+                version,
+                current.epoch,
+                tools,
+                all_descriptors,
+                all_validators,
+                owners,
+                files,
+                # Same version, same descriptors: keep the built catalog
+                None if changed else current.catalog,
+                changes,
+                log_base,
+            )
+
+        if not announce:
+            return removed
+        for change in new_changes:
+            event_type = switchblade_pb2.ChangeType.Name(change.change_type)[len("CHANGE_"):]
+            self.notify_subscribers(
+                f"Tool '{change.tool_name}' {event_type.lower()}",
+                key=change.tool_name,
+                event_type=event_type,
+                version=version,
+                change_type=change.change_type,
+                tool_names=[change.tool_name],
+            )
+        return removed
+
+    def changes_since(self, version, epoch):
+        return self.snapshot.changes_since(version, epoch)
+
+    def catalog(self):
+        """Returns the current ListToolsResponse, built once per version."""
+        return self.snapshot.catalog
+
+    def notify_subscribers(self, message, key=None, event_type="UPDATED", **fields):
+        # Never blocks: watchers only get a wake-up, see NotificationHub
+        self.hub.publish(event_type, message, key=key, **fields)
+
+
+def _trim_change_log(changes, log_base):
+    """Drops the oldest versions' changes, whole versions at a time, past CHANGE_LOG_SIZE."""
+    if len(changes) <= CHANGE_LOG_SIZE:
+        return changes, log_base
+    cut = len(changes) - CHANGE_LOG_SIZE
+    while cut < len(changes) and changes[cut].version == changes[cut - 1].version:
+        cut += 1
+    return changes[cut:], changes[cut - 1].version
+
+
+class ReloadScheduler:
+    """
+    Debounces file events: one editor save often fires several, so a path is
+    only reloaded (or removed) after it has been quiet for `delay` seconds.
+    The work runs on this scheduler's own thread, never on a request thread.
+    """
+
+    def __init__(self, registry, delay=RELOAD_DEBOUNCE_SECONDS):
+        self.registry = registry
+        self.delay = delay
+        self.pending = {}  # path -> (due time, "load" | "remove")
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(
+            target=self._run, name="switchblade-reload", daemon=True
+        )
+        self.thread.start()
+
+    def schedule(self, path, action):
+        with self.cond:
+            # A later event for the same path supersedes the earlier one
+            self.pending[path] = (time.monotonic() + self.delay, action)
+            self.cond.notify()
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.stopped:
+                    now = time.monotonic()
+                    due = [p for p, (when, _) in self.pending.items() if when <= now]
+                    if due:
+                        break
+                    next_due = min((when for when, _ in self.pending.values()), default=None)
+                    self.cond.wait(None if next_due is None else next_due - now)
+                if self.stopped:
+                    return
+                work = [(path, self.pending.pop(path)[1]) for path in due]
+
+            for path, action in work:
+                if action == "remove":
+                    self.registry.remove_tool_file(path)
+                else:
+                    self.registry.register_file(path)
+                    # A hot-reloaded module compiles here, not on the next call
+                    self.registry.warm_file(path)
+            self.registry.save_manifest()
 
 
 class ToolFileHandler(FileSystemEventHandler):
     def __init__(self, registry):
         self.registry = registry
+        self.scheduler = ReloadScheduler(registry)
 
     def on_modified(self, event):
         if event.src_path.endswith(".py"):
-            self.registry.load_tool_file(event.src_path)
+            self.scheduler.schedule(event.src_path, "load")
 
     def on_created(self, event):
         if event.src_path.endswith(".py"):
-            self.registry.load_tool_file(event.src_path)
+            self.scheduler.schedule(event.src_path, "load")
+
+    def on_deleted(self, event):
+        if event.src_path.endswith(".py"):
+            self.scheduler.schedule(event.src_path, "remove")
+
+    def on_moved(self, event):
+        if event.src_path.endswith(".py"):
+            self.scheduler.schedule(event.src_path, "remove")
+        if event.dest_path.endswith(".py"):
+            self.scheduler.schedule(event.dest_path, "load")
 
 
 class SwitchbladeServiceImpl(switchblade_pb2_grpc.SwitchbladeServiceServicer):
-    def __init__(self, registry):
+    # Queue bound for tools with max_concurrency but no max_queue_depth
+    default_queue_depth = THREADED_QUEUE_DEPTH
+
+    def __init__(
+        self, registry, process_pool=None, max_workers=TOOL_EXECUTOR_WORKERS, handler_executor=None
+    ):
         self.registry = registry
+        self.process_pool = process_pool
+        # Runs blocking tools for aio mode and batch fan-out in both modes
+        self.executor = MeteredExecutor(
+            max_workers=max_workers, thread_name_prefix="switchblade-tool"
+        )
+        # The grpc.server pool running calls in thread mode, None in aio mode
+        self.handler_executor = handler_executor
+        self.gates = {}  # tool_name -> ToolGate, only for tools declaring limits
+        self.gates_lock = threading.Lock()
+        self.result_cache = ResultCache(CACHE_MAX_ENTRIES)
+        registry.reload_hooks.append(self._invalidate_cache)
+        self.tool_metrics = {}  # tool_name -> ToolMetrics, created on first call
+        self.started_at = time.monotonic()
+
+    def _runs_in_pool(self, tool_func):
+        return (
+            self.process_pool is not None
+            and tool_func._tool_metadata.get("execution") == "process"
+        )
+
+    def _lookup(self, tool_name):
+        """
+        Finds a tool and its argument validator in one registry snapshot,
+        importing the tool's module first if it is still lazy.
+        """
+        snapshot = self.registry.snapshot
+        tool_func = snapshot.tools.get(tool_name)
+        # Pool workers import the file themselves, this process never needs it
+        if getattr(tool_func, "_is_lazy", False) and not self._runs_in_pool(tool_func):
+            self.registry.materialize(tool_name)
+            snapshot = self.registry.snapshot
+            tool_func = snapshot.tools.get(tool_name)
+        return tool_func, snapshot.validators.get(tool_name)
 
     def ListTools(self, request, context):
-        tool_list = []
-        with self.registry.lock:
-            for name, func_obj in self.registry.tools.items():
-                # Extract metadata from the function object
-                meta = func_obj._tool_metadata
-
-                tool_list.append(
-                    switchblade_pb2.Tool(
-                        name=meta["name"],
-                        description=meta["description"],
-                        input_schema_json=json.dumps(meta["input_schema"]),
-                        output_schema_json=json.dumps(meta["output_schema"]),
-                    )
-                )
-        return switchblade_pb2.ListToolsResponse(tools=tool_list)
+        snapshot = self.registry.snapshot
+        if (
+            request.known_version == snapshot.version
+            and request.known_epoch == snapshot.epoch
+        ):
+            catalog = switchblade_pb2.ListToolsResponse(
+                version=snapshot.version, epoch=snapshot.epoch, not_modified=True
+            )
+        else:
+            catalog = snapshot.catalog
+        # Catalogs of a few hundred tools are worth compressing
+        _compress_if_large(context, catalog.ByteSize())
+        return catalog
+
+    def ListToolsSince(self, request, context):
+        delta = self.registry.changes_since(request.version, request.epoch)
+        _compress_if_large(context, delta.ByteSize())
+        return delta
 
     def CallTool(self, request, context):
+        response = self._call_one(request, context)
+        _compress_if_large(context, _response_size(response))
+        return response
+
+    def BatchCallTool(self, request, context):
+        # One token for the whole batch: the batch deadline bounds every item
+        token = _call_token(context)
+        span = tracing.start_span(
+            "BatchCallTool", _trace_parent(context), calls=len(request.calls)
+        )
+        pending = {
+            self.executor.submit(self._batch_item, call, token, span): index
+            for index, call in enumerate(request.calls)
+        }
+        compressing = _compress_stream(context)
+        try:
+            # Results go out in completion order, tagged with their request index
+            for future in futures.as_completed(pending):
+                response = future.result()
+                if compressing:
+                    _skip_if_small(context, _response_size(response))
+                yield switchblade_pb2.BatchCallToolResult(
+                    index=pending[future], response=response
+                )
+                if request.fail_fast and response.is_error:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+            tracing.finish(span)
+
+    def _batch_item(self, request, token, span=None):
+        try:
+            return self._call_one(request, token=token, parent=span)
+        except (ToolBusy, InvalidArguments) as e:
+            return switchblade_pb2.CallToolResponse(is_error=True, error_message=str(e))
+
+    def _call_one(self, request, context=None, token=None, parent=None):
+        parent = parent or _trace_parent(context)
+        with tracing.span("CallTool", parent, tool=request.tool_name) as span:
+            response = self._call_traced(request, context, token)
+            if span is not None and response.is_error:
+                span.error = response.error_message
+            return response
+
+    def _call_traced(self, request, context, token):
         # Retrieve the function directly
-        tool_func = self.registry.tools.get(request.tool_name)
+        tool_func, validator = self._lookup(request.tool_name)
 
         if not tool_func:
             return switchblade_pb2.CallToolResponse(
                 is_error=True, error_message=f"Tool '{request.tool_name}' not found"
             )
 
+        tool_metrics = self._metrics_for(request.tool_name)
+        tool_metrics.begin(_request_size(request))
+        response = None
         try:
-            args = json.loads(request.arguments_json) if request.arguments_json else {}
+            response = self._respond(tool_func, validator, request, context, token)
+            return response
+        finally:
+            tool_metrics.end(_response_size(response), response is None or response.is_error)
 
+    def _respond(self, tool_func, validator, request, context, token):
+        try:
+            with tracing.span("decode_arguments"):
+                args = _decode_arguments(request)
+        except Exception as e:
+            return switchblade_pb2.CallToolResponse(is_error=True, error_message=str(e))
+        # Rejected before the call takes a concurrency slot
+        self._validate(validator, request.tool_name, args, context)
+
+        try:
             # --- EXECUTE THE FUNCTION DIRECTLY ---
-            result = tool_func(args)
+            token = token or _call_token(context)
+            result = self._execute_cached(tool_func, request.tool_name, args, context, token)
 
+            with tracing.span("encode_result"):
+                return _encode_response(result, request)
+        except ToolBusy as e:
+            self._reject_busy(e, context)
+        except Exception as e:
             return switchblade_pb2.CallToolResponse(
-                content_json=json.dumps(result), is_error=False
+                is_error=True, error_message=str(e)
             )
+
+    def _execute_cached(self, tool_func, tool_name, args, context, token):
+        """
+        Runs a tool inside its concurrency gate. Cacheable tools are served from
+        the result cache, and identical in-flight calls share one execution.
+        """
+        meta = tool_func._tool_metadata
+        key = self.result_cache.key_for(tool_name, args) if meta.get("cacheable") else None
+
+        def run():
+            with self._admitted(tool_func, context, token) as waited:
+                if waited:
+                    tracing.record("queue_wait", waited)
+                started = time.perf_counter()
+                try:
+                    with tracing.span("execute", tool=tool_name):
+                        return self._execute(tool_func, tool_name, args, token)
+                finally:
+                    self._metrics_for(tool_name).observe(waited, time.perf_counter() - started)
+
+        if key is None:
+            return run()
+        return self.result_cache.get_or_call(key, meta.get("cache_ttl"), run, token)
+
+    def _invalidate_cache(self, filepath, tool_funcs):
+        # Reloaded tools, plus any cached tool that no longer exists
+        stale = {func._tool_metadata["name"] for func in tool_funcs}
+        stale.update(self.result_cache.cached_tools() - set(self.registry.tools))
+        self.result_cache.invalidate(stale)
+
+    def cache_stats(self):
+        """Per-tool result cache hit/miss/shared/eviction counters."""
+        return self.result_cache.stats()
+
+    def _metrics_for(self, tool_name):
+        tool_metrics = self.tool_metrics.get(tool_name)
+        if tool_metrics is None:
+            # setdefault keeps the first one if two calls race to create it
+            tool_metrics = self.tool_metrics.setdefault(tool_name, ToolMetrics(tool_name))
+        return tool_metrics
+
+    def GetStats(self, request, context):
+        stats = self.stats()
+        _compress_if_large(context, stats.ByteSize())
+        return stats
+
+    def stats(self):
+        """Snapshot of every counter as a ServerStats message."""
+        stats = switchblade_pb2.ServerStats(
+            watch_subscribers=self.registry.hub.subscriber_count(),
+            registry_version=self.registry.version,
+            uptime_seconds=time.monotonic() - self.started_at,
+        )
+        if self.handler_executor is not None:
+            self.handler_executor.fill(stats)
+            self.executor.fill(stats, "batch_executor")
+        else:
+            self.executor.fill(stats)
+        self.registry.reload_metrics.fill(stats)
+
+        gates = self.gate_stats()
+        caches = self.cache_stats()
+        names = set(self.tool_metrics) | set(gates) | set(caches)
+        for name in sorted(names):
+            tool = stats.tools.add(name=name)
+            if name in self.tool_metrics:
+                self.tool_metrics[name].fill(tool)
+            if name in gates:
+                tool.rejected = gates[name]["rejected"]
+                tool.queued = gates[name]["queued"]
+            if name in caches:
+                tool.cache_hits = caches[name]["hits"]
+                tool.cache_misses = caches[name]["misses"]
+                tool.cache_shared = caches[name]["shared"]
+                tool.cache_evictions = caches[name]["evictions"]
+        return stats
+
+    def CallToolStream(self, request, context):
+        sequence = itertools.count()
+        tool_func, validator = self._lookup(request.tool_name)
+
+        if not tool_func:
+            yield _error_chunk(sequence, f"Tool '{request.tool_name}' not found")
+            return
+
+        tool_metrics = self._metrics_for(request.tool_name)
+        tool_metrics.begin(_request_size(request))
+        # Not made current: a generator's context changes would leak to the caller
+        span = tracing.start_span(
+            "CallToolStream", _trace_parent(context), tool=request.tool_name
+        )
+        bytes_out, ok = 0, False
+        compressing = _compress_stream(context)
+        try:
+            for chunk in self._stream(tool_func, validator, request, context, sequence, span):
+                bytes_out += len(chunk.content_json)
+                ok = chunk.is_final and not chunk.is_error
+                if compressing:
+                    _skip_if_small(context, len(chunk.content_json))
+                yield chunk
+        finally:
+            tool_metrics.end(bytes_out, not ok)
+            tracing.finish(span, None if ok else "Stream did not complete")
+
+    def _stream(self, tool_func, validator, request, context, sequence, span=None):
+        try:
+            args = _decode_arguments(request)
         except Exception as e:
-            return switchblade_pb2.CallToolResponse(is_error=True, error_message=str(e))
+            yield _error_chunk(sequence, str(e))
+            return
+        self._validate(validator, request.tool_name, args, context)
+        token = _call_token(context)
+
+        try:
+            with self._admitted(tool_func, context, token) as waited:
+                if waited:
+                    tracing.record("queue_wait", waited, span)
+                started = time.perf_counter()
+                try:
+                    # Items are pulled one at a time, so only the current item is in memory
+                    for item in self._iter_results(tool_func, request.tool_name, args, token):
+                        yield from _stream_chunks(item, sequence)
+                except Exception as e:
+                    yield _error_chunk(sequence, str(e))
+                    return
+                finally:
+                    self._metrics_for(request.tool_name).observe(
+                        waited, time.perf_counter() - started
+                    )
+        except ToolBusy as e:
+            self._reject_busy(e, context)
+        yield switchblade_pb2.CallToolChunk(sequence=next(sequence), is_final=True)
+
+    def _validate(self, validator, tool_name, args, context):
+        """
+        Checks args against the tool's compiled input_schema. Without a context
+        (batch items) InvalidArguments propagates instead of aborting.
+        """
+        if validator is None:
+            return
+        errors = validator(args)
+        if not errors:
+            return
+        e = InvalidArguments(tool_name, errors)
+        if context is None:
+            raise e
+        context.set_trailing_metadata(e.trailing_metadata())
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    def _execute(self, tool_func, tool_name, args, token):
+        """Runs a tool to completion; generator tools are collected into a list."""
+        meta = tool_func._tool_metadata
+        if self._runs_in_pool(tool_func):
+            return self.process_pool.call(tool_name, args, token=token)
+        if meta.get("is_async"):
+            # No loop in this handler thread, so drive the coroutine here
+            return _run_cancellable(invoke(tool_func, args, token), token)
+        if meta.get("is_generator") or meta.get("is_async_generator"):
+            return _collect(self._iter_results(tool_func, tool_name, args, token))
+        return invoke(tool_func, args, token)
+
+    def _iter_results(self, tool_func, tool_name, args, token):
+        """Yields a tool's items as produced; plain tools yield their one result."""
+        meta = tool_func._tool_metadata
+        if self._runs_in_pool(tool_func):
+            yield self.process_pool.call(tool_name, args, token=token)
+        elif meta.get("is_async_generator"):
+            yield from _until_cancelled(
+                _drive_async_generator(invoke(tool_func, args, token)), token
+            )
+        elif meta.get("is_generator"):
+            yield from _until_cancelled(invoke(tool_func, args, token), token)
+        else:
+            yield self._execute(tool_func, tool_name, args, token)
+
+    @contextlib.contextmanager
+    def _admitted(self, tool_func, context, token=None):
+        """
+        Holds one of the tool's concurrency slots for the duration of a call.
+        Raises ToolBusy when the tool's queue is full, see _reject_busy, and
+        ToolCancelled when the call's deadline passes before it gets a slot.
+        """
+        if token is not None:
+            token.raise_if_cancelled()
+        gate = self._gate_for(tool_func)
+        if gate is None:
+            yield 0.0
+            return
+
+        try:
+            waited = gate.acquire(None if token is None else token.remaining())
+        except TimeoutError:
+            raise ToolCancelled(f"Deadline exceeded waiting for a '{gate.tool_name}' slot")
+        if token is not None and token.cancelled:
+            # Gone while it was queued, don't spend the slot on it
+            gate.release()
+            token.raise_if_cancelled()
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            gate.release(time.monotonic() - started)
+            if context is not None:
+                context.set_trailing_metadata(_queue_metadata(gate, waited))
+
+    def _reject_busy(self, e, context):
+        """Aborts with RESOURCE_EXHAUSTED; without a context (batch items) re-raises."""
+        if context is None:
+            raise e
+        context.set_trailing_metadata(e.trailing_metadata())
+        context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+    def _gate_for(self, tool_func):
+        """Returns the ToolGate enforcing this tool's limits, or None if unlimited."""
+        meta = tool_func._tool_metadata
+        limits = ToolGate.limits_for(meta, self.default_queue_depth)
+        if limits == (None, None):
+            return None
+        with self.gates_lock:
+            gate = self.gates.get(meta["name"])
+            # A reload may have changed the limits; in-flight calls keep the old gate
+            if gate is None or (gate.max_concurrency, gate.max_queue_depth) != limits:
+                gate = ToolGate.from_metadata(meta, self.default_queue_depth)
+                self.gates[meta["name"]] = gate
+        return gate
+
+    def gate_stats(self):
+        """Per-tool running/queued counts and queue wait times."""
+        with self.gates_lock:
+            gates = list(self.gates.values())
+        return {gate.tool_name: gate.stats() for gate in gates}
 
     def WatchTools(self, request, context):
-        q = queue.Queue()
-        self.registry.register_subscriber(q)
+        wakeup = threading.Event()
+        try:
+            subscription = self.registry.hub.subscribe(wakeup.set, request.resume_token)
+        except WatcherLimitReached as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+        # Wake immediately on disconnect instead of at the next notification
+        context.add_callback(wakeup.set)
         try:
             while context.is_active():
-                notification = q.get()
-                yield notification
-        except Exception:
-            pass
+                wakeup.wait()
+                wakeup.clear()
+                for notification in subscription.drain():
+                    yield notification
+        finally:
+            self.registry.hub.unsubscribe(subscription)
+
+
+def _request_size(request):
+    return len(request.arguments) or len(request.arguments_json)
+
+
+def _response_size(response):
+    if response is None:
+        return 0
+    return len(response.content) or len(response.content_json)
+
+
+def _compress_if_large(context, size):
+    """
+    Compresses a unary response when it is over the configured threshold.
+    aio servers compress everything by default (see serve_async), so small
+    responses opt out explicitly.
+    """
+    algorithm = grpc_options.compression_for(size)
+    if algorithm is not None:
+        context.set_compression(algorithm)
+    else:
+        context.disable_next_message_compression()
+
+
+def _compress_stream(context):
+    """
+    Streams pick their algorithm before the first message, so compression is
+    switched on up front and _skip_if_small() opts small messages out.
+    """
+    algorithm = grpc_options.compression_for(grpc_options.COMPRESSION_MIN_BYTES)
+    if algorithm is None:
+        return False
+    context.set_compression(algorithm)
+    return True
+
+
+def _skip_if_small(context, size):
+    if size < grpc_options.COMPRESSION_MIN_BYTES:
+        context.disable_next_message_compression()
+
+
+def _decode_arguments(request):
+    if request.codec != payload_codecs.CODEC_UNSPECIFIED:
+        return payload_codecs.decode(request.arguments, request.codec)
+    return json.loads(request.arguments_json) if request.arguments_json else {}
+
+
+def _encode_response(result, request):
+    """Encodes with the best codec the caller accepts, else the legacy JSON string."""
+    codec = payload_codecs.negotiate(request.accept_codecs)
+    if codec == payload_codecs.CODEC_UNSPECIFIED:
+        return switchblade_pb2.CallToolResponse(
+            content_json=json.dumps(result), is_error=False
+        )
+    return switchblade_pb2.CallToolResponse(
+        content=payload_codecs.encode(result, codec), codec=codec, is_error=False
+    )
+
+
+def _trace_parent(context):
+    """The caller's span from the traceparent metadata, None without one."""
+    if context is None or not tracing.enabled():
+        return None
+    return tracing.extract(context.invocation_metadata())
+
+
+def _time_remaining(context):
+    """The RPC's remaining time in seconds, None when the client set no deadline."""
+    remaining = context.time_remaining()
+    # Without a deadline the sync server reports roughly "infinity" in seconds,
+    # far more than Event.wait() or time_t can take
+    if remaining is None or remaining > MAX_DEADLINE_SECONDS:
+        return None
+    return remaining
+
+
+def _call_token(context):
+    """CancellationToken bound to the RPC's deadline, cancelled when the RPC ends."""
+    if context is None:
+        return CancellationToken()
+    token = CancellationToken.with_timeout(_time_remaining(context))
+    # Also fires after a normal finish, when nobody is looking at the token anymore
+    context.add_callback(token.cancel)
+    return token
+
+
+def _run_cancellable(coro, token):
+    """Runs a coroutine on a private loop, cancelling its task with the token."""
+
+    async def main():
+        task = asyncio.ensure_future(coro)
+        loop = asyncio.get_running_loop()
+
+        def cancel():
+            loop.call_soon_threadsafe(task.cancel)
+
+        token.add_callback(cancel)
+        try:
+            return await asyncio.wait_for(task, token.remaining())
+        except asyncio.CancelledError:
+            raise ToolCancelled(token.reason or "Cancelled")
+        except asyncio.TimeoutError:
+            raise ToolCancelled("Deadline exceeded")
+        finally:
+            token.remove_callback(cancel)
+
+    return asyncio.run(main())
+
+
+def _until_cancelled(items, token):
+    """Stops pulling a generator tool's items once its call is cancelled."""
+    try:
+        for item in items:
+            token.raise_if_cancelled()
+            yield item
+    finally:
+        items.close()
+
+
+def _dispatch(token, fn, *args):
+    """Executor entry point: drops calls that expired while queued for a thread."""
+    token.raise_if_cancelled()
+    return fn(*args)
+
+
+def _collect(items):
+    return [item for item in items if not isinstance(item, Progress)]
+
+
+def _drive_async_generator(agen):
+    """Iterates an async generator from a thread that has no event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+
+def _stream_chunks(item, sequence):
+    """Encodes one yielded item as CallToolChunks of at most STREAM_CHUNK_BYTES."""
+    is_progress = isinstance(item, Progress)
+    # ensure_ascii (the default) keeps len() equal to the encoded byte size
+    payload = json.dumps(item.to_dict() if is_progress else item)
+    for start in range(0, max(len(payload), 1), STREAM_CHUNK_BYTES):
+        end = start + STREAM_CHUNK_BYTES
+        yield switchblade_pb2.CallToolChunk(
+            sequence=next(sequence),
+            content_json=payload[start:end],
+            more=end < len(payload),
+            is_progress=is_progress,
+        )
+
+
+def _error_chunk(sequence, message):
+    return switchblade_pb2.CallToolChunk(
+        sequence=next(sequence), is_error=True, error_message=message, is_final=True
+    )
+
+
+def _queue_metadata(gate, waited):
+    """Trailing metadata exposing how long a limited call queued and the backlog."""
+    stats = gate.stats()
+    return (
+        ("x-switchblade-queue-wait-ms", f"{waited * 1000:.1f}"),
+        ("x-switchblade-queue-depth", str(stats["queued"])),
+    )
+
+
+class AsyncSwitchbladeServiceImpl(SwitchbladeServiceImpl):
+    """
+    grpc.aio flavour of the service. Coroutine tools are awaited on the loop,
+    plain functions are pushed to a bounded executor so they cannot stall it.
+    """
+
+    # Queued calls are coroutines here and hold no thread
+    default_queue_depth = None
+
+    async def ListTools(self, request, context):
+        return super().ListTools(request, context)
+
+    async def ListToolsSince(self, request, context):
+        return super().ListToolsSince(request, context)
+
+    async def GetStats(self, request, context):
+        return super().GetStats(request, context)
+
+    async def CallTool(self, request, context):
+        response = await self._call_one_async(request, context)
+        _compress_if_large(context, _response_size(response))
+        return response
+
+    async def BatchCallTool(self, request, context):
+        token = _call_token_async(context)
+        span = tracing.start_span(
+            "BatchCallTool", _trace_parent(context), calls=len(request.calls)
+        )
+        tasks = {
+            asyncio.ensure_future(self._batch_item_async(call, token, span)): index
+            for index, call in enumerate(request.calls)
+        }
+        pending = set(tasks)
+        compressing = _compress_stream(context)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    response = task.result()
+                    if compressing:
+                        _skip_if_small(context, _response_size(response))
+                    yield switchblade_pb2.BatchCallToolResult(
+                        index=tasks[task], response=response
+                    )
+                    if request.fail_fast and response.is_error:
+                        return
+        finally:
+            for task in pending:
+                task.cancel()
+            tracing.finish(span)
+
+    async def _batch_item_async(self, request, token, span=None):
+        try:
+            return await self._call_one_async(request, token=token, parent=span)
+        except (ToolBusy, InvalidArguments) as e:
+            return switchblade_pb2.CallToolResponse(is_error=True, error_message=str(e))
+
+    async def _lookup_async(self, tool_name):
+        snapshot = self.registry.snapshot
+        tool_func = snapshot.tools.get(tool_name)
+        if getattr(tool_func, "_is_lazy", False) and not self._runs_in_pool(tool_func):
+            # Importing runs arbitrary module code, keep it off the loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self._lookup, tool_name)
+        return tool_func, snapshot.validators.get(tool_name)
+
+    async def _call_one_async(self, request, context=None, token=None, parent=None):
+        parent = parent or _trace_parent(context)
+        with tracing.span("CallTool", parent, tool=request.tool_name) as span:
+            response = await self._call_traced_async(request, context, token)
+            if span is not None and response.is_error:
+                span.error = response.error_message
+            return response
+
+    async def _call_traced_async(self, request, context, token):
+        tool_func, validator = await self._lookup_async(request.tool_name)
+
+        if not tool_func:
+            return switchblade_pb2.CallToolResponse(
+                is_error=True, error_message=f"Tool '{request.tool_name}' not found"
+            )
+
+        tool_metrics = self._metrics_for(request.tool_name)
+        tool_metrics.begin(_request_size(request))
+        response = None
+        try:
+            response = await self._respond_async(tool_func, validator, request, context, token)
+            return response
         finally:
-            self.registry.remove_subscriber(q)
+            tool_metrics.end(_response_size(response), response is None or response.is_error)
 
+    async def _respond_async(self, tool_func, validator, request, context, token):
+        try:
+            with tracing.span("decode_arguments"):
+                args = _decode_arguments(request)
+        except Exception as e:
+            return switchblade_pb2.CallToolResponse(is_error=True, error_message=str(e))
+        await self._validate_async(validator, request.tool_name, args, context)
 
-def serve():
-    registry = ToolRegistry()
+        try:
+            token = token or _call_token_async(context)
+            result = await self._execute_cached_async(
+                tool_func, request.tool_name, args, context, token
+            )
 
+            with tracing.span("encode_result"):
+                return _encode_response(result, request)
+        except ToolBusy as e:
+            await self._reject_busy_async(e, context)
+        except Exception as e:
+            return switchblade_pb2.CallToolResponse(
+                is_error=True, error_message=str(e)
+            )
+
+    async def _execute_cached_async(self, tool_func, tool_name, args, context, token):
+        meta = tool_func._tool_metadata
+        key = self.result_cache.key_for(tool_name, args) if meta.get("cacheable") else None
+
+        async def run():
+            async with self._admitted_async(tool_func, context, token) as waited:
+                if waited:
+                    tracing.record("queue_wait", waited)
+                started = time.perf_counter()
+                try:
+                    with tracing.span("execute", tool=tool_name):
+                        return await self._execute_async(tool_func, tool_name, args, token)
+                finally:
+                    self._metrics_for(tool_name).observe(waited, time.perf_counter() - started)
+
+        if key is None:
+            return await run()
+        return await self.result_cache.get_or_call_async(
+            key, meta.get("cache_ttl"), run, token
+        )
+
+    async def CallToolStream(self, request, context):
+        sequence = itertools.count()
+        tool_func, validator = await self._lookup_async(request.tool_name)
+
+        if not tool_func:
+            yield _error_chunk(sequence, f"Tool '{request.tool_name}' not found")
+            return
+
+        tool_metrics = self._metrics_for(request.tool_name)
+        tool_metrics.begin(_request_size(request))
+        span = tracing.start_span(
+            "CallToolStream", _trace_parent(context), tool=request.tool_name
+        )
+        bytes_out, ok = 0, False
+        compressing = _compress_stream(context)
+        try:
+            async for chunk in self._stream_async(
+                tool_func, validator, request, context, sequence, span
+            ):
+                bytes_out += len(chunk.content_json)
+                ok = chunk.is_final and not chunk.is_error
+                if compressing:
+                    _skip_if_small(context, len(chunk.content_json))
+                yield chunk
+        finally:
+            tool_metrics.end(bytes_out, not ok)
+            tracing.finish(span, None if ok else "Stream did not complete")
+
+    async def _stream_async(self, tool_func, validator, request, context, sequence, span=None):
+        try:
+            args = _decode_arguments(request)
+        except Exception as e:
+            yield _error_chunk(sequence, str(e))
+            return
+        await self._validate_async(validator, request.tool_name, args, context)
+        token = _call_token_async(context)
+
+        try:
+            async with self._admitted_async(tool_func, context, token) as waited:
+                if waited:
+                    tracing.record("queue_wait", waited, span)
+                started = time.perf_counter()
+                try:
+                    async for item in self._iter_results_async(
+                        tool_func, request.tool_name, args, token
+                    ):
+                        for chunk in _stream_chunks(item, sequence):
+                            yield chunk
+                except Exception as e:
+                    yield _error_chunk(sequence, str(e))
+                    return
+                finally:
+                    self._metrics_for(request.tool_name).observe(
+                        waited, time.perf_counter() - started
+                    )
+        except ToolBusy as e:
+            await self._reject_busy_async(e, context)
+        yield switchblade_pb2.CallToolChunk(sequence=next(sequence), is_final=True)
+
+    async def _validate_async(self, validator, tool_name, args, context):
+        if validator is None:
+            return
+        errors = validator(args)
+        if not errors:
+            return
+        e = InvalidArguments(tool_name, errors)
+        if context is None:
+            raise e
+        context.set_trailing_metadata(e.trailing_metadata())
+        await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    async def _execute_async(self, tool_func, tool_name, args, token):
+        """
+        Coroutine tools are bounded by the deadline with wait_for and die with
+        the handler task when the client cancels; blocking tools get the token.
+        """
+        meta = tool_func._tool_metadata
+        loop = asyncio.get_running_loop()
+        if self._runs_in_pool(tool_func):
+            return await loop.run_in_executor(
+                self.executor,
+                lambda: self.process_pool.call(tool_name, args, token=token),
+            )
+        if meta.get("is_async"):
+            return await _with_deadline(invoke(tool_func, args, token), token)
+        if meta.get("is_async_generator"):
+            return await _with_deadline(
+                _collect_async(invoke(tool_func, args, token)), token
+            )
+        if meta.get("is_generator"):
+            return await loop.run_in_executor(
+                self.executor,
+                _dispatch, token, lambda: _collect(invoke(tool_func, args, token)),
+            )
+        return await loop.run_in_executor(
+            self.executor, _dispatch, token, invoke, tool_func, args, token
+        )
+
+    async def _iter_results_async(self, tool_func, tool_name, args, token):
+        meta = tool_func._tool_metadata
+        if self._runs_in_pool(tool_func):
+            yield await self._execute_async(tool_func, tool_name, args, token)
+        elif meta.get("is_async_generator"):
+            async for item in invoke(tool_func, args, token):
+                token.raise_if_cancelled()
+                yield item
+        elif meta.get("is_generator"):
+            # Each next() runs on the executor so a slow producer can't block the loop
+            loop = asyncio.get_running_loop()
+            generator = invoke(tool_func, args, token)
+            while True:
+                item = await loop.run_in_executor(
+                    self.executor, _dispatch, token, next, generator, _DONE
+                )
+                if item is _DONE:
+                    break
+                yield item
+        else:
+            yield await self._execute_async(tool_func, tool_name, args, token)
+
+    @contextlib.asynccontextmanager
+    async def _admitted_async(self, tool_func, context, token=None):
+        if token is not None:
+            token.raise_if_cancelled()
+        gate = self._gate_for(tool_func)
+        if gate is None:
+            yield 0.0
+            return
+
+        try:
+            waited = await asyncio.wait_for(
+                gate.acquire_async(), None if token is None else token.remaining()
+            )
+        except asyncio.TimeoutError:
+            # wait_for cancelled the acquire, which gave up its place in the queue
+            raise ToolCancelled(f"Deadline exceeded waiting for a '{gate.tool_name}' slot")
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            gate.release(time.monotonic() - started)
+            if context is not None:
+                context.set_trailing_metadata(_queue_metadata(gate, waited))
+
+    async def _reject_busy_async(self, e, context):
+        if context is None:
+            raise e
+        context.set_trailing_metadata(e.trailing_metadata())
+        await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+    async def WatchTools(self, request, context):
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        try:
+            subscription = self.registry.hub.subscribe(
+                lambda: loop.call_soon_threadsafe(wakeup.set), request.resume_token
+            )
+        except WatcherLimitReached as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+        try:
+            # Cancelled by grpc.aio as soon as the client goes away
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                for notification in subscription.drain():
+                    yield notification
+        finally:
+            self.registry.hub.unsubscribe(subscription)
+
+
+def _call_token_async(context):
+    if context is None:
+        return CancellationToken()
+    token = CancellationToken.with_timeout(_time_remaining(context))
+    context.add_done_callback(lambda _: token.cancel())
+    return token
+
+
+async def _with_deadline(coro, token):
+    try:
+        return await asyncio.wait_for(coro, token.remaining())
+    except asyncio.TimeoutError:
+        raise ToolCancelled("Deadline exceeded")
+
+
+async def _collect_async(agen):
+    return [item async for item in agen if not isinstance(item, Progress)]
+
+
+def _read_source(filepath):
+    """Returns (source bytes, sha256 hex) of a tool file, or (None, None)."""
+    try:
+        with open(filepath, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        print(f"❌ Failed to read {os.path.basename(filepath)}: {e}")
+        return None, None
+    return source, hashlib.sha256(source).hexdigest()
+
+
+def _load_registry(max_watchers=MAX_WATCHERS):
     if not os.path.exists(TOOLS_DIR):
         os.makedirs(TOOLS_DIR)
 
+    manifest = None
+    if LAZY_TOOLS:
+        manifest = ToolManifest(os.path.join(TOOLS_DIR, MANIFEST_FILENAME))
+    registry = ToolRegistry(max_watchers, manifest)
+    process_pool = ProcessWorkerPool(
+        size=PROCESS_WORKERS,
+        max_calls=PROCESS_MAX_CALLS,
+        max_rss_bytes=PROCESS_MAX_RSS_MB * 1024 * 1024,
+        call_timeout=PROCESS_CALL_TIMEOUT,
+    )
+
+    def refresh_pool(filepath, tool_funcs):
+        if any(f._tool_metadata.get("execution") == "process" for f in tool_funcs):
+            process_pool.reload(filepath)
+        elif filepath in process_pool.filepaths:
+            process_pool.forget(filepath)
+
+    registry.reload_hooks.append(refresh_pool)
+
     for filename in os.listdir(TOOLS_DIR):
         if filename.endswith(".py"):
-            registry.load_tool_file(os.path.join(TOOLS_DIR, filename))
+            registry.register_file(os.path.join(TOOLS_DIR, filename))
+    registry.save_manifest()
+
+    if WARMUP and manifest is not None:
+        threading.Thread(
+            target=registry.warm_up, name="switchblade-warmup", daemon=True
+        ).start()
+
+    # Pre-fork before the gRPC server spins up so the first call finds warm workers
+    if process_pool.filepaths:
+        process_pool.start()
 
     observer = Observer()
     observer.schedule(ToolFileHandler(registry), path=TOOLS_DIR, recursive=False)
     observer.start()
+    return registry, process_pool, observer
+
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    switchblade_pb2_grpc.add_SwitchbladeServiceServicer_to_server(
-        SwitchbladeServiceImpl(registry), server
+async def serve_async(control=None):
+    registry, process_pool, observer = _load_registry()
+    tracing.configure_from_env("switchblade-server")
+
+    # grpc.aio ignores set_compression() on unary responses, so compression is
+    # on server-wide and handlers opt small messages out instead
+    server = grpc.aio.server(
+        options=grpc_options.server_options(reuse_port=control is not None),
+        compression=grpc_options.compression_for(grpc_options.COMPRESSION_MIN_BYTES),
+    )
+    servicer = AsyncSwitchbladeServiceImpl(registry, process_pool)
+    switchblade_pb2_grpc.add_SwitchbladeServiceServicer_to_server(servicer, server)
+
+    server.add_insecure_port(LISTEN_ADDR)
+    _report_private_port(server, control)
+    print(f"🚀 Switchblade Server (aio) running on {LISTEN_ADDR}...")
+    metrics_server = serve_prometheus(METRICS_ADDR, servicer.stats) if METRICS_ADDR else None
+
+    try:
+        await server.start()
+        await server.wait_for_termination()
+    finally:
+        await server.stop(0)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        servicer.executor.shutdown(wait=False)
+        process_pool.stop()
+        observer.stop()
+        observer.join()
+
+
+def _report_private_port(server, control):
+    """Supervised workers also listen on a loopback port of their own for GetStats."""
+    if control is not None:
+        control.send(server.add_insecure_port("127.0.0.1:0"))
+        control.close()
+
+
+def _serve_worker(control, mode, settings):
+    """Entry point of one supervised server process."""
+    globals().update(settings)
+    # The supervisor's terminate() shuts a worker down the way Ctrl-C does
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    serve(mode, workers=1, control=control)
+
+
+def serve(mode=None, workers=None, control=None):
+    mode = mode or SERVER_MODE
+    workers = SERVER_WORKERS if workers is None else workers
+    if workers > 1:
+        # Module settings may have been changed in code, so hand them over;
+        # /metrics is served once, merged, by the supervisor
+        settings = {
+            "TOOLS_DIR": TOOLS_DIR,
+            "LISTEN_ADDR": LISTEN_ADDR,
+            "METRICS_ADDR": "",
+            "PROCESS_WORKERS": max(1, PROCESS_WORKERS // workers),
+        }
+        print(f"🧩 Supervising {workers} server workers on {LISTEN_ADDR}...")
+        Supervisor(_serve_worker, workers, (mode, settings), METRICS_ADDR).run()
+        return
+
+    if mode == "aio":
+        try:
+            asyncio.run(serve_async(control))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    registry, process_pool, observer = _load_registry(THREADED_MAX_WATCHERS)
+    tracing.configure_from_env("switchblade-server")
+
+    # Watchers hold their handler thread, so size the pool to keep 10 for calls
+    handler_executor = MeteredExecutor(
+        max_workers=10 + THREADED_MAX_WATCHERS, thread_name_prefix="switchblade-handler"
+    )
+    server = grpc.server(
+        handler_executor,
+        options=grpc_options.server_options(reuse_port=control is not None),
     )
+    servicer = SwitchbladeServiceImpl(registry, process_pool, handler_executor=handler_executor)
+    switchblade_pb2_grpc.add_SwitchbladeServiceServicer_to_server(servicer, server)
 
-    server.add_insecure_port("[::]:50051")
-    print("🚀 Switchblade Server running on port 50051...")
+    server.add_insecure_port(LISTEN_ADDR)
+    _report_private_port(server, control)
+    print(f"🚀 Switchblade Server running on {LISTEN_ADDR}...")
+    metrics_server = serve_prometheus(METRICS_ADDR, servicer.stats) if METRICS_ADDR else None
 
     try:
         server.start()
@@ -187,6 +1637,10 @@ def serve():
     except KeyboardInterrupt:
         observer.stop()
         server.stop(0)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        servicer.executor.shutdown(wait=False)
+        process_pool.stop()
     observer.join()
 
 
@@ -0,0 +1,321 @@
+import time
+import bisect
+import threading
+import contextvars
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..utils import tracing
+
+# Bucket upper bounds in seconds, from a cache hit to a long scan
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram; cheap enough to observe on every call."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Caller must hold the owner's lock."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def fill(self, message):
+        """Copies this histogram into a switchblade_pb2.Histogram."""
+        message.bounds.extend(self.bounds)
+        message.counts.extend(self.counts)
+        message.sum = self.sum
+        message.count = self.count
+
+
+class ToolMetrics:
+    """Per-tool counters, gauges and latency histograms."""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.queue_wait = Histogram()
+        self.execution = Histogram()
+
+    def begin(self, bytes_in):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.bytes_in += bytes_in
+
+    def end(self, bytes_out, is_error):
+        with self.lock:
+            self.in_flight -= 1
+            self.bytes_out += bytes_out
+            self.errors += is_error
+
+    def observe(self, waited, ran):
+        with self.lock:
+            self.queue_wait.observe(waited)
+            self.execution.observe(ran)
+
+    def fill(self, message):
+        with self.lock:
+            message.name = self.name
+            message.calls = self.calls
+            message.errors = self.errors
+            message.in_flight = self.in_flight
+            message.bytes_in = self.bytes_in
+            message.bytes_out = self.bytes_out
+            self.queue_wait.fill(message.queue_wait_seconds)
+            self.execution.fill(message.execution_seconds)
+
+
+class ReloadMetrics:
+    """Counts and times tool file loads on behalf of ToolRegistry."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reloads = 0
+        self.failures = 0
+        self.duration = Histogram()
+
+    def record(self, seconds, ok):
+        with self.lock:
+            self.reloads += 1
+            self.failures += not ok
+            self.duration.observe(seconds)
+
+    def fill(self, message):
+        with self.lock:
+            message.reloads = self.reloads
+            message.reload_failures = self.failures
+            self.duration.fill(message.reload_seconds)
+
+
+class MeteredExecutor(futures.ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor that tracks queued vs. running work and queue wait.
+    Work runs in a copy of the submitter's context, so trace spans follow it.
+    """
+
+    def __init__(self, max_workers=None, thread_name_prefix=""):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.max_workers = max_workers
+        self.stats_lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.queue_wait = Histogram()
+
+    def submit(self, fn, /, *args, **kwargs):
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+        with self.stats_lock:
+            self.queued += 1
+
+        def run():
+            waited = time.perf_counter() - submitted
+            with self.stats_lock:
+                self.queued -= 1
+                self.active += 1
+                self.queue_wait.observe(waited)
+            if tracing.current() is not None:
+                tracing.record("executor_queue_wait", waited)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.stats_lock:
+                    self.active -= 1
+
+        try:
+            return super().submit(context.run, run)
+        except BaseException:
+            with self.stats_lock:
+                self.queued -= 1
+            raise
+
+    def fill(self, message, prefix="executor"):
+        """Writes the <prefix>_* fields of a ServerStats message."""
+        with self.stats_lock:
+            setattr(message, f"{prefix}_max_workers", self.max_workers or 0)
+            setattr(message, f"{prefix}_active", self.active)
+            setattr(message, f"{prefix}_queued", self.queued)
+            self.queue_wait.fill(getattr(message, f"{prefix}_queue_wait_seconds"))
+
+
+# ServerStats fields that describe one process rather than add up across them
+_LARGEST_WINS = ("registry_version", "uptime_seconds")
+
+
+def _merge_histogram(into, other):
+    if not into.bounds:
+        into.bounds.extend(other.bounds)
+        into.counts.extend([0] * len(other.counts))
+    for index, count in enumerate(other.counts):
+        into.counts[index] += count
+    into.sum += other.sum
+    into.count += other.count
+
+
+def _merge_fields(into, other):
+    for field in other.DESCRIPTOR.fields:
+        if field.name in ("name", "tools"):
+            continue
+        if field.message_type is not None:
+            _merge_histogram(getattr(into, field.name), getattr(other, field.name))
+        elif field.name in _LARGEST_WINS:
+            setattr(into, field.name, max(getattr(into, field.name), getattr(other, field.name)))
+        else:
+            setattr(into, field.name, getattr(into, field.name) + getattr(other, field.name))
+
+
+def merge_stats(snapshots):
+    """
+    Combines the ServerStats of several server processes into one: counters,
+    gauges and histogram buckets add up, per tool by name. The registry
+    version and uptime are per process, so the largest is kept.
+    """
+    merged = type(snapshots[0])()
+    tools = {}
+    for stats in snapshots:
+        _merge_fields(merged, stats)
+        for tool in stats.tools:
+            if tool.name not in tools:
+                tools[tool.name] = merged.tools.add(name=tool.name)
+            _merge_fields(tools[tool.name], tool)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name, histogram, label=""):
+    lines = []
+    cumulative = 0
+    prefix = f"{label}," if label else ""
+    for bound, count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+        cumulative += count
+        le = bound if bound == "+Inf" else repr(float(bound))
+        lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+    suffix = f"{{{label}}}" if label else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def render_prometheus(stats):
+    """Renders a ServerStats message in the Prometheus text exposition format."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP switchblade_{name} {help_text}")
+        lines.append(f"# TYPE switchblade_{name} {kind}")
+        lines.extend(samples)
+
+    def gauge(name, help_text, value):
+        metric(name, "gauge", help_text, [f"switchblade_{name} {value}"])
+
+    def per_tool(name, kind, help_text, field):
+        samples = [
+            f'switchblade_{name}{{tool="{_escape(tool.name)}"}} {getattr(tool, field)}'
+            for tool in stats.tools
+        ]
+        metric(name, kind, help_text, samples)
+
+    def per_tool_histogram(name, help_text, field):
+        samples = []
+        for tool in stats.tools:
+            samples += _histogram_lines(
+                f"switchblade_{name}", getattr(tool, field), f'tool="{_escape(tool.name)}"'
+            )
+        metric(name, "histogram", help_text, samples)
+
+    per_tool("tool_calls_total", "counter", "Tool calls started.", "calls")
+    per_tool("tool_errors_total", "counter", "Tool calls that returned an error.", "errors")
+    per_tool("tool_in_flight", "gauge", "Tool calls currently running or queued.", "in_flight")
+    per_tool("tool_queued", "gauge", "Calls waiting for a concurrency slot.", "queued")
+    per_tool("tool_rejected_total", "counter", "Calls rejected by admission control.", "rejected")
+    per_tool("tool_bytes_in_total", "counter", "Argument payload bytes received.", "bytes_in")
+    per_tool("tool_bytes_out_total", "counter", "Result payload bytes sent.", "bytes_out")
+    per_tool("tool_cache_hits_total", "counter", "Result cache hits.", "cache_hits")
+    per_tool("tool_cache_misses_total", "counter", "Result cache misses.", "cache_misses")
+    per_tool("tool_cache_shared_total", "counter", "Calls that joined an identical in-flight call.", "cache_shared")
+    per_tool("tool_cache_evictions_total", "counter", "Results evicted from the cache.", "cache_evictions")
+    per_tool_histogram(
+        "tool_queue_wait_seconds", "Time spent waiting for a concurrency slot.", "queue_wait_seconds"
+    )
+    per_tool_histogram("tool_execution_seconds", "Time spent running the tool.", "execution_seconds")
+
+    gauge("executor_max_workers", "Size of the thread pool running tool calls.", stats.executor_max_workers)
+    gauge("executor_active", "Tool call pool threads busy.", stats.executor_active)
+    gauge("executor_queued", "Work items waiting for a tool call pool thread.", stats.executor_queued)
+    metric(
+        "executor_queue_wait_seconds", "histogram", "Time work waited for a tool call pool thread.",
+        _histogram_lines("switchblade_executor_queue_wait_seconds", stats.executor_queue_wait_seconds),
+    )
+    gauge(
+        "batch_executor_max_workers", "Size of the batch item pool (thread mode).",
+        stats.batch_executor_max_workers,
+    )
+    gauge("batch_executor_active", "Batch item pool threads busy.", stats.batch_executor_active)
+    gauge("batch_executor_queued", "Batch items waiting for a thread.", stats.batch_executor_queued)
+    metric(
+        "batch_executor_queue_wait_seconds", "histogram", "Time batch items waited for a thread.",
+        _histogram_lines(
+            "switchblade_batch_executor_queue_wait_seconds", stats.batch_executor_queue_wait_seconds
+        ),
+    )
+    metric("reloads_total", "counter", "Tool file loads, including lazy imports.",
+           [f"switchblade_reloads_total {stats.reloads}"])
+    metric("reload_failures_total", "counter", "Tool file loads that failed.",
+           [f"switchblade_reload_failures_total {stats.reload_failures}"])
+    metric(
+        "reload_seconds", "histogram", "Time spent loading a tool file.",
+        _histogram_lines("switchblade_reload_seconds", stats.reload_seconds),
+    )
+    gauge("watch_subscribers", "Open WatchTools streams.", stats.watch_subscribers)
+    gauge("registry_version", "Current tool catalog version.", stats.registry_version)
+    gauge("uptime_seconds", "Seconds since the server started.", stats.uptime_seconds)
+    return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(addr, collect):
+    """
+    Serves render_prometheus(collect()) on http://addr/metrics from a daemon
+    thread. Returns the HTTP server so the caller can shut it down.
+    """
+    host, _, port = addr.rpartition(":")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus(collect()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would drown the tool logs
+            pass
+
+    server = ThreadingHTTPServer((host or "0.0.0.0", int(port)), Handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="switchblade-metrics", daemon=True
+    ).start()
+    print(f"📈 Prometheus metrics on http://{addr}/metrics")
+    return server
@@ -0,0 +1,126 @@
+import time
+import threading
+from collections import OrderedDict, deque
+
+try:
+    from ..generated import switchblade_pb2
+except ImportError:
+    from src.generated import switchblade_pb2
+
+# Tells the watcher its view may be incomplete and it should re-list
+RESYNC = "RESYNC"
+
+
+class WatcherLimitReached(Exception):
+    """Raised by NotificationHub.subscribe when max_subscribers are connected."""
+
+
+class Subscription:
+    """
+    Bounded, coalescing buffer for one watcher. Updates for the same key replace
+    each other, and an overflow collapses the whole backlog into one RESYNC.
+    """
+
+    def __init__(self, wake, buffer_size):
+        self.wake = wake
+        self.buffer_size = buffer_size
+        self.pending = OrderedDict()  # key -> ToolsNotification
+        self.lock = threading.Lock()
+
+    def push(self, key, notification):
+        with self.lock:
+            if key in self.pending:
+                del self.pending[key]
+            elif len(self.pending) >= self.buffer_size:
+                self.pending.clear()
+                key = RESYNC
+                notification = switchblade_pb2.ToolsNotification(
+                    event_type=RESYNC,
+                    message="Too many updates, re-list the tools",
+                    sequence=notification.sequence,
+                )
+            self.pending[key] = notification
+        self.wake()
+
+    def drain(self):
+        with self.lock:
+            items = list(self.pending.values())
+            self.pending.clear()
+        return items
+
+
+class NotificationHub:
+    """
+    Event-driven WatchTools fan-out. Publishing never blocks on watchers and no
+    thread is parked per subscriber: each one gets a Subscription plus a wake
+    callback that its RPC handler (thread or coroutine) waits on.
+
+    Every notification carries a sequence number that doubles as a resume
+    token; a recent history lets reconnecting watchers catch up without a
+    full re-list.
+    """
+
+    def __init__(self, buffer_size=64, history_size=256, max_subscribers=None):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.history = deque(maxlen=history_size)  # (key, ToolsNotification)
+        # Clock-seeded like the registry version, so tokens from an earlier
+        # server process are always older than anything in our history
+        self.sequence = int(time.time() * 1000)
+
+    def publish(self, event_type, message, key=None, **fields):
+        """`fields` fill the structured ToolsNotification fields (version, change_type, tool_names)."""
+        with self.lock:
+            self.sequence += 1
+            notification = switchblade_pb2.ToolsNotification(
+                event_type=event_type, message=message, sequence=self.sequence, **fields
+            )
+            self.history.append((key or message, notification))
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.push(key or message, notification)
+        return notification
+
+    def subscribe(self, wake, resume_token=0):
+        subscription = Subscription(wake, self.buffer_size)
+        with self.lock:
+            if self.max_subscribers and len(self.subscribers) >= self.max_subscribers:
+                raise WatcherLimitReached(
+                    f"WatchTools is limited to {self.max_subscribers} subscribers"
+                )
+            self.subscribers.add(subscription)
+            if resume_token:
+                backlog = self._since(resume_token)
+            else:
+                backlog = []
+
+        for key, notification in backlog:
+            subscription.push(key, notification)
+        return subscription
+
+    def _since(self, token):
+        """History after `token`, or a single RESYNC if it fell out of the window."""
+        if token >= self.sequence:
+            return []
+        if not self.history or token < self.history[0][1].sequence - 1:
+            return [
+                (
+                    RESYNC,
+                    switchblade_pb2.ToolsNotification(
+                        event_type=RESYNC,
+                        message="Resume token expired, re-list the tools",
+                        sequence=self.sequence,
+                    ),
+                )
+            ]
+        return [item for item in self.history if item[1].sequence > token]
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self.lock:
+            return len(self.subscribers)
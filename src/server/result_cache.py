@@ -0,0 +1,232 @@
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+from ..utils.switchblade_decorator import ToolCancelled
+
+
+class _Flight:
+    """One in-progress execution that identical concurrent calls wait on."""
+
+    __slots__ = ("done", "value", "error", "abandoned", "wakes")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        # The leader was cancelled or hit its own deadline; followers retry
+        self.abandoned = False
+        self.wakes = []
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ResultCache:
+    """
+    Bounded LRU of results for tools declared ``@tool(cacheable=True)``, keyed
+    on the tool name and its canonicalized arguments.
+
+    Identical calls that arrive while one is already running share that
+    execution (single-flight) instead of starting their own. Errors are handed
+    to the callers that were waiting but never cached. Cancellation and
+    deadline errors belong to the leader's call alone: its followers claim the
+    key again and one of them runs it under its own deadline. A follower waits
+    no longer than its own token allows. Works for both the threaded and the
+    aio server.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires or None, value)
+        self.inflight = {}  # key -> _Flight
+        # Bumped by invalidate() so results of calls started before a reload
+        # are neither stored nor shared with calls started after it
+        self.generations = {}
+        self.counters = {}  # tool_name -> {"hits": n, ...}
+
+    def key_for(self, tool_name, args):
+        """Cache key of a call, or None if the arguments can't be canonicalized."""
+        try:
+            canonical = json.dumps(args, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+        return (tool_name, self.generations.get(tool_name, 0), canonical)
+
+    def _count(self, tool_name, counter):
+        """Caller must hold self.lock."""
+        counters = self.counters.get(tool_name)
+        if counters is None:
+            counters = self.counters[tool_name] = {
+                "hits": 0, "misses": 0, "shared": 0, "evictions": 0, "expirations": 0,
+            }
+        counters[counter] += 1
+
+    def _claim(self, key):
+        """Returns (cached value or None, flight, is_leader)."""
+        tool_name = key[0]
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self._count(tool_name, "hits")
+                    return value, None, False
+                del self.entries[key]
+                self._count(tool_name, "expirations")
+
+            flight = self.inflight.get(key)
+            if flight is not None:
+                self._count(tool_name, "shared")
+                return None, flight, False
+            flight = self.inflight[key] = _Flight()
+            self._count(tool_name, "misses")
+            return None, flight, True
+
+    def _finish(self, key, flight, ttl, value=None, error=None):
+        tool_name = key[0]
+        with self.lock:
+            self.inflight.pop(key, None)
+            current = self.generations.get(tool_name, 0) == key[1]
+            if error is None and current:
+                expires = None if ttl is None else time.monotonic() + ttl
+                self.entries[key] = (expires, value)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    evicted, _ = self.entries.popitem(last=False)
+                    self._count(evicted[0], "evictions")
+            flight.value = value
+            if isinstance(error, ToolCancelled) or (
+                error is not None and not isinstance(error, Exception)
+            ):
+                flight.abandoned = True
+            else:
+                flight.error = error
+            flight.done.set()
+            wakes, flight.wakes = flight.wakes, []
+        for wake in wakes:
+            wake()
+
+    def get_or_call(self, key, ttl, fn, token=None):
+        """Blocking variant: returns the cached result or runs ``fn()`` once."""
+        while True:
+            value, flight, leader = self._claim(key)
+            if flight is None:
+                return value
+            if leader:
+                try:
+                    value = fn()
+                except BaseException as e:
+                    self._finish(key, flight, ttl, error=e)
+                    raise
+                self._finish(key, flight, ttl, value=value)
+                return value
+            self._follow(flight, token)
+            if not flight.abandoned:
+                return flight.result()
+
+    async def get_or_call_async(self, key, ttl, coro_fn, token=None):
+        """aio variant: returns the cached result or awaits ``coro_fn()`` once."""
+        while True:
+            value, flight, leader = self._claim(key)
+            if flight is None:
+                return value
+            if leader:
+                try:
+                    value = await coro_fn()
+                except BaseException as e:
+                    self._finish(key, flight, ttl, error=e)
+                    raise
+                self._finish(key, flight, ttl, value=value)
+                return value
+            await self._follow_async(flight, token)
+            if not flight.abandoned:
+                return flight.result()
+
+    def _follow(self, flight, token):
+        """Waits for the leader, or raises ToolCancelled when the token runs out first."""
+        if token is None:
+            flight.done.wait()
+            return
+        woken = threading.Event()
+        if not self._add_wake(flight, woken.set):
+            return
+        token.add_callback(woken.set)
+        try:
+            woken.wait(token.remaining())
+        finally:
+            token.remove_callback(woken.set)
+            self._remove_wake(flight, woken.set)
+        if not flight.done.is_set():
+            _raise_cancelled(token)
+
+    async def _follow_async(self, flight, token):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        if not self._add_wake(flight, wake):
+            return
+        if token is not None:
+            token.add_callback(wake)
+        try:
+            await asyncio.wait_for(future, None if token is None else token.remaining())
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if token is not None:
+                token.remove_callback(wake)
+            self._remove_wake(flight, wake)
+        if not flight.done.is_set():
+            _raise_cancelled(token)
+
+    def _add_wake(self, flight, wake):
+        """Registers a wake-up for when the flight lands; False if it already has."""
+        with self.lock:
+            if flight.done.is_set():
+                return False
+            flight.wakes.append(wake)
+            return True
+
+    def _remove_wake(self, flight, wake):
+        with self.lock:
+            if wake in flight.wakes:
+                flight.wakes.remove(wake)
+
+    def invalidate(self, tool_names):
+        """Drops every cached result of these tools, e.g. after their module reloads."""
+        tool_names = set(tool_names)
+        with self.lock:
+            for tool_name in tool_names:
+                self.generations[tool_name] = self.generations.get(tool_name, 0) + 1
+            for key in [key for key in self.entries if key[0] in tool_names]:
+                del self.entries[key]
+
+    def cached_tools(self):
+        with self.lock:
+            return {key[0] for key in self.entries}
+
+    def stats(self):
+        """Per-tool hit/miss/shared/eviction counters and current entry counts."""
+        with self.lock:
+            sizes = {}
+            for key in self.entries:
+                sizes[key[0]] = sizes.get(key[0], 0) + 1
+            return {
+                tool_name: dict(counters, entries=sizes.get(tool_name, 0))
+                for tool_name, counters in self.counters.items()
+            }
+
+
+def _raise_cancelled(token):
+    token.raise_if_cancelled()
+    # Woken a hair before the deadline by the timeout itself
+    raise ToolCancelled("Deadline exceeded")
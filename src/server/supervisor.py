@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+import signal
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+
+import grpc
+
+try:
+    from ..generated import switchblade_pb2
+    from ..generated import switchblade_pb2_grpc
+    from .metrics import merge_stats, serve_prometheus
+except ImportError:
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from src.generated import switchblade_pb2
+    from src.generated import switchblade_pb2_grpc
+    from src.server.metrics import merge_stats, serve_prometheus
+
+# Server workers start from a fresh interpreter: forking a process that
+# already runs gRPC threads is unsafe
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# A worker that dies sooner than this after starting is crash-looping and
+# gets restarted with a growing delay
+STABLE_SECONDS = 10.0
+
+
+class _Worker:
+    __slots__ = ("index", "process", "conn", "started_at", "channel", "stub")
+
+    def __init__(self, index, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.started_at = time.monotonic()
+        self.channel = None
+        self.stub = None
+
+    def close(self):
+        if self.channel is not None:
+            self.channel.close()
+        self.conn.close()
+
+
+class Supervisor:
+    """
+    Runs `size` server processes that all listen on the same port through
+    SO_REUSEPORT, so CPU-heavy request mixes are not capped at one core by
+    the GIL. The kernel spreads connections, not requests: one client
+    channel stays on one worker.
+
+    target(conn, *args) runs in each worker. It serves, and sends the port of
+    a private loopback listener over conn; the supervisor reads every
+    worker's GetStats there and merges them for /metrics. Workers that exit
+    are restarted, with a doubling delay while they keep dying right away.
+    """
+
+    def __init__(self, target, size, args=(), metrics_addr="", restart_delay=1.0, max_restart_delay=30.0):
+        self.target = target
+        self.size = size
+        self.args = args
+        self.metrics_addr = metrics_addr
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+
+        self.lock = threading.Lock()
+        self.workers = [None] * size
+        self.restarts = 0
+        self._delays = [restart_delay] * size
+        self._pending = {}  # index -> monotonic time to restart at
+        self._stopping = threading.Event()
+
+    def start(self):
+        for index in range(self.size):
+            self._spawn(index)
+
+    def run(self):
+        """Starts the workers and keeps them running until SIGINT or SIGTERM."""
+        signal.signal(signal.SIGTERM, lambda *_: self._stopping.set())
+        self.start()
+        metrics_server = serve_prometheus(self.metrics_addr, self.stats) if self.metrics_addr else None
+        try:
+            while not self._stopping.is_set():
+                self._reap(timeout=0.5)
+                self._restart_due()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if metrics_server is not None:
+                metrics_server.shutdown()
+            self.stop()
+
+    def stop(self, timeout=10.0):
+        self._stopping.set()
+        workers = [w for w in self.workers if w is not None]
+        for worker in workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.close()
+
+    def stats(self):
+        """Every live worker's GetStats, merged into one ServerStats."""
+        snapshots = []
+        for worker in list(self.workers):
+            stub = self._stats_stub(worker) if worker is not None else None
+            if stub is None:
+                continue
+            try:
+                snapshots.append(stub.GetStats(switchblade_pb2.Empty(), timeout=2))
+            except grpc.RpcError:
+                # Starting up or going down; its numbers are back next scrape
+                pass
+        if not snapshots:
+            return switchblade_pb2.ServerStats()
+        return merge_stats(snapshots)
+
+    def _stats_stub(self, worker):
+        with self.lock:
+            if worker.stub is None and worker.conn.poll():
+                try:
+                    port = worker.conn.recv()
+                except (EOFError, OSError):
+                    return None
+                worker.channel = grpc.insecure_channel(f"127.0.0.1:{port}")
+                worker.stub = switchblade_pb2_grpc.SwitchbladeServiceStub(worker.channel)
+            return worker.stub
+
+    def _spawn(self, index):
+        conn, child_conn = _MP_CONTEXT.Pipe(duplex=False)
+        # Not a daemon: workers start process pools of their own
+        process = _MP_CONTEXT.Process(
+            target=self.target,
+            args=(child_conn, *self.args),
+            name=f"switchblade-server-{index}",
+        )
+        process.start()
+        child_conn.close()
+        with self.lock:
+            self.workers[index] = _Worker(index, process, conn)
+
+    def _reap(self, timeout):
+        live = {w.process.sentinel: w for w in self.workers if w is not None and w.index not in self._pending}
+        for sentinel in wait(list(live), timeout):
+            worker = live[sentinel]
+            worker.process.join()
+            if self._stopping.is_set():
+                return
+            worker.close()
+            lived = time.monotonic() - worker.started_at
+            if lived >= STABLE_SECONDS:
+                delay = self._delays[worker.index] = self.restart_delay
+            else:
+                delay = self._delays[worker.index]
+                self._delays[worker.index] = min(delay * 2, self.max_restart_delay)
+            print(
+                f"💥 Server worker {worker.index} (pid {worker.process.pid}) exited with code "
+                f"{worker.process.exitcode}; restarting in {delay:.1f}s"
+            )
+            self._pending[worker.index] = time.monotonic() + delay
+
+    def _restart_due(self):
+        now = time.monotonic()
+        for index, restart_at in list(self._pending.items()):
+            if restart_at <= now and not self._stopping.is_set():
+                del self._pending[index]
+                self.restarts += 1
+                self._spawn(index)
@@ -0,0 +1,256 @@
+import re
+import json
+import functools
+
+# JSON Schema type name -> accepted Python types (bool is excluded separately)
+_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+class InvalidArguments(ValueError):
+    """Arguments failed the tool's input_schema; carries every violation found."""
+
+    def __init__(self, tool_name, errors):
+        details = "; ".join(f"{path}: {message}" for path, message in errors)
+        super().__init__(f"Invalid arguments for '{tool_name}': {details}")
+        self.tool_name = tool_name
+        self.errors = errors
+
+    def trailing_metadata(self):
+        errors = [{"path": path, "message": message} for path, message in self.errors]
+        return (("x-switchblade-validation-errors", json.dumps(errors)),)
+
+
+def _render(path):
+    """Paths are built as nested (parent, key) tuples and only formatted on error."""
+    parts = []
+    while isinstance(path, tuple):
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return path + "".join(reversed(parts))
+
+
+def _type_check(names):
+    names = [names] if isinstance(names, str) else list(names)
+    unknown = [name for name in names if name not in _TYPES]
+    if unknown:
+        raise ValueError(f"unknown type {unknown[0]!r}")
+    accepted = tuple(t for name in names for t in _TYPES[name])
+    allows_bool = "boolean" in names
+    allows_integral_float = "integer" in names and "number" not in names
+    expected = " or ".join(names)
+
+    exact = frozenset(accepted)
+
+    def check(value, path, errors):
+        # Fast path for the exact types json.loads produces
+        if type(value) in exact:
+            return True
+        if isinstance(value, bool) and not allows_bool:
+            errors.append((path, f"expected {expected}, got boolean"))
+            return False
+        if isinstance(value, accepted):
+            return True
+        # JSON has no int/float split, 3.0 is a fine integer
+        if allows_integral_float and isinstance(value, float) and value.is_integer():
+            return True
+        errors.append((path, f"expected {expected}, got {type(value).__name__}"))
+        return False
+
+    return check
+
+
+def _compile(schema):
+    """
+    Turns a schema into check(value, path, errors) -> None. Supports the
+    keywords tools actually use; unknown keywords are ignored, as the spec asks.
+    """
+    if schema is True or schema == {}:
+        return None
+    if schema is False:
+        return lambda value, path, errors: errors.append((path, "no value allowed"))
+    if not isinstance(schema, dict):
+        raise ValueError(f"schema must be an object, got {type(schema).__name__}")
+
+    checks = []
+    type_check = _type_check(schema["type"]) if "type" in schema else None
+
+    if "enum" in schema:
+        options = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            # True == 1 in Python but not in JSON
+            if not any(
+                value == option and isinstance(value, bool) == isinstance(option, bool)
+                for option in options
+            ):
+                errors.append((path, f"must be one of {options}"))
+
+        checks.append(check_enum)
+
+    if "const" in schema:
+        constant = schema["const"]
+
+        def check_const(value, path, errors):
+            if value != constant or isinstance(value, bool) != isinstance(constant, bool):
+                errors.append((path, f"must be {constant!r}"))
+
+        checks.append(check_const)
+
+    # --- numbers ---
+    bounds = [
+        (key, schema[key])
+        for key in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")
+        if key in schema
+    ]
+    if bounds:
+
+        def check_bounds(value, path, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            for key, limit in bounds:
+                if (
+                    (key == "minimum" and value < limit)
+                    or (key == "maximum" and value > limit)
+                    or (key == "exclusiveMinimum" and value <= limit)
+                    or (key == "exclusiveMaximum" and value >= limit)
+                ):
+                    errors.append((path, f"violates {key} {limit}"))
+
+        checks.append(check_bounds)
+
+    # --- strings ---
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+    if min_length is not None or max_length is not None or pattern is not None:
+
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append((path, f"shorter than {min_length} characters"))
+            if max_length is not None and len(value) > max_length:
+                errors.append((path, f"longer than {max_length} characters"))
+            if pattern is not None and not pattern.search(value):
+                errors.append((path, f"does not match {pattern.pattern!r}"))
+
+        checks.append(check_string)
+
+    # --- arrays ---
+    items = _compile(schema["items"]) if isinstance(schema.get("items"), (dict, bool)) else None
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    if items is not None or min_items is not None or max_items is not None:
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append((path, f"fewer than {min_items} items"))
+            if max_items is not None and len(value) > max_items:
+                errors.append((path, f"more than {max_items} items"))
+            if items is not None:
+                for index, item in enumerate(value):
+                    items(item, (path, index), errors)
+
+        checks.append(check_array)
+
+    # --- objects ---
+    properties = {
+        name: check
+        for name, check in (
+            (name, _compile(sub)) for name, sub in schema.get("properties", {}).items()
+        )
+        if check is not None
+    }
+    required = list(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    known = set(schema.get("properties", {}))
+    additional_check = _compile(additional) if isinstance(additional, dict) else None
+    if properties or required or additional is not True:
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(((path, name), "is required"))
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    check(item, (path, name), errors)
+                elif name in known:
+                    continue
+                elif additional is False:
+                    errors.append(((path, name), "is not an allowed property"))
+                elif additional_check is not None:
+                    additional_check(item, (path, name), errors)
+
+        checks.append(check_object)
+
+    # --- combinators ---
+    for key in ("allOf", "anyOf", "oneOf"):
+        if key not in schema:
+            continue
+        branches = [_compile(sub) or (lambda value, path, errors: None) for sub in schema[key]]
+
+        def check_combinator(value, path, errors, key=key, branches=branches):
+            if key == "allOf":
+                for branch in branches:
+                    branch(value, path, errors)
+                return
+            passed = 0
+            for branch in branches:
+                branch_errors = []
+                branch(value, path, branch_errors)
+                passed += not branch_errors
+            if key == "anyOf" and passed == 0:
+                errors.append((path, "must match at least one of anyOf"))
+            elif key == "oneOf" and passed != 1:
+                errors.append((path, f"must match exactly one of oneOf, matched {passed}"))
+
+        checks.append(check_combinator)
+
+    if type_check is None and not checks:
+        return None
+    if not checks:
+        return type_check
+
+    def check(value, path, errors):
+        # A value of the wrong type makes the other keywords meaningless
+        if type_check is not None and not type_check(value, path, errors):
+            return
+        for sub_check in checks:
+            sub_check(value, path, errors)
+
+    return check
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_validator(schema_json):
+    """
+    Compiles an input_schema (as its JSON text, so reloads with an unchanged
+    schema reuse the validator) into validate(args) -> list of (path, message).
+    Returns None when the schema accepts anything.
+    """
+    try:
+        check = _compile(json.loads(schema_json))
+    except (re.error, TypeError, AttributeError) as e:
+        raise ValueError(f"unsupported input_schema: {e}")
+    if check is None:
+        return None
+
+    def validate(args):
+        errors = []
+        check(args, "$", errors)
+        return [(_render(path), message) for path, message in errors]
+
+    return validate
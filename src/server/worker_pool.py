@@ -0,0 +1,317 @@
+import os
+import sys
+import time
+import queue
+import inspect
+import threading
+import importlib.util
+import multiprocessing
+
+from ..utils.switchblade_decorator import (
+    Progress,
+    CancellationToken,
+    ToolCancelled,
+    invoke,
+)
+
+# How often a call waiting on a worker checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.05
+
+# Workers are forked from a clean fork server where available, so respawning
+# one never forks the gRPC process itself (threads, locks, sockets).
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _MP_CONTEXT = multiprocessing.get_context("forkserver")
+else:
+    _MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died while running a tool."""
+
+
+def _current_rss():
+    """Resident set size of this process in bytes (best effort)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # Peak rather than current RSS, still good enough for a ceiling check
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    except ImportError:
+        return 0
+
+
+def _import_tools(filepaths):
+    """Imports tool files the same way ToolRegistry does and indexes @tool functions."""
+    tools = {}
+    for filepath in filepaths:
+        module_name = os.path.basename(filepath).replace(".py", "")
+        spec = importlib.util.spec_from_file_location(module_name, filepath)
+        if not (spec and spec.loader):
+            continue
+        try:
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        except Exception as e:
+            print(f"❌ Worker {os.getpid()} failed to load {module_name}: {e}")
+            continue
+        for _, obj in inspect.getmembers(module):
+            if inspect.isfunction(obj) and getattr(obj, "_is_switchblade_tool", False):
+                tools[obj._tool_metadata["name"]] = obj
+    return tools
+
+
+async def _run_async(tool_func, args, token):
+    if not tool_func._tool_metadata.get("is_async_generator"):
+        return await invoke(tool_func, args, token)
+    return [
+        item async for item in invoke(tool_func, args, token)
+        if not isinstance(item, Progress)
+    ]
+
+
+def _worker_main(conn, filepaths):
+    """Entry point of a pool process: import everything once, then serve calls."""
+    tools = _import_tools(filepaths)
+    try:
+        conn.send(("ready", None, _current_rss()))
+    except OSError:
+        # Pool was torn down while we were importing
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, ConnectionError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+
+        tool_name, args, timeout = message
+        tool_func = tools.get(tool_name)
+        # The pool kills this process on cancel; the token lets a tool wind down first
+        token = CancellationToken.with_timeout(timeout)
+        try:
+            if tool_func is None:
+                raise LookupError(f"Tool '{tool_name}' is not loaded in worker")
+            meta = tool_func._tool_metadata
+            if meta.get("is_async") or meta.get("is_async_generator"):
+                import asyncio
+
+                result = asyncio.run(_run_async(tool_func, args, token))
+            else:
+                result = invoke(tool_func, args, token)
+            if inspect.isgenerator(result):
+                result = [item for item in result if not isinstance(item, Progress)]
+            reply = ("ok", result)
+        except Exception as e:
+            reply = ("error", str(e))
+
+        try:
+            # Pickled straight back to the handler, no JSON in between
+            conn.send(reply + (_current_rss(),))
+        except Exception as e:
+            conn.send(("error", f"Unpicklable tool result: {e}", _current_rss()))
+
+
+class _Worker:
+    def __init__(self, filepaths, generation):
+        self.conn, child_conn = _MP_CONTEXT.Pipe()
+        self.process = _MP_CONTEXT.Process(
+            target=_worker_main, args=(child_conn, list(filepaths)), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.generation = generation
+        self.calls = 0
+        self.rss = 0
+        self.ready = False
+
+    def wait_ready(self, timeout=None):
+        if self.ready:
+            return
+        if not self.conn.poll(timeout):
+            raise TimeoutError("Worker did not finish importing tools in time")
+        _, _, self.rss = self.conn.recv()
+        self.ready = True
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ProcessWorkerPool:
+    """
+    Pool of warm worker processes for tools declared with ``execution="process"``.
+
+    Each worker imports every registered tool file once at start-up. Workers are
+    recycled after ``max_calls`` calls or when their RSS grows past
+    ``max_rss_bytes``, and a crashed or hung worker is replaced transparently.
+    """
+
+    def __init__(self, size=None, max_calls=500, max_rss_bytes=512 * 1024 * 1024,
+                 call_timeout=300.0, start_timeout=60.0):
+        self.size = size or os.cpu_count() or 2
+        self.max_calls = max_calls
+        self.max_rss_bytes = max_rss_bytes
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+
+        self.filepaths = []
+        self.generation = 0
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = False
+        self.respawns = 0
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+            workers = [self._spawn() for _ in range(self.size)]
+        for worker in workers:
+            self.idle.put(worker)
+        print(f"🏭 Process pool started with {self.size} workers")
+
+    def stop(self):
+        with self.lock:
+            self.started = False
+        while True:
+            try:
+                self.idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def reload(self, filepath):
+        """Called after a tool file (re)loads, so new workers import the fresh code."""
+        with self.lock:
+            if filepath not in self.filepaths:
+                self.filepaths.append(filepath)
+        self._refresh()
+
+    def forget(self, filepath):
+        """Called when a file no longer provides process tools (or was deleted)."""
+        with self.lock:
+            if filepath in self.filepaths:
+                self.filepaths.remove(filepath)
+        self._refresh()
+
+    def _refresh(self):
+        with self.lock:
+            self.generation += 1
+            started = self.started
+        if not started:
+            return
+        # Replace idle workers now; busy ones are replaced when they come back
+        stale = []
+        while True:
+            try:
+                stale.append(self.idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in stale:
+            self._retire(worker)
+
+    def call(self, tool_name, args, timeout=None, token=None):
+        """
+        Runs ``tool_name(args)`` in a worker and returns the unpickled result.
+        A CancellationToken bounds the call by its deadline, and cancelling it
+        kills the worker instead of letting the tool run on unobserved.
+        """
+        self.start()
+        timeout = self.call_timeout if timeout is None else timeout
+        if token is not None and token.deadline is not None:
+            timeout = min(timeout, token.remaining())
+
+        try:
+            worker = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ToolCancelled(f"Deadline exceeded waiting for a worker for '{tool_name}'")
+        if token is not None and token.cancelled:
+            # Expired while queued for a worker, don't start it at all
+            self.idle.put(worker)
+            token.raise_if_cancelled()
+        if worker.generation != self.generation:
+            worker = self._replace(worker)
+
+        try:
+            worker.wait_ready(self.start_timeout)
+            worker.conn.send((tool_name, args, timeout))
+            finished = self._wait_reply(worker, timeout, token)
+            if finished:
+                status, payload, worker.rss = worker.conn.recv()
+        except (EOFError, ConnectionError):
+            self._replace(worker, requeue=True)
+            raise WorkerCrashed(f"Worker crashed while running '{tool_name}'")
+        except BaseException:
+            # The reply may still arrive later, so this pipe can't be reused
+            self._replace(worker, requeue=True)
+            raise
+
+        if not finished:
+            # A hung or abandoned tool costs us this worker, never the server
+            self._replace(worker, requeue=True)
+            if token is not None and token.cancelled:
+                token.raise_if_cancelled()
+            raise TimeoutError(f"Tool '{tool_name}' timed out after {timeout}s")
+
+        worker.calls += 1
+        self._retire(worker)
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def _wait_reply(self, worker, timeout, token):
+        """Waits for the worker's reply; polls in slices so a cancel frees it early."""
+        if token is None:
+            return worker.conn.poll(timeout)
+        deadline = time.monotonic() + timeout
+        while not token.cancelled:
+            step = min(CANCEL_POLL_SECONDS, deadline - time.monotonic())
+            if step <= 0:
+                return False
+            if worker.conn.poll(step):
+                return True
+        return False
+
+    def _spawn(self):
+        return _Worker(self.filepaths, self.generation)
+
+    def _replace(self, worker, requeue=False):
+        worker.stop()
+        if requeue and not self.started:
+            return None
+        self.respawns += 1
+        fresh = self._spawn()
+        if requeue:
+            self.idle.put(fresh)
+        return fresh
+
+    def _retire(self, worker):
+        """Returns a worker to the idle queue, recycling it if it is worn out."""
+        worn_out = (
+            worker.generation != self.generation
+            or worker.calls >= self.max_calls
+            or (self.max_rss_bytes and worker.rss > self.max_rss_bytes)
+            or not worker.process.is_alive()
+        )
+        if worn_out and self.started:
+            self._replace(worker, requeue=True)
+        elif self.started:
+            self.idle.put(worker)
+        else:
+            worker.stop()
@@ -0,0 +1,87 @@
+import os
+
+import grpc
+
+# Per-message compression for large payloads: "gzip", "deflate" or "none".
+# Messages below the threshold go out as-is, compressing a port-scan verdict
+# costs more CPU than the bytes it saves
+COMPRESSION = os.getenv("SWITCHBLADE_COMPRESSION", "gzip")
+COMPRESSION_MIN_BYTES = int(os.getenv("SWITCHBLADE_COMPRESSION_MIN_BYTES", str(32 * 1024)))
+
+# gRPC's default 4 MB cap rejects large scan dumps outright
+MAX_MESSAGE_MB = int(os.getenv("SWITCHBLADE_MAX_MESSAGE_MB", "64"))
+
+# HTTP/2 pings keep idle WatchTools streams alive through NATs and detect dead
+# peers; 0 disables them
+KEEPALIVE_SECONDS = float(os.getenv("SWITCHBLADE_KEEPALIVE_SECONDS", "30"))
+KEEPALIVE_TIMEOUT_SECONDS = float(os.getenv("SWITCHBLADE_KEEPALIVE_TIMEOUT_SECONDS", "10"))
+
+# Fixed HTTP/2 stream window in bytes; 0 keeps gRPC's BDP-based auto-tuning
+HTTP2_WINDOW_BYTES = int(os.getenv("SWITCHBLADE_HTTP2_WINDOW_BYTES", "0"))
+
+_ALGORITHMS = {
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+    "none": grpc.Compression.NoCompression,
+}
+
+
+def compression_algorithm(name=None):
+    """grpc.Compression for a SWITCHBLADE_COMPRESSION value."""
+    name = (name or COMPRESSION).lower()
+    if name not in _ALGORITHMS:
+        raise ValueError(f"unknown compression {name!r}, expected one of {sorted(_ALGORITHMS)}")
+    return _ALGORITHMS[name]
+
+
+def compression_for(size):
+    """Algorithm for a message of `size` bytes, None to send it uncompressed."""
+    if size < COMPRESSION_MIN_BYTES:
+        return None
+    algorithm = compression_algorithm()
+    return None if algorithm == grpc.Compression.NoCompression else algorithm
+
+
+def _shared_options():
+    max_bytes = MAX_MESSAGE_MB * 1024 * 1024
+    options = [
+        ("grpc.max_send_message_length", max_bytes),
+        ("grpc.max_receive_message_length", max_bytes),
+        # Pings carry no data, don't cap how many may be sent on a quiet stream
+        ("grpc.http2.max_pings_without_data", 0),
+    ]
+    if KEEPALIVE_SECONDS > 0:
+        options += [
+            ("grpc.keepalive_time_ms", int(KEEPALIVE_SECONDS * 1000)),
+            ("grpc.keepalive_timeout_ms", int(KEEPALIVE_TIMEOUT_SECONDS * 1000)),
+            ("grpc.keepalive_permit_without_calls", 1),
+        ]
+    if HTTP2_WINDOW_BYTES > 0:
+        options += [
+            ("grpc.http2.lookahead_bytes", HTTP2_WINDOW_BYTES),
+            ("grpc.http2.bdp_probe", 0),
+        ]
+    return options
+
+
+def server_options(reuse_port=False):
+    """
+    Options for grpc.server() / grpc.aio.server(). reuse_port lets several
+    server processes bind the same port, with the kernel spreading incoming
+    connections over them (Linux SO_REUSEPORT).
+    """
+    options = _shared_options()
+    if reuse_port:
+        options.append(("grpc.so_reuseport", 1))
+    if KEEPALIVE_SECONDS > 0:
+        # Accept client pings as often as we send them instead of answering
+        # with GOAWAY "too_many_pings"
+        options.append(
+            ("grpc.http2.min_ping_interval_without_data_ms", int(KEEPALIVE_SECONDS * 1000))
+        )
+    return options
+
+
+def channel_options():
+    """Options for the client channel."""
+    return _shared_options()
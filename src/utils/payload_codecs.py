@@ -0,0 +1,95 @@
+"""
+Encoders for the binary CallTool payload fields.
+
+CODEC_UNSPECIFIED keeps the legacy arguments_json/content_json strings; every
+other codec travels in the bytes fields. orjson and msgpack are optional and
+only advertised when importable. msgpack is the only codec that carries raw
+bytes; google.protobuf.Value stores every number as a double.
+"""
+
+import json
+
+from google.protobuf import json_format
+from google.protobuf import struct_pb2
+
+try:
+    from ..generated import switchblade_pb2
+except ImportError:
+    from src.generated import switchblade_pb2
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CODEC_UNSPECIFIED = switchblade_pb2.CODEC_UNSPECIFIED
+CODEC_JSON = switchblade_pb2.CODEC_JSON
+CODEC_ORJSON = switchblade_pb2.CODEC_ORJSON
+CODEC_MSGPACK = switchblade_pb2.CODEC_MSGPACK
+CODEC_PROTOBUF_VALUE = switchblade_pb2.CODEC_PROTOBUF_VALUE
+
+# Codecs whose bytes are plain UTF-8 JSON text
+JSON_TEXT_CODECS = (CODEC_JSON, CODEC_ORJSON)
+
+
+def available_codecs():
+    """Codecs this process can encode and decode, fastest first."""
+    codecs = []
+    if orjson is not None:
+        codecs.append(CODEC_ORJSON)
+    if msgpack is not None:
+        codecs.append(CODEC_MSGPACK)
+    codecs += [CODEC_JSON, CODEC_PROTOBUF_VALUE]
+    return codecs
+
+
+def codec_by_name(name):
+    """Maps a config string such as "orjson" to its Codec value."""
+    return switchblade_pb2.Codec.Value(f"CODEC_{name.upper()}")
+
+
+def negotiate(accept_codecs):
+    """Picks the caller's most preferred codec that we support, or CODEC_UNSPECIFIED."""
+    supported = available_codecs()
+    for codec in accept_codecs:
+        if codec in supported:
+            return codec
+    return CODEC_UNSPECIFIED
+
+
+def encode(value, codec):
+    if codec == CODEC_ORJSON:
+        return orjson.dumps(value)
+    if codec == CODEC_JSON:
+        return json.dumps(value).encode("utf-8")
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(value, use_bin_type=True)
+    if codec == CODEC_PROTOBUF_VALUE:
+        message = struct_pb2.Value()
+        json_format.ParseDict(value, message)
+        return message.SerializeToString()
+    raise ValueError(f"Unsupported codec {codec}")
+
+
+def decode(data, codec):
+    if codec in JSON_TEXT_CODECS:
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    if codec == CODEC_MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    if codec == CODEC_PROTOBUF_VALUE:
+        message = struct_pb2.Value()
+        message.ParseFromString(data)
+        return json_format.MessageToDict(message)
+    raise ValueError(f"Unsupported codec {codec}")
+
+
+def to_json_text(data, codec):
+    """JSON text for a payload; JSON codecs are passed through without parsing."""
+    if codec in JSON_TEXT_CODECS:
+        return data.decode("utf-8")
+    return json.dumps(decode(data, codec))
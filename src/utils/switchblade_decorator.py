@@ -1,17 +1,185 @@
-def tool(name, description, input_schema, output_schema=None):
+import time
+import inspect
+import threading
+
+
+class Progress:
+    """
+    Yield this from a generator tool to report progress; it is streamed to
+    CallToolStream callers and left out of the collected CallTool result.
+    """
+
+    def __init__(self, message="", fraction=None):
+        self.message = message
+        self.fraction = fraction
+
+    def to_dict(self):
+        return {"message": self.message, "fraction": self.fraction}
+
+
+class ToolCancelled(Exception):
+    """The call was cancelled by its client or ran past its deadline."""
+
+
+class CancellationToken:
+    """
+    Passed as the second argument to tools declared with cancellable=True.
+    Long-running tools should check it between steps and return early; the
+    server cancels it when the client disconnects or the deadline passes.
+    """
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline  # time.monotonic() value, None = no deadline
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @classmethod
+    def with_timeout(cls, seconds):
+        return cls(None if seconds is None else time.monotonic() + seconds)
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self):
+        return self._event.is_set() or self.expired
+
+    def remaining(self):
+        """Seconds left until the deadline, None if there is none."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ToolCancelled(self.reason)
+        if self.expired:
+            raise ToolCancelled("Deadline exceeded")
+
+    def wait(self, timeout=None):
+        """Sleeps up to `timeout` (and the deadline); True if cancelled meanwhile."""
+        limits = [t for t in (timeout, self.remaining()) if t is not None]
+        self._event.wait(min(limits) if limits else None)
+        return self.cancelled
+
+    def cancel(self, reason="Cancelled by client"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        """Runs `callback()` on cancel (now, if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+def invoke(func, args, token):
+    """Calls a tool, handing the token only to tools that declared cancellable=True."""
+    if func._tool_metadata.get("cancellable"):
+        return func(args, token)
+    return func(args)
+
+
+def build_metadata(
+    name,
+    description,
+    input_schema,
+    output_schema=None,
+    execution="inline",
+    max_concurrency=None,
+    max_queue_depth=None,
+    cacheable=False,
+    cache_ttl=None,
+    cancellable=False,
+):
+    """
+    The @tool options as stored in ``_tool_metadata``. Shared with the server's
+    static manifest extractor so both produce identical metadata.
+    """
+    return {
+        "name": name,
+        "description": description,
+        "input_schema": input_schema,
+        "output_schema": output_schema or {},
+        "execution": execution,
+        "max_concurrency": max_concurrency,
+        "max_queue_depth": max_queue_depth,
+        "cacheable": cacheable,
+        "cache_ttl": cache_ttl,
+        "cancellable": cancellable,
+    }
+
+
+def tool(
+    name,
+    description,
+    input_schema,
+    output_schema=None,
+    execution="inline",
+    max_concurrency=None,
+    max_queue_depth=None,
+    cacheable=False,
+    cache_ttl=None,
+    cancellable=False,
+):
     """
     Decorator to mark a function as a Switchblade tool.
+
+    execution="process" runs the tool in the server's pre-forked worker pool
+    instead of the gRPC handler, for CPU-bound or misbehaving tools.
+
+    max_concurrency caps how many calls of this tool run at once and
+    max_queue_depth how many may wait for a slot; further calls are rejected
+    with RESOURCE_EXHAUSTED and a retry-after-ms hint. Without max_queue_depth
+    the threaded server still caps the queue (SWITCHBLADE_THREADED_QUEUE_DEPTH).
+
+    cacheable=True declares the tool idempotent: identical CallTool requests
+    share one execution and its result is reused for cache_ttl seconds (or
+    until the tool's file reloads when cache_ttl is None).
+
+    cancellable=True makes the server call the tool as func(args, token) with a
+    CancellationToken carrying the call's deadline and client cancellation.
+    Async tools are cancelled as tasks either way.
+
+    Generator and async generator tools stream each yielded item through
+    CallToolStream; plain CallTool returns them collected into a list.
     """
 
     def decorator(func):
         # Attach metadata directly to the function object
         func._is_switchblade_tool = True
-        func._tool_metadata = {
-            "name": name,
-            "description": description,
-            "input_schema": input_schema,
-            "output_schema": output_schema or {},
-        }
+        func._tool_metadata = build_metadata(
+            name,
+            description,
+            input_schema,
+            output_schema,
+            execution,
+            max_concurrency,
+            max_queue_depth,
+            cacheable,
+            cache_ttl,
+            cancellable,
+        )
+        # Coroutine tools are awaited on the event loop in aio mode
+        func._tool_metadata["is_async"] = inspect.iscoroutinefunction(func)
+        func._tool_metadata["is_generator"] = inspect.isgeneratorfunction(func)
+        func._tool_metadata["is_async_generator"] = inspect.isasyncgenfunction(func)
         return func
 
-    return decorator
\ No newline at end of file
+    return decorator
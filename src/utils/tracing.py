@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import secrets
+import threading
+import contextlib
+import contextvars
+
+# gRPC metadata key carrying the W3C trace context ("00-<trace>-<span>-01")
+TRACEPARENT_KEY = "traceparent"
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per finished span to a local file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a", buffering=1, encoding="utf-8")
+
+    def export(self, span):
+        line = json.dumps(span, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start", "started",
+        "attributes", "error",
+    )
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, error=None, duration=None):
+        """Finishes the span; `duration` overrides the measured one (seconds)."""
+        if error is not None:
+            self.error = str(error) or type(error).__name__
+        if duration is None:
+            duration = time.perf_counter() - self.started
+        exporter = _state["exporter"]
+        if exporter is None:
+            return
+        exporter.export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": _state["service"],
+            "start": self.start,
+            "duration_ms": duration * 1000,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        })
+
+
+class _RemoteParent:
+    """Span context received from the other side of an RPC."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id, span_id):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+_state = {"exporter": None, "service": "switchblade"}
+_current = contextvars.ContextVar("switchblade_span", default=None)
+
+
+def configure(service=None, exporter=None):
+    """
+    Sets the exporter (anything with ``export(span_dict)``) and the service
+    name stamped on spans. Without an exporter spans cost next to nothing.
+    """
+    if service is not None:
+        _state["service"] = service
+    _state["exporter"] = exporter
+
+
+def configure_from_env(service):
+    """SWITCHBLADE_TRACE_FILE=path turns on the JSON-lines exporter."""
+    path = os.getenv("SWITCHBLADE_TRACE_FILE")
+    configure(service, JsonLinesExporter(path) if path else None)
+
+
+def enabled():
+    return _state["exporter"] is not None
+
+
+def current():
+    return _current.get()
+
+
+def start_span(name, parent=None, **attributes):
+    """
+    Starts a span under `parent` (default: the current one) without making it
+    current. Returns None when tracing is off; end it with span.end().
+    """
+    if _state["exporter"] is None:
+        return None
+    if parent is None:
+        parent = _current.get()
+    if parent is None:
+        return Span(name, secrets.token_hex(16), None, attributes)
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+@contextlib.contextmanager
+def span(name, parent=None, **attributes):
+    """Runs the block in a span that is current for nested spans."""
+    active = start_span(name, parent, **attributes)
+    if active is None:
+        yield None
+        return
+    reset = _current.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.end(error=e)
+        raise
+    else:
+        active.end()
+    finally:
+        _current.reset(reset)
+
+
+def finish(span, error=None):
+    """Ends a span from start_span(); a no-op for None (tracing off)."""
+    if span is not None:
+        span.end(error=error)
+
+
+def record(name, duration, parent=None, **attributes):
+    """Records an interval measured elsewhere (e.g. queue wait) as a finished span."""
+    active = start_span(name, parent, **attributes)
+    if active is not None:
+        active.start -= duration
+        active.end(duration=duration)
+
+
+def inject(span=None):
+    """gRPC metadata carrying `span` (default: the current one), or None."""
+    span = span or _current.get()
+    if span is None:
+        return None
+    return ((TRACEPARENT_KEY, span.traceparent()),)
+
+
+def extract(metadata):
+    """Parent span context from incoming gRPC metadata, None if absent or malformed."""
+    for key, value in metadata or ():
+        if key != TRACEPARENT_KEY:
+            continue
+        parts = value.split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+            return _RemoteParent(parts[1], parts[2])
+    return None